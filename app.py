@@ -15,8 +15,8 @@ db_initialized = initialize_database()
 if not db_initialized:
     log("Database could not be initialized. DB logging might fail.", "CRITICAL")
 
-# Import PROJECT_ROOT and schema parser utility
-from src.utils.config_schema import parse_schema_for_ui, PROJECT_ROOT
+# Import the shared folder locations and schema parser utility
+from src.utils.config_schema import parse_schema_for_ui, UPLOAD_FOLDER, RESULTS_FOLDER
 # job_manager is used via blueprints, no direct import needed here
 
 # --- Create Flask App Instance ---
@@ -24,10 +24,7 @@ log("Initializing Flask application...", "INFO")
 app = Flask(__name__) # Core Flask app instance
 
 # --- Application Configuration ---
-UPLOAD_FOLDER_NAME = "audio"
-RESULTS_FOLDER_NAME = "results"
-UPLOAD_FOLDER = PROJECT_ROOT / UPLOAD_FOLDER_NAME
-RESULTS_FOLDER = PROJECT_ROOT / RESULTS_FOLDER_NAME
+# Folder locations are defined once in src.utils.config_schema
 try:
     UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
     RESULTS_FOLDER.mkdir(parents=True, exist_ok=True)
@@ -38,6 +35,18 @@ try:
 except Exception as e:
      log(f"CRITICAL: Failed to create/access essential folders (upload/results): {e}", "CRITICAL")
 
+# Let a front-end web server (Apache mod_xsendfile, lighttpd, ...) send result downloads:
+# send_from_directory then only returns an X-Sendfile header and the server streams the
+# file with sendfile(2). Off by default, since without such a server the body would be empty.
+app.config['USE_X_SENDFILE'] = os.environ.get("FLASK_USE_X_SENDFILE", "false").lower() in ['true', '1', 'yes']
+if app.config['USE_X_SENDFILE']:
+    log("X-Sendfile enabled: result downloads are delegated to the front-end web server.", "INFO")
+# nginx equivalent: internal location mapped to RESULTS_FOLDER (e.g. '/_protected/results/').
+# When set, result downloads return only an X-Accel-Redirect header to that location.
+app.config['X_ACCEL_REDIRECT_PREFIX'] = os.environ.get("FLASK_X_ACCEL_REDIRECT_PREFIX", "").strip()
+if app.config['X_ACCEL_REDIRECT_PREFIX']:
+    log(f"X-Accel-Redirect enabled: result downloads are delegated to nginx via '{app.config['X_ACCEL_REDIRECT_PREFIX']}'.", "INFO")
+
 # --- Load and Store Schema Info in App Config ---
 try:
     log("Loading UI schema info...", "INFO")
@@ -59,11 +68,14 @@ from src.routes.file_routes import file_bp
 from src.routes.info_routes import info_bp
 
 API_PREFIX = "/api/v1"
-# Register each blueprint on its own line with the correct prefix
-app.register_blueprint(pipeline_bp, url_prefix=API_PREFIX)
-app.register_blueprint(review_bp, url_prefix=API_PREFIX)
-app.register_blueprint(file_bp, url_prefix=API_PREFIX) # Corrected: file_bp now uses prefix
-app.register_blueprint(info_bp, url_prefix=API_PREFIX)
+# Register each blueprint once with the correct prefix. Idempotent: a blueprint
+# name that is already registered is skipped instead of raising (Flask refuses a
+# second registration under the same name), e.g. if this block runs again.
+for blueprint in (pipeline_bp, review_bp, file_bp, info_bp):
+    if blueprint.name in app.blueprints:
+        log(f"Blueprint '{blueprint.name}' already registered, skipping.", "DEBUG")
+        continue
+    app.register_blueprint(blueprint, url_prefix=API_PREFIX)
 log(f"Registered API blueprints (Info, Pipeline, Review, Files) with prefix: {API_PREFIX}", "INFO") # Corrected log message
 
 
@@ -112,7 +124,11 @@ if __name__ == "__main__":
     # Debug mode controlled by FLASK_DEBUG env var, defaults to True for development
     debug_mode = os.environ.get("FLASK_DEBUG", "true").lower() in ['true', '1', 'yes']
     log(f"Running Flask app on http://{host}:{port}/ (Debug mode: {debug_mode})", "INFO")
-    # use_reloader is implicitly True when debug=True
-    app.run(host=host, port=port, debug=debug_mode)
+    # use_reloader is implicitly True when debug=True.
+    # One thread per request: long-lived requests (SSE status streams, large or
+    # ranged downloads) block only their own thread, never other requests.
+    # For production, put a web server in front and enable FLASK_USE_X_SENDFILE /
+    # FLASK_X_ACCEL_REDIRECT_PREFIX so file bytes never pass through Python.
+    app.run(host=host, port=port, debug=debug_mode, threaded=True)
 
 # --- End of app.py ---
\ No newline at end of file
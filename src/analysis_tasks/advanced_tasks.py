@@ -2,8 +2,9 @@
 
 import json # Keep json for potential future use with structured input/output
 import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path # Keep Path for potential future use or type hints if needed
-from typing import List, Dict, Optional, Any
+from typing import Callable, List, Dict, Optional, Any
 
 # Import utilities
 from src.utils.log import log
@@ -30,19 +31,22 @@ def _build_analysis_prompt(task_name: str, transcript_text: str, context: Option
     # Use the specific instruction or a general default if task_name is unknown
     instruction = base_instructions.get(task_name, f"Perform a general analysis regarding '{task_name}' on the following conversation transcript.")
 
-    # Construct the prompt parts systematically
+    # Construct the prompt parts systematically. Everything up to and including the
+    # transcript is identical for all tasks and only the task instruction follows it,
+    # so when several tasks run on the same model Ollama can reuse the cached
+    # prompt prefix (the long transcript) instead of re-processing it per task.
     prompt_parts = []
     prompt_parts.append("You are an AI assistant specialized in analyzing conversation transcripts for business or professional contexts.")
     # Add user-provided context if available
     if context:
         prompt_parts.append(f"Consider the following context: {context.strip()}")
 
-    # Add the specific task instruction
-    prompt_parts.append(f"\nYour Task: {instruction}")
     # Add the transcript text, clearly demarcated
     prompt_parts.append("\n--- Start Transcript ---")
     prompt_parts.append(transcript_text) # Use the provided text string
     prompt_parts.append("--- End Transcript ---")
+    # Add the specific task instruction
+    prompt_parts.append(f"\nYour Task: {instruction}")
     # Final instruction for the LLM
     prompt_parts.append("\nProvide your analysis below:")
 
@@ -129,6 +133,65 @@ def legal(transcript_text: str, config: dict, context: Optional[str] = None) ->
     return _run_single_task("legal", transcript_text, config, context)
 
 
+# Task functions run by batch_advanced, in result order
+ADVANCED_TASKS: Dict[str, Callable[[str, dict, Optional[str]], Optional[str]]] = {
+    "summary": summary, "intent": intent, "actions": actions,
+    "emotion": emotion, "questions": questions, "legal": legal,
+}
+
+
+def batch_advanced(
+    transcript_text: str,
+    config: dict,
+    context: Optional[str] = None,
+    on_task_done: Optional[Callable[[str, Optional[str]], None]] = None
+    ) -> Dict[str, Optional[str]]:
+    """
+    Runs all advanced analysis tasks on one transcript as a single batch.
+
+    The tasks are independent, so they are sent to Ollama concurrently (at most
+    config['llm_parallel_tasks'] at a time). Their prompts share the same
+    transcript prefix (see _build_analysis_prompt), which lets a model that
+    serves several of the tasks reuse its processed prompt prefix.
+
+    Args:
+        transcript_text: The full transcript text as a single string.
+        config: The job configuration dictionary.
+        context: Optional user-provided context string.
+        on_task_done: Optional callback invoked as (task_name, result) when each
+                      task finishes (in completion order). An exception raised by
+                      the callback (e.g. a stop request) cancels the tasks that
+                      have not started and is propagated.
+
+    Returns:
+        Task name -> result string (None for failed tasks), in ADVANCED_TASKS order.
+    """
+    results: Dict[str, Optional[str]] = {}
+    max_parallel = max(1, min(len(ADVANCED_TASKS), config.get("llm_parallel_tasks") or len(ADVANCED_TASKS)))
+    executor = ThreadPoolExecutor(max_workers=max_parallel, thread_name_prefix="llm-task")
+    try:
+        future_to_task = {
+            executor.submit(task_func, transcript_text, config, context): task_name
+            for task_name, task_func in ADVANCED_TASKS.items()
+        }
+        for future in as_completed(future_to_task):
+            task_name = future_to_task[future]
+            try:
+                task_result = future.result()
+            except Exception as e:
+                # Task functions normally return None on failure; treat exceptions alike
+                log(f"LLM analysis task '{task_name}' raised an error: {e}", "ERROR")
+                task_result = None
+            results[task_name] = task_result
+            if on_task_done is not None:
+                on_task_done(task_name, task_result)
+    finally:
+        # Drop tasks that have not started yet if we leave early, without waiting
+        executor.shutdown(wait=False, cancel_futures=True)
+    # Keep the task order stable in the returned results
+    return {task_name: results.get(task_name) for task_name in ADVANCED_TASKS}
+
+
 # --- Final Aggregating Analysis ---
 # This function still accepts the dictionary of intermediate results.
 
@@ -1,16 +1,20 @@
 # src/database_logger.py
 import json
+import queue
+import atexit
+import threading
 import traceback # Keep json for dumps
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, List, Optional, Tuple
 import time
 
 from sqlalchemy import create_engine, MetaData, Table, Column, Integer, String, Text, Float, DateTime, insert, inspect, select # Added select
 
 # Use the configured logger
-from src.utils.log import log
+from src.utils.log import log, log_enabled
 from src.utils.load_config import load_config
+from src.utils.file_io import dumps_json
 
 # Assuming PROJECT_ROOT is defined consistently
 try:
@@ -142,7 +146,7 @@ def initialize_database(db_path: Optional[Path] = None) -> bool:
         return True
     except Exception as e:
         log(f"Failed to initialize database at '{db_path}': {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG") # Log full traceback for debugging
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG") # Log full traceback for debugging
         return False
 
 # --- Logging Job Data ---
@@ -174,7 +178,23 @@ RESULT_KEY_TO_COLUMN = {
 }
 
 
-def log_job_to_db(job_data: Dict[str, Any], db_path: Optional[Path] = None) -> bool:
+def _encode_transcript_json(segments: Optional[List[Dict[str, Any]]]) -> Optional[str]:
+    """
+    Returns the final transcript as a compact JSON string for the DB.
+
+    The segments are handed over in memory by the pipeline rather than read back
+    from final_transcript_json_path: that file name is shared by all jobs, so a
+    concurrent job could overwrite it before this record is written.
+
+    Returns:
+        The JSON text, or None if no transcript is available.
+    """
+    return dumps_json(segments, indent=False).decode("utf-8") if segments else None
+
+
+
+def log_job_to_db(job_data: Dict[str, Any], db_path: Optional[Path] = None,
+                  transcript_segments: Optional[List[Dict[str, Any]]] = None) -> bool:
     """
     Logs the relevant data from a completed or failed job into the database.
 
@@ -182,6 +202,8 @@ def log_job_to_db(job_data: Dict[str, Any], db_path: Optional[Path] = None) -> b
         job_data: The job status dictionary (expected keys: 'job_id', 'status', 'config',
                   'result', 'start_time', 'end_time', 'error_message', etc.).
         db_path: Path to the database file. If None, determined via config/default.
+        transcript_segments: The final transcript segments (not part of the job
+                  result, which is served on every status poll).
 
     Returns:
         True if logging was successful (or skipped due to existing entry), False otherwise.
@@ -237,8 +259,7 @@ def log_job_to_db(job_data: Dict[str, Any], db_path: Optional[Path] = None) -> b
 
     # Handle JSON serialization separately for specific fields
     try:
-        final_transcript_data = result_dict.get("final_transcript_segments")
-        insert_data["result_transcript_json"] = json.dumps(final_transcript_data, ensure_ascii=False) if final_transcript_data else None
+        insert_data["result_transcript_json"] = _encode_transcript_json(transcript_segments)
     except Exception as e:
         log(f"DB Log: Could not serialize transcript segments for '{job_id}': {e}", "WARNING")
         insert_data["result_transcript_json"] = None # Store null on serialization error
@@ -269,7 +290,56 @@ def log_job_to_db(job_data: Dict[str, Any], db_path: Optional[Path] = None) -> b
             return True
     except Exception as e:
         log(f"DB Log: Failed to log job '{job_id}' to database '{db_path.name}': {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG") # Log full traceback for debugging database errors
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG") # Log full traceback for debugging database errors
         return False
 
+
+# --- Background Logging ---
+# Pipelines hand finished jobs to a single daemon worker so a slow disk or SQLite
+# fsync never holds up the pipeline thread. One worker keeps inserts serialized.
+_db_log_queue: "queue.Queue[Tuple[Dict[str, Any], Optional[Path], Optional[List[Dict[str, Any]]], Optional[Callable[[bool], None]]]]" = queue.Queue()
+
+
+def _db_log_worker():
+    """Writes queued job records to the database, one at a time, forever."""
+    while True:
+        job_data, db_path, transcript_segments, on_done = _db_log_queue.get()
+        try:
+            logged_ok = log_job_to_db(job_data, db_path, transcript_segments)
+            if on_done is not None:
+                on_done(logged_ok)
+        except Exception as e: # Never let one record stop the worker
+            log(f"DB Log: Background logging failed for job '{job_data.get('job_id')}': {e}", "ERROR")
+            if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
+        finally:
+            _db_log_queue.task_done()
+
+
+def submit_job_log(job_data: Dict[str, Any], db_path: Optional[Path] = None,
+                   on_done: Optional[Callable[[bool], None]] = None,
+                   transcript_segments: Optional[List[Dict[str, Any]]] = None):
+    """
+    Queues a job record for logging to the database (see log_job_to_db).
+
+    Returns immediately; the record is written by the background worker.
+
+    Args:
+        job_data: Snapshot of the job status dictionary.
+        db_path: Path to the database file. If None, determined via the job's config.
+        on_done: Optional callable invoked on the worker with log_job_to_db's result.
+        transcript_segments: The final transcript segments; must not be modified
+            afterwards (they are encoded on the worker).
+    """
+    _db_log_queue.put((job_data, db_path, transcript_segments, on_done))
+
+
+def flush_db_log_queue():
+    """Blocks until every queued job record has been written (or has failed)."""
+    _db_log_queue.join()
+
+
+threading.Thread(target=_db_log_worker, name="db-logger", daemon=True).start()
+# The worker is a daemon thread; drain the queue before the interpreter exits (e.g. CLI runs)
+atexit.register(flush_db_log_queue)
+
 # --- End of database_logger.py ---
\ No newline at end of file
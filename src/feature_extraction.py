@@ -0,0 +1,108 @@
+# src/feature_extraction.py
+
+from typing import Optional
+
+import numpy as np
+
+# --- Third-party library imports ---
+try:
+    import torch
+    from faster_whisper.feature_extractor import FeatureExtractor
+except ImportError as e:
+    raise ImportError("Error: faster-whisper or torch is not installed. Please run 'pip install faster-whisper torch'.") from e
+
+# --- Local Imports ---
+from src.utils.log import log
+from src.features_cache import mel_filters, hann_window
+
+
+class TorchFeatureExtractor(FeatureExtractor):
+    """
+    Whisper log-mel feature extractor that runs the STFT and mel projection in torch.
+
+    faster-whisper computes features with NumPy on the CPU, which takes about a
+    second per long file before the GPU can start decoding. This subclass does
+    the same computation with torch.stft on `device` (e.g. 'cuda'), using the
+    Hann window and mel filterbank cached there by src.features_cache. The result is returned as a
+    NumPy array, as CTranslate2 expects.
+
+    Any failure on the device falls back to the stock CPU implementation.
+    """
+    def __init__(self, device: str = "cuda", **kwargs):
+        """
+        Args:
+            device: Torch device for feature computation.
+            **kwargs: Passed to faster_whisper's FeatureExtractor (feature_size, ...).
+        """
+        super().__init__(**kwargs)
+        self.device = torch.device(device)
+        # Resident constants, shared by all extractors on the same device
+        n_mels = np.asarray(self.mel_filters).shape[0]
+        self._window = hann_window(self.n_fft, str(self.device))
+        self._mel_filters = mel_filters(self.sampling_rate, n_mels, str(self.device), self.n_fft)
+
+    def __call__(self, waveform: np.ndarray, padding: int = 160, chunk_length: Optional[int] = None, **kwargs):
+        """Computes log-mel features like FeatureExtractor.__call__, on the torch device."""
+        try:
+            return self._compute_on_device(waveform, padding, chunk_length)
+        except Exception as e:
+            log(f"Feature extraction on '{self.device}' failed ({e}); falling back to CPU.", "WARNING")
+            return super().__call__(waveform, padding=padding, chunk_length=chunk_length, **kwargs)
+
+    def _compute_on_device(self, waveform: np.ndarray, padding: int, chunk_length: Optional[int]) -> np.ndarray:
+        """Log-mel spectrogram following Whisper's reference implementation."""
+        if chunk_length is not None:
+            # Same bookkeeping as the parent class for non-default chunk sizes
+            self.n_samples = chunk_length * self.sampling_rate
+            self.nb_max_frames = self.n_samples // self.hop_length
+
+        audio = torch.as_tensor(np.asarray(waveform, dtype=np.float32)).to(self.device, non_blocking=True)
+        if padding:
+            audio = torch.nn.functional.pad(audio, (0, padding))
+
+        stft = torch.stft(audio, self.n_fft, self.hop_length, window=self._window, return_complex=True)
+        magnitudes = stft[..., :-1].abs() ** 2
+
+        mel_spec = self._mel_filters @ magnitudes
+        log_spec = torch.clamp(mel_spec, min=1e-10).log10()
+        log_spec = torch.maximum(log_spec, log_spec.max() - 8.0)
+        log_spec = (log_spec + 4.0) / 4.0
+        return log_spec.cpu().numpy()
+
+
+def install_feature_extractor(whisper_model, feature_device: str) -> bool:
+    """
+    Switches a loaded WhisperModel to compute features on the given device.
+
+    Idempotent: models already using a TorchFeatureExtractor on that device are
+    left alone. 'cpu' restores the stock NumPy extractor.
+
+    Args:
+        whisper_model: A loaded faster_whisper.WhisperModel.
+        feature_device: Torch device name ('cuda', 'mps', 'cpu', ...).
+
+    Returns:
+        True if the model now extracts features on `feature_device`, False if the
+        extractor could not be replaced (the model keeps its current one).
+    """
+    current = getattr(whisper_model, "feature_extractor", None)
+    if current is None:
+        return False
+    feat_kwargs = getattr(whisper_model, "feat_kwargs", None) or {}
+
+    if feature_device == "cpu":
+        if isinstance(current, TorchFeatureExtractor):
+            whisper_model.feature_extractor = FeatureExtractor(**feat_kwargs)
+        return True
+    if isinstance(current, TorchFeatureExtractor) and current.device == torch.device(feature_device):
+        return True
+
+    try:
+        whisper_model.feature_extractor = TorchFeatureExtractor(device=feature_device, **feat_kwargs)
+        log(f"Whisper feature extraction moved to '{feature_device}'.", "DEBUG")
+        return True
+    except Exception as e:
+        log(f"Could not set up feature extraction on '{feature_device}': {e}. Using CPU.", "WARNING")
+        return False
+
+# --- End of src/feature_extraction.py ---
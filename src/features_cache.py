@@ -0,0 +1,46 @@
+# src/features_cache.py
+
+import functools
+
+# --- Third-party library imports ---
+try:
+    import torch
+    import torchaudio
+except ImportError as e:
+    raise ImportError("Error: torch or torchaudio is not installed. Please run 'pip install torch torchaudio'.") from e
+
+# --- Constants ---
+# Whisper's STFT size (25 ms window at 16 kHz)
+WHISPER_N_FFT = 400
+
+# Feature extractors are created per loaded Whisper model and re-created when the
+# feature device changes; these caches make them all share one copy of the
+# constant tensors per (parameters, device) instead of rebuilding them each time.
+
+@functools.lru_cache(maxsize=8)
+def mel_filters(sample_rate: int, n_mels: int, device: str, n_fft: int = WHISPER_N_FFT) -> torch.Tensor:
+    """
+    Returns Whisper's mel filterbank as a (n_mels, n_fft // 2 + 1) float32 tensor on `device`.
+
+    Uses Slaney-style mel scale and normalization, matching librosa.filters.mel
+    (and therefore Whisper's reference filters).
+    """
+    filters = torchaudio.functional.melscale_fbanks(
+        n_freqs=n_fft // 2 + 1,
+        f_min=0.0,
+        f_max=sample_rate / 2.0,
+        n_mels=n_mels,
+        sample_rate=sample_rate,
+        norm="slaney",
+        mel_scale="slaney",
+    )
+    # melscale_fbanks returns (n_freqs, n_mels); Whisper multiplies filters @ magnitudes
+    return filters.T.contiguous().to(device=torch.device(device), dtype=torch.float32)
+
+
+@functools.lru_cache(maxsize=8)
+def hann_window(n_fft: int, device: str) -> torch.Tensor:
+    """Returns a periodic Hann window of length n_fft on `device` (as used by torch.stft)."""
+    return torch.hann_window(n_fft, device=torch.device(device))
+
+# --- End of src/features_cache.py ---
@@ -3,11 +3,38 @@
 import uuid
 import time
 import threading
+from datetime import date, datetime
+from pathlib import PurePath
 from typing import Dict, Any, List, Optional, Tuple
 
 # Import log directly (assuming log.py is available)
 from src.utils.log import log
 
+# --- JSON-safe State ---
+# Job state is served as JSON on every status poll, so values are made JSON-safe
+# when they are stored rather than checked each time they are read.
+_JSON_PRIMITIVES = (str, int, float, bool, type(None))
+
+def _to_jsonable(value: Any) -> Any:
+    """
+    Converts a value to something JSON serializable.
+
+    Dicts and lists/tuples are converted recursively (dict keys become
+    strings); datetimes become ISO strings, paths and exceptions strings, and
+    anything else its repr().
+    """
+    if isinstance(value, _JSON_PRIMITIVES):
+        return value
+    if isinstance(value, dict):
+        return {key if isinstance(key, str) else str(key): _to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(item) for item in value]
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (PurePath, BaseException)):
+        return str(value)
+    return repr(value)
+
 # --- Status Constants ---
 # Define possible job status constants for consistency and clarity
 STATUS_QUEUED = "QUEUED"             # Job created, waiting to start
@@ -22,6 +49,62 @@ STATUS_COMPLETED = "COMPLETED"         # Successfully finished
 STATUS_FAILED = "FAILED"               # Finished with an error
 STATUS_STOPPED = "STOPPED"             # Explicitly stopped by user request
 
+class JobTransaction:
+    """
+    Buffers state changes for a single job and applies them in one locked update.
+
+    Obtained via `job_manager.transaction(job_id)` and used as a context manager.
+    Progress, status, extra state fields and job log entries set inside the
+    `with` block are applied together on exit (also when the block raises, so
+    log entries are never lost). Stop requests are unaffected: `check_stop`
+    still reads the live `stop_requested` flag.
+    """
+    def __init__(self, manager: "JobManager", job_id: str):
+        self._manager = manager
+        self.job_id = job_id
+        self.progress: Optional[int] = None
+        self.status: Optional[str] = None
+        self._updates: Dict[str, Any] = {}
+        self._log_entries: List[Tuple[float, str, str]] = []
+
+    def log(self, message: str, level: str = "INFO"):
+        """Queues a timestamped job log entry (timestamp taken now, not at commit)."""
+        self._log_entries.append((time.time(), level.upper(), str(message)))
+
+    def update(self, **fields: Any):
+        """Queues arbitrary job state fields (e.g. config, review_data_paths)."""
+        self._updates.update(fields)
+
+    def commit(self) -> bool:
+        """
+        Applies all buffered changes under a single lock acquisition.
+
+        Returns:
+            True if the job exists and the changes were applied, False otherwise.
+        """
+        updates = dict(self._updates)
+        if self.progress is not None:
+            updates["progress"] = max(0, min(100, int(self.progress)))
+        if self.status:
+            updates["status"] = self.status
+        if not self._manager._apply_batch(self.job_id, updates, self._log_entries):
+            log(f"Transaction for non-existent job '{self.job_id}' discarded.", "WARNING")
+            return False
+        # Reset buffers so a second commit does not re-apply the same changes
+        self._updates.clear()
+        self._log_entries.clear()
+        self.progress = None
+        self.status = None
+        return True
+
+    def __enter__(self) -> "JobTransaction":
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_tb) -> bool:
+        self.commit()
+        return False # Never suppress exceptions
+
+
 class JobManager:
     """
     Manages the state and lifecycle of background processing jobs in memory.
@@ -34,6 +117,11 @@ class JobManager:
         self._jobs: Dict[str, Dict[str, Any]] = {}
         # Use a Reentrant Lock (RLock) to allow the same thread to acquire the lock multiple times if needed
         self._lock = threading.RLock()
+        # Notified (under the lock) whenever a job's version changes; status streams wait on it
+        self._changed = threading.Condition(self._lock)
+        # One Event per job mirroring its 'stop_requested' flag. Event.is_set() is a
+        # plain flag read, so pipelines can poll for stops without taking the lock.
+        self._stop_events: Dict[str, threading.Event] = {}
         log(f"JobManager Initialized (Instance ID: {id(self)})", "DEBUG")
 
     def create_job(self, initial_config: Optional[Dict[str, Any]] = None) -> str:
@@ -58,9 +146,11 @@ class JobManager:
                 "start_time": None,    # Timestamp (float) when processing actually starts
                 "end_time": None,      # Timestamp (float) when processing finishes (any state)
                 "stop_requested": False, # Flag to signal graceful shutdown request
-                "config": initial_config or {}, # Store config used for this specific job
+                "config": _to_jsonable(initial_config or {}), # Store config used for this specific job
                 "review_data_paths": {}, # Paths needed for review (set by Part 1)
+                "version": 0, # Bumped on every change; lets status streams skip unchanged states
             }
+            self._stop_events[job_id] = threading.Event()
             log(f"Created job '{job_id}' with initial status '{STATUS_QUEUED}'.", "INFO")
         return job_id
 
@@ -98,8 +188,9 @@ class JobManager:
                     job_state["start_time"] = time.time()
                     log(f"Job '{job_id}' processing started. Start time set.", "DEBUG")
 
-            # --- Apply Updates Provided ---
-            job_state.update(updates)
+            # --- Apply Updates Provided (JSON-safe, see _to_jsonable) ---
+            job_state.update({key: _to_jsonable(value) for key, value in updates.items()})
+            self._bump_version(job_state)
 
             # --- Automatic End Time ---
             # Set end_time only if it's currently None and the job is entering a terminal state.
@@ -110,6 +201,76 @@ class JobManager:
 
             return True # Update successful
 
+    def _apply_batch(self, job_id: str, updates: Dict[str, Any],
+                     log_entries: List[Tuple[float, str, str]]) -> bool:
+        """Applies state updates and already timestamped log entries under one lock acquisition."""
+        with self._lock:
+            job_state = self._jobs.get(job_id)
+            if not job_state:
+                return False
+            if updates:
+                self._update_job_state(job_id, updates) # Re-entrant: same thread already holds the lock
+            if log_entries:
+                job_state["logs"].extend(log_entries)
+                self._bump_version(job_state)
+            return True
+
+    def batch_update(self, job_id: str, updates: Dict[str, Any],
+                     log_entries: Optional[List[Tuple[str, str]]] = None) -> bool:
+        """
+        Applies several state fields and job log entries in one atomic update.
+
+        Args:
+            job_id: The ID of the job to update.
+            updates: State fields to set (e.g. status, progress, review_data_paths).
+            log_entries: Optional (message, level) pairs appended to the job log.
+
+        Returns:
+            True if the job exists and was updated, False otherwise.
+        """
+        now = time.time()
+        entries = [(now, level.upper(), str(message)) for message, level in (log_entries or [])]
+        if not self._apply_batch(job_id, updates, entries):
+            log(f"Batch update for non-existent job '{job_id}' ignored.", "WARNING")
+            return False
+        return True
+
+    def transaction(self, job_id: str) -> JobTransaction:
+        """
+        Returns a context manager that batches state updates and job logs for
+        one job into a single locked update (see JobTransaction).
+
+        Example:
+            with job_manager.transaction(job_id) as tx:
+                tx.progress = 35
+                tx.log("Audio processing finished.", "SUCCESS")
+        """
+        return JobTransaction(self, job_id)
+
+    def transition(self, job_id: str, status: Optional[str] = None, progress: Optional[int] = None,
+                   log_entry: Optional[Tuple[str, str]] = None) -> bool:
+        """
+        Moves a job to its next step: status, progress and a job log entry in one locked update.
+
+        Replaces separate update_status / update_progress / add_log calls at
+        pipeline step boundaries, so pollers never see the step half-applied.
+
+        Args:
+            job_id: The ID of the job to update.
+            status: Optional new status.
+            progress: Optional new progress percentage (clamped to 0-100).
+            log_entry: Optional (message, level) pair appended to the job log.
+
+        Returns:
+            True if the job exists and was updated, False otherwise.
+        """
+        updates: Dict[str, Any] = {}
+        if status:
+            updates["status"] = status
+        if progress is not None:
+            updates["progress"] = max(0, min(100, int(progress)))
+        return self.batch_update(job_id, updates, [log_entry] if log_entry else None)
+
     def update_status(self, job_id: str, status: str):
         """Updates only the status field of a specific job."""
         if not self._update_job_state(job_id, {"status": status}):
@@ -133,13 +294,14 @@ class JobManager:
             log(f"Attempted to add log to non-existent job '{job_id}'.", "WARNING")
             return
 
-        log_entry = (time.time(), level.upper(), message) # Create log tuple
+        log_entry = (time.time(), level.upper(), str(message)) # Create log tuple
 
         with self._lock: # Acquire lock to safely modify the job's log list
             job_state = self._jobs.get(job_id)
             # Check job exists and 'logs' is actually a list inside the lock
             if job_state and isinstance(job_state.get("logs"), list):
                  job_state["logs"].append(log_entry)
+                 self._bump_version(job_state)
                  # Avoid logging the log addition itself unless absolutely needed for debugging
                  # log(f"Added log to job '{job_id}': [{level.upper()}] {message}", "DEBUG")
             elif job_state:
@@ -193,6 +355,8 @@ class JobManager:
             if not job_state.get("stop_requested"):
                  log(f"Processing stop request for job '{job_id}'...", "INFO")
                  job_state["stop_requested"] = True
+                 self._bump_version(job_state)
+                 self._stop_events[job_id].set() # Wake lock-free check_stop() callers
                  return True # Flag successfully set
             else:
                  # If already requested, still return True as the desired state is met
@@ -200,11 +364,15 @@ class JobManager:
                  return True
 
     def is_stop_requested(self, job_id: str) -> bool:
-        """Checks if a stop request has been flagged for the specified job."""
-        with self._lock: # Read access also needs lock for consistency against updates
-            job_state = self._jobs.get(job_id)
-            # Return the flag's value, defaulting to False if job doesn't exist
-            return job_state.get("stop_requested", False) if job_state else False
+        """
+        Checks if a stop request has been flagged for the specified job.
+
+        Lock-free: reads the job's stop Event, which request_stop() sets while
+        holding the lock. Cheap enough to call inside per-segment loops.
+        """
+        stop_event = self._stop_events.get(job_id)
+        # Default to False if the job doesn't exist
+        return stop_event is not None and stop_event.is_set()
 
     def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
         """
@@ -218,6 +386,45 @@ class JobManager:
             # Return a shallow copy to prevent external modification of the internal state
             return job_state.copy() if job_state else None
 
+    def _bump_version(self, job_state: Dict[str, Any]):
+        """Marks a job as changed and wakes wait_for_change() callers (caller holds the lock)."""
+        job_state["version"] += 1
+        self._changed.notify_all()
+
+    def wait_for_change(self, job_id: str, last_version: int, timeout: float) -> Optional[int]:
+        """
+        Blocks until the job's version differs from `last_version`, or `timeout` seconds pass.
+
+        Lets watchers (the SSE status stream) sleep until something changes
+        instead of polling get_version().
+
+        Returns:
+            The job's current version (equal to `last_version` on timeout), or
+            None if the job_id is not found.
+        """
+        with self._changed:
+            self._changed.wait_for(
+                lambda: self._jobs.get(job_id, {}).get("version", last_version) != last_version
+                        or job_id not in self._jobs,
+                timeout=timeout,
+            )
+            job_state = self._jobs.get(job_id)
+            return job_state["version"] if job_state else None
+
+    def get_version(self, job_id: str) -> Optional[int]:
+        """
+        Returns the job's change counter, bumped on every state or log change.
+
+        Cheap compared to get_status (no copy), so watchers can poll it and only
+        fetch the full state when it moved.
+
+        Returns:
+            The current version, or None if the job_id is not found.
+        """
+        with self._lock:
+            job_state = self._jobs.get(job_id)
+            return job_state["version"] if job_state else None
+
     def list_jobs(self) -> List[Dict[str, Any]]:
          """
          Returns a list containing a summary dictionary for all current jobs.
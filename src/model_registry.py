@@ -0,0 +1,119 @@
+# src/model_registry.py
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Import logging utility
+from src.utils.log import log
+
+# --- Constants ---
+# Number of models kept loaded per kind ('whisper', 'pyannote', ...) per process
+DEFAULT_MAX_PER_KIND = 2
+
+# Registry keys are tuples whose first element is the model kind, e.g.
+# ("whisper", "small", "int8", "cuda") or ("pyannote", name, token, "cuda").
+RegistryKey = Tuple[Any, ...]
+
+
+class ModelRegistry:
+    """
+    Process-wide cache of loaded AI models, shared across pipeline runs.
+
+    Loading multi-GB weights dominates warm-start latency and repeated
+    load/unload cycles fragment GPU memory, so each model is loaded once and
+    reused by every job that asks for the same key. Each kind of model keeps
+    at most `max_per_kind` entries; the least recently used one is evicted.
+
+    Thread-safe. Loading happens under the registry lock, so two jobs asking
+    for the same model at the same time never load it twice.
+    """
+    def __init__(self, max_per_kind: int = DEFAULT_MAX_PER_KIND):
+        """Initializes an empty registry."""
+        self.max_per_kind = max_per_kind
+        # key -> loaded model, least recently used first
+        self._models: "OrderedDict[RegistryKey, Any]" = OrderedDict()
+        # key -> callable notified on eviction. It must not modify the model
+        # (e.g. move it off the GPU): jobs that fetched it earlier may still use it.
+        self._releasers: Dict[RegistryKey, Callable[[Any], None]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: RegistryKey, loader: Callable[[], Any],
+            release: Optional[Callable[[Any], None]] = None) -> Any:
+        """
+        Returns the model for a key, loading it with `loader` on first use.
+
+        Args:
+            key: Registry key; its first element names the model kind.
+            loader: Zero-argument callable that loads and returns the model.
+            release: Optional callable invoked with the model when it is evicted.
+                Eviction only drops the registry's reference; the callback must
+                leave the model usable for jobs still holding it.
+
+        Returns:
+            The loaded model.
+
+        Raises:
+            Exception: Any error raised by the loader (nothing is cached then).
+        """
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                log(f"Using cached {key[0]} model {key[1]}.", "DEBUG")
+                return self._models[key]
+            model = loader()
+            self._models[key] = model
+            if release is not None:
+                self._releasers[key] = release
+            self._evict_over_limit(key[0])
+            return model
+
+    def evict(self, key: RegistryKey) -> bool:
+        """
+        Removes a model from the registry and releases it.
+
+        Returns:
+            True if the model was loaded and has been evicted, False otherwise.
+        """
+        with self._lock:
+            return self._evict_locked(key)
+
+    def clear(self):
+        """Evicts every loaded model (e.g. to free GPU memory while idle)."""
+        with self._lock:
+            for key in list(self._models):
+                self._evict_locked(key)
+
+    def loaded_keys(self) -> List[RegistryKey]:
+        """Returns the keys of all loaded models, least recently used first."""
+        with self._lock:
+            return list(self._models)
+
+    # --- Internal Helpers (caller holds the lock) ---
+
+    def _evict_locked(self, key: RegistryKey) -> bool:
+        """Drops the registry's reference to one model and notifies its release callback."""
+        model = self._models.pop(key, None)
+        release = self._releasers.pop(key, None)
+        if model is None:
+            return False
+        log(f"Evicting cached {key[0]} model {key[1]}.", "INFO")
+        if release is not None:
+            try:
+                release(model)
+            except Exception as e:
+                log(f"Error releasing evicted model {key[1]}: {e}", "WARNING")
+        return True
+
+    def _evict_over_limit(self, kind: Any):
+        """Evicts the least recently used models of one kind above max_per_kind."""
+        same_kind = [key for key in self._models if key[0] == kind]
+        for key in same_kind[:max(0, len(same_kind) - self.max_per_kind)]:
+            self._evict_locked(key)
+
+
+# --- Singleton Instance ---
+# Shared by the transcriber and any other module that loads models.
+model_registry = ModelRegistry()
+
+# --- End of src/model_registry.py ---
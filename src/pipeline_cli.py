@@ -15,6 +15,8 @@ from src.pipeline_part2 import run_part2
 # Import utilities
 from src.utils.log import log
 from src.utils.pipeline_helpers import check_stop # Import check_stop
+from src.utils.config_schema import PROJECT_ROOT
+from src.utils.file_io import read_bundle
 
 def run_full_pipeline_cli(job_id: str, config_overrides: Dict[str, Any]):
     """
@@ -65,7 +67,16 @@ def run_full_pipeline_cli(job_id: str, config_overrides: Dict[str, Any]):
         proposed_map_path_str = review_paths.get("proposed_map_path")
         final_speaker_map_for_part2 = {} # Default to an empty map
 
-        if name_detection_enabled and proposed_map_path_str:
+        if name_detection_enabled and review_paths.get("bundle_path"):
+            # Bundle mode: the proposed map (if any) is a section of the bundle file
+            try:
+                bundle_sections = read_bundle(PROJECT_ROOT / review_paths["bundle_path"], review_paths.get("bundle_offsets") or {}, ["proposed_map"])
+                final_speaker_map_for_part2 = bundle_sections.get("proposed_map") or {}
+                log(f"CLI Pipeline: Using proposed speaker map from bundle ({len(final_speaker_map_for_part2)} entries).", "INFO")
+            except Exception as e:
+                log(f"CLI Pipeline: Failed to read proposed map from bundle, using empty map instead. Error: {e}", "WARNING")
+                final_speaker_map_for_part2 = {}
+        elif name_detection_enabled and proposed_map_path_str:
             proposed_map_path = Path(proposed_map_path_str)
             if proposed_map_path.is_file():
                 try:
@@ -1,9 +1,15 @@
 # src/pipeline_part1.py
 import time
 import os
-import json
+import asyncio
+import stat
+import importlib.util
+import sys
+import threading
 import traceback
 # Removed unused yaml import
+from concurrent.futures import Future
+from dataclasses import dataclass, field
 from pathlib import Path
 # Ensure Tuple is imported from typing
 from typing import Dict, Any, List, Optional, Tuple
@@ -12,37 +18,70 @@ from typing import Dict, Any, List, Optional, Tuple
 from src.job_manager import job_manager, STATUS_RUNNING, STATUS_PROCESSING_AUDIO, \
     STATUS_DETECTING_NAMES, STATUS_WAITING_FOR_REVIEW, \
     STATUS_STOPPED, STATUS_FAILED # Adjusted status constants
-# Import the main audio processing function (interface is stable after its refactor)
-from src.transcriber import transcribe_and_diarize, DEFAULT_WHISPER_MODEL, \
-     DEFAULT_COMPUTE_TYPE, DEFAULT_PYANNOTE_PIPELINE
-# Safely import the optional speaker name detector
-try:
-    from src.speaker_name_detector import detect_speaker_names
-    NAME_DETECTOR_AVAILABLE = True
-except ImportError:
-    # Log warning if module not found
+# The transcriber (torch, faster-whisper, pyannote) and the speaker name detector are
+# imported inside run_part1_async, so processes that only import this module (e.g. API
+# workers serving status endpoints) don't pay their multi-second import cost.
+# Probe for the optional speaker name detector without importing it
+NAME_DETECTOR_AVAILABLE = importlib.util.find_spec("src.speaker_name_detector") is not None
+if not NAME_DETECTOR_AVAILABLE:
     # Need log defined first, but log isn't available globally here yet.
     # Use print for this specific bootstrap warning.
     print("[PipelinePart1 WARNING] Speaker name detector module (src.speaker_name_detector) not found, disabling automatic name detection.")
-    NAME_DETECTOR_AVAILABLE = False
-    # Define a dummy function with the correct signature and type hints to prevent runtime errors
-    def detect_speaker_names(*args, **kwargs) -> Tuple[Dict[str, Optional[str]], Dict[int, str]]:
-        """Dummy function for when speaker_name_detector is unavailable."""
-        return {}, {} # Return empty dicts
 
 # Import Utilities
 from src.utils.load_config import load_config
-from src.utils.config_schema import PROJECT_ROOT
-from src.utils.log import log # Now log is imported
+from src.utils.config_schema import PROJECT_ROOT, RESULTS_FOLDER_NAME
+from src.utils.log import log, log_enabled # Now log is imported
 from src.utils.pipeline_helpers import check_stop, merge_configs
+from src.utils import audio_cache
+from src.utils.audio_utils import prefetch_file, get_audio_duration
+from src.utils.file_io import dumps_json, SegmentsView, resolve_segment_format, SEGMENT_FORMAT_SUFFIXES, \
+     encode_context_snippets, context_index_path
+from src.utils.io_queue import submit_write, submit_segments_write, submit_bundle_write, submit_cleanup
 
 # Constants for directory names relative to project root
-RESULTS_DIR_NAME = "results"
+RESULTS_DIR_NAME = RESULTS_FOLDER_NAME
 TRANSCRIPTS_DIR_NAME = "transcripts"
 # Define standard intermediate filenames
 DEFAULT_INTERMEDIATE_JSON_FILENAME = "intermediate_transcript.json"
 DEFAULT_PROPOSED_MAP_FILENAME = "intermediate_proposed_map.json"
-DEFAULT_CONTEXT_SNIPPETS_FILENAME = "intermediate_context.json"
+DEFAULT_CONTEXT_SNIPPETS_FILENAME = "intermediate_context.txt" # Index sidecar: intermediate_context_index.json
+DEFAULT_BUNDLE_FILENAME = "intermediate_bundle.jsonl" # Used instead of the files above with intermediate_bundle
+# Default intermediate transcript location (relative to project root), built once
+DEFAULT_INTERMEDIATE_TRANSCRIPT_REL = str(Path(TRANSCRIPTS_DIR_NAME) / DEFAULT_INTERMEDIATE_JSON_FILENAME)
+
+# Verbose Step 5 checkpoint tracing for debugging job hand-over (set PART1_TRACE=1)
+_CHECKPOINT_TRACE = os.environ.get("PART1_TRACE") == "1"
+
+# Hugging Face token from the environment, read once per process (load_dotenv runs
+# in the entry points before this module is imported)
+_ENV_HF_TOKEN = os.environ.get("HUGGING_FACE_TOKEN")
+
+# --- GPU Slots (shared by all job threads) ---
+# Each job runs its own event loop on its own thread, so the limit on concurrent
+# transcription/diarization is a process-wide threading semaphore; it is created
+# on first use from the 'gpu_concurrency' setting.
+_gpu_slots: Optional[threading.BoundedSemaphore] = None
+_gpu_slots_lock = threading.Lock()
+
+def _get_gpu_slots(limit: Any) -> threading.BoundedSemaphore:
+    """Returns the process-wide GPU semaphore, creating it with `limit` slots on first call."""
+    global _gpu_slots
+    with _gpu_slots_lock:
+        if _gpu_slots is None:
+            try:
+                slots = max(1, int(limit))
+            except (TypeError, ValueError):
+                log(f"Invalid gpu_concurrency '{limit}', using 1.", "WARNING")
+                slots = 1
+            _gpu_slots = threading.BoundedSemaphore(slots)
+            log(f"GPU concurrency limit set to {slots} job(s).", "DEBUG")
+        return _gpu_slots
+
+def _run_with_gpu_slot(gpu_slots: threading.BoundedSemaphore, func, *args, **kwargs):
+    """Runs a blocking GPU-bound call while holding one GPU slot (called via asyncio.to_thread)."""
+    with gpu_slots:
+        return func(*args, **kwargs)
 
 # Constants for reporting progress milestones (0-100 scale)
 PROGRESS_START = 5
@@ -50,7 +89,109 @@ PROGRESS_AFTER_AUDIO_PROCESSING = 35 # After transcription & diarization complet
 PROGRESS_AFTER_NAME_DETECT = 45      # After optional name detection
 PROGRESS_WAITING_REVIEW = 48         # Final progress state for Part 1
 
+# Fallback labels assigned by the transcriber when no real speaker could be
+# determined; they do not count as distinct speakers for name detection
+PLACEHOLDER_SPEAKER_LABELS = frozenset({"SPEAKER_UNKNOWN", "SPEAKER_ERROR"})
+
+@dataclass(slots=True)
+class IntermediatePaths:
+    """
+    Relative (for job state / API) and absolute (for file I/O) paths of Part 1's outputs.
+
+    Built once per job as plain strings, so later steps neither allocate Path
+    objects nor convert them back for open() and logging.
+    """
+    transcript_rel: str
+    transcript_abs: str
+    map_rel: str
+    map_abs: str
+    context_rel: str
+    context_abs: str
+    context_index_abs: str
+    bundle_rel: str
+    bundle_abs: str
+
+    @classmethod
+    def build(cls, transcript_rel_path: Path) -> "IntermediatePaths":
+        """Derives all output paths from the intermediate transcript's relative path."""
+        transcript_rel = os.fspath(transcript_rel_path)
+        rel_dir = os.path.dirname(transcript_rel)
+        map_rel = os.path.join(rel_dir, DEFAULT_PROPOSED_MAP_FILENAME)
+        context_rel = os.path.join(rel_dir, DEFAULT_CONTEXT_SNIPPETS_FILENAME)
+        bundle_rel = os.path.join(rel_dir, DEFAULT_BUNDLE_FILENAME)
+        # No resolve() needed: PROJECT_ROOT is already absolute and these files
+        # may not exist yet
+        root = os.fspath(PROJECT_ROOT)
+        return cls(
+            transcript_rel=transcript_rel, transcript_abs=os.path.join(root, transcript_rel),
+            map_rel=map_rel, map_abs=os.path.join(root, map_rel),
+            context_rel=context_rel, context_abs=os.path.join(root, context_rel),
+            context_index_abs=context_index_path(os.path.join(root, context_rel)),
+            bundle_rel=bundle_rel, bundle_abs=os.path.join(root, bundle_rel),
+        )
+
+def _intern_speaker_labels(segments: List[Dict[str, Any]]):
+    """
+    Makes all segments with the same speaker label share one interned string.
+
+    Transcripts (especially when decoded from a file) hold thousands of equal
+    but separate 'SPEAKER_XX' strings; sharing them cuts memory during the
+    detection pass and makes later label comparisons identity checks.
+    """
+    label_cache: Dict[str, str] = {}
+    for segment in segments:
+        speaker = segment.get("speaker")
+        if isinstance(speaker, str):
+            interned = label_cache.get(speaker)
+            if interned is None:
+                interned = label_cache[speaker] = sys.intern(speaker)
+            segment["speaker"] = interned
+
+@dataclass(slots=True)
+class Part1Context:
+    """
+    State handed from one Part 1 phase to the next.
+
+    Part 1 runs as three phases with different resource profiles:
+    _part1_prepare (CPU/IO), _part1_transcribe (GPU, holds a GPU slot) and
+    _part1_finalize (CPU/IO + LLM). Keeping the CPU/IO work out of the GPU
+    phase means a job only occupies a GPU slot while it actually uses the GPU.
+    """
+    job_id: str
+    job_config: Dict[str, Any]
+    input_audio_abs_path: Path
+    input_audio_stat: os.stat_result
+    # Audio length in seconds (None if unknown); used for duration-based scheduling
+    audio_duration: Optional[float]
+    paths: IntermediatePaths
+    intermediate_format: str
+    whisper_model: str
+    compute_type: str
+    language: Optional[str]
+    pyannote_pipeline: str
+    hf_token: Optional[str]
+    # CTranslate2 decoding workers / CPU threads for Whisper (part of the model cache key)
+    num_workers: int = 1
+    cpu_threads: int = 0
+    start_time_audio: float = 0.0
+    cache_key: Optional[str] = None
+    segments_view: Optional[SegmentsView] = None
+    # True when segments_view came from the transcription cache (nothing to store)
+    cache_hit: bool = False
+    audio_log_message: str = ""
+    # Detection result files queued for writing; removed again if the job fails
+    detection_output_paths: List[str] = field(default_factory=list)
+
 def run_part1(job_id: str, config_overrides: Dict[str, Any]):
+    """
+    Runs Part 1 of the pipeline synchronously (see run_part1_async).
+
+    Kept for the existing callers (pipeline thread in the API, CLI); each call
+    runs the coroutine on its own event loop.
+    """
+    asyncio.run(run_part1_async(job_id, config_overrides))
+
+async def run_part1_async(job_id: str, config_overrides: Dict[str, Any]):
     """
     Runs the first part of the processing pipeline:
     1. Loads and merges configuration.
@@ -60,235 +201,38 @@ def run_part1(job_id: str, config_overrides: Dict[str, Any]):
     5. Optionally runs speaker name detection and saves its results.
     6. Sets the job status to WAITING_FOR_REVIEW and stores intermediate file paths.
 
+    The steps are grouped into prepare / transcribe / finalize phases (see
+    Part1Context). Blocking work runs via asyncio.to_thread; the transcribe
+    phase additionally holds a GPU slot, so concurrent jobs serialize on the
+    GPU while their I/O- and CPU-bound phases overlap.
+
     Args:
         job_id: The unique identifier for this job.
         config_overrides: Dictionary of configuration settings overriding defaults,
                           typically from the API request.
     """
-    # Initialize local variables for clarity
-    job_config: Dict[str, Any] = {}
-    intermediate_segments: Optional[List[Dict[str, Any]]] = None
-    # Define paths as Path objects for easier manipulation
-    intermediate_transcript_path_abs: Optional[Path] = None
-    proposed_map_path_abs: Optional[Path] = None
-    context_snippets_path_abs: Optional[Path] = None
-    intermediate_transcript_path_rel: Optional[Path] = None
-    proposed_map_path_rel: Optional[Path] = None
-    context_snippets_path_rel: Optional[Path] = None
+    ctx: Optional[Part1Context] = None
+    part1_completed = False
 
     # --- Start Processing ---
-    job_manager.update_progress(job_id, PROGRESS_START, status=STATUS_RUNNING)
-    job_manager.add_log(job_id, "Pipeline Part 1 started.", "INFO")
+    with job_manager.transaction(job_id) as tx:
+        tx.status = STATUS_RUNNING
+        tx.progress = PROGRESS_START
+        tx.log("Pipeline Part 1 started.", "INFO")
 
     try:
-        # --- Step 1: Load and Merge Configuration ---
-        log(f"Step 1: Loading and merging configuration...", "DEBUG")
-        base_config = load_config() # Handles default generation & schema updates
-        job_config = merge_configs(base_config, config_overrides) # Apply job-specific overrides
-        # Store the final configuration used for this job run in the Job Manager
-        job_manager._update_job_state(job_id, {"config": job_config})
-        log(f"Part 1: Configuration prepared. Mode: {job_config.get('mode', 'N/A')}", "INFO")
-        check_stop(job_id, "configuration loading") # Check for stop request
-
-
-        # --- Step 2: Validate Input Paths and Parameters ---
-        log(f"Step 2: Validating inputs...", "DEBUG")
-        input_audio_rel_path_str = job_config.get("input_audio")
-        if not input_audio_rel_path_str:
-            raise ValueError("Configuration Error: 'input_audio' path missing.")
-        input_audio_rel_path = Path(input_audio_rel_path_str)
-        input_audio_abs_path = (PROJECT_ROOT / input_audio_rel_path).resolve()
-        # Final check: Does the resolved file exist?
-        if not input_audio_abs_path.is_file():
-             raise FileNotFoundError(f"Input audio file not found at resolved path: {input_audio_abs_path}")
-        log(f"Input audio validated: {input_audio_abs_path.name}", "INFO")
-
-
-        # --- Define and Prepare Intermediate File Paths ---
-        # Construct relative paths first (for storage in job state)
-        int_transcript_rel_str = job_config.get(
-            "intermediate_transcript_path", # Check if user specified a path in config
-            str(Path(TRANSCRIPTS_DIR_NAME) / DEFAULT_INTERMEDIATE_JSON_FILENAME) # Default path
-        )
-        intermediate_transcript_path_rel = Path(int_transcript_rel_str)
-        proposed_map_path_rel = intermediate_transcript_path_rel.with_name(DEFAULT_PROPOSED_MAP_FILENAME)
-        context_snippets_path_rel = intermediate_transcript_path_rel.with_name(DEFAULT_CONTEXT_SNIPPETS_FILENAME)
-
-        # Construct absolute paths (for file I/O)
-        intermediate_transcript_path_abs = PROJECT_ROOT / intermediate_transcript_path_rel
-        proposed_map_path_abs = PROJECT_ROOT / proposed_map_path_rel
-        context_snippets_path_abs = PROJECT_ROOT / context_snippets_path_rel
-
-        # Ensure parent directory for these intermediate files exists
-        intermediate_transcript_path_abs.parent.mkdir(parents=True, exist_ok=True)
-        log(f"Intermediate transcript relative path: {intermediate_transcript_path_rel}", "DEBUG")
-
-
-        # --- Extract Relevant Config Values ---
-        whisper_model = job_config.get("whisper_model", DEFAULT_WHISPER_MODEL)
-        compute_type = job_config.get("compute_type", DEFAULT_COMPUTE_TYPE)
-        language = job_config.get("language") # None is valid for auto-detect
-        pyannote_pipeline = job_config.get("pyannote_pipeline", DEFAULT_PYANNOTE_PIPELINE)
-        hf_token = os.environ.get("HUGGING_FACE_TOKEN") or job_config.get("hf_token")
-        name_detection_enabled = job_config.get("speaker_name_detection_enabled", True)
-
-
-        # --- Step 3: Audio Processing (Transcription & Diarization) ---
-        log(f"Step 3: Starting audio processing (Transcription & Diarization)...", "INFO")
-        job_manager.update_status(job_id, STATUS_PROCESSING_AUDIO) # Single status for combined step
-        start_time_audio = time.time()
-
-        intermediate_segments = transcribe_and_diarize(
-            input_audio_path=input_audio_abs_path,
-            whisper_model_size=whisper_model,
-            compute_type=compute_type,
-            language=language,
-            hf_token=hf_token,
-            pyannote_pipeline_name=pyannote_pipeline
-        )
-        # Check for failure
-        if intermediate_segments is None:
-             raise RuntimeError("Audio processing (transcription and diarization) failed.")
+        # Steps 1-2 and the cache lookup (CPU/IO)
+        ctx = await asyncio.to_thread(_part1_prepare, job_id, config_overrides)
 
-        elapsed_audio = round(time.time() - start_time_audio, 2)
-        job_manager.add_log(job_id, f"Audio processing finished in {elapsed_audio}s.", "SUCCESS")
+        # Step 3 audio processing (GPU) unless the cache already had the result
+        if ctx.segments_view is None:
+            gpu_slots = _get_gpu_slots(ctx.job_config.get("gpu_concurrency", 1))
+            # Wait for a free GPU slot; other jobs' non-GPU phases keep running meanwhile
+            await asyncio.to_thread(_run_with_gpu_slot, gpu_slots, _part1_transcribe, ctx)
 
-        # Save the intermediate result (raw transcript with speaker IDs)
-        try:
-            with open(intermediate_transcript_path_abs, "w", encoding='utf-8') as f:
-                 json.dump(intermediate_segments, f, indent=2, ensure_ascii=False)
-            job_manager.add_log(job_id, f"Intermediate transcript saved: {intermediate_transcript_path_rel}", "INFO")
-        except Exception as e:
-            raise RuntimeError(f"Failed to save intermediate transcript to '{intermediate_transcript_path_abs}': {e}")
-
-        # Update progress after this significant step
-        job_manager.update_progress(job_id, PROGRESS_AFTER_AUDIO_PROCESSING)
-        check_stop(job_id, "audio processing") # Check for stop request
-
-
-        # --- Step 4: Speaker Name Detection (Optional LLM step) ---
-        detected_speaker_map: Dict[str, Optional[str]] = {}
-        detection_context_snippets: Dict[int, str] = {}
-        # Determine the status to transition to after this section
-        next_status_after_step4 = STATUS_WAITING_FOR_REVIEW
-
-        if name_detection_enabled and NAME_DETECTOR_AVAILABLE:
-            log(f"Step 4: Attempting speaker name detection (LLM)...", "INFO")
-            job_manager.update_status(job_id, STATUS_DETECTING_NAMES)
-            start_time_detect = time.time()
-            try:
-                 detected_map_result, context_snippets_result = detect_speaker_names(
-                     transcript_segments=intermediate_segments, # Use the result from step 3
-                     config=job_config                     # Pass job config for LLM settings
-                 )
-                 elapsed_detect = round(time.time() - start_time_detect, 2)
-
-                 # Handle detector failure
-                 if detected_map_result is None:
-                      raise RuntimeError("Speaker name detection function failed.")
-
-                 detected_speaker_map = detected_map_result
-                 detection_context_snippets = context_snippets_result or {}
-                 job_manager.add_log(job_id, f"Speaker name detection finished in {elapsed_detect}s. Proposed map: {detected_speaker_map}", "SUCCESS")
-
-                 # Save detection results to files for the review API
-                 try:
-                      # Save proposed map (using absolute path)
-                      with open(proposed_map_path_abs, "w", encoding='utf-8') as f:
-                           json.dump(detected_speaker_map, f, indent=2, ensure_ascii=False)
-                      job_manager.add_log(job_id, f"Proposed speaker map saved: {proposed_map_path_rel}", "INFO")
-                      # Save context snippets if generated (using absolute path)
-                      if detection_context_snippets:
-                           with open(context_snippets_path_abs, "w", encoding='utf-8') as f:
-                                json.dump(detection_context_snippets, f, indent=2, ensure_ascii=False)
-                           job_manager.add_log(job_id, f"Context snippets saved: {context_snippets_path_rel}", "INFO")
-                 except Exception as e:
-                      # Log saving error but don't necessarily fail the pipeline
-                      job_manager.add_log(job_id, f"Warning: Failed to save name detection results (map/context files): {e}", "WARNING")
-
-            except Exception as e:
-                 # Treat errors during the detection step itself as critical? Let's assume yes.
-                 raise RuntimeError(f"Speaker name detection step encountered an error: {e}")
-
-            # Update progress after name detection step completes
-            job_manager.update_progress(job_id, PROGRESS_AFTER_NAME_DETECT)
-            # check_stop removed from here, moved below
-
-        elif not NAME_DETECTOR_AVAILABLE:
-             job_manager.add_log(job_id, "Speaker name detector module not found, skipping.", "WARNING")
-        else: # Name detection disabled in config
-            job_manager.add_log(job_id, "Automatic speaker name detection disabled in config.", "INFO")
-        # If skipped, map/snippets remain empty dicts, next status is still WAITING_FOR_REVIEW
-
-        # --- !! START DEBUG BLOCK !! ---
-        # Log entry into the finalization step
-        log(f"--- DEBUG: Checkpoint A - Passed Name Detection Block ---", "ERROR") # Use ERROR level for visibility
-
-        # --- Step 5: Finalize Part 1 and Set State for Review ---
-        log(f"--- DEBUG: Checkpoint B - Entering Step 5 ---", "ERROR")
-        # Variable should be set based on whether detection ran etc, but here it's always WAITING_FOR_REVIEW
-        # next_status_after_step4 = STATUS_WAITING_FOR_REVIEW # Already set
-        log(f"Step 5 Checkpoint 1: Preparing to finalize. Next status should be: '{next_status_after_step4}'", "DEBUG")
-        job_manager.add_log(job_id, "Part 1 processing complete. Preparing for review.", "INFO")
-        log(f"Step 5 Checkpoint 2: Added 'Part 1 complete' job log.", "DEBUG")
-
-        # --- Attempt to create review_info dictionary ---
-        review_info = {} # Initialize
-        try:
-            log(f"Step 5 Checkpoint 2a: Creating review_info dict...", "DEBUG")
-            # Ensure paths used here are defined and valid Path objects
-            review_info = {
-                "intermediate_transcript_path": str(intermediate_transcript_path_rel), # Relative path for API
-                "proposed_map_path": str(proposed_map_path_rel) if proposed_map_path_abs and proposed_map_path_abs.exists() else None,
-                "context_snippets_path": str(context_snippets_path_rel) if context_snippets_path_abs and context_snippets_path_abs.exists() else None,
-            }
-            log(f"Step 5 Checkpoint 3: Successfully created review_info: {review_info}", "DEBUG")
-        except Exception as e_info:
-             log(f"CRITICAL ERROR creating review_info dictionary: {e_info}", "CRITICAL")
-             # Re-raise to be caught by the main exception handler for Part 1
-             raise RuntimeError("Failed to create review_info dictionary") from e_info
-
-        # --- Move check_stop here, after potentially problematic code ---
-        try:
-             log(f"Step 5 Checkpoint 3a: Running check_stop...", "DEBUG")
-             check_stop(job_id, "before final state update") # Check for stop request here
-             log(f"Step 5 Checkpoint 4: Passed check_stop.", "DEBUG")
-        except InterruptedError as ie:
-              # Re-raise immediately if stop was requested here to trigger correct handling
-              raise ie
-        except Exception as e_stop:
-             log(f"CRITICAL ERROR during check_stop call: {e_stop}", "CRITICAL")
-             raise RuntimeError("Failed during stop check") from e_stop
-
-
-        # --- Attempt the final state update ---
-        log(f"Step 5 Checkpoint 5: Attempting final state update call to JobManager...", "DEBUG")
-        update_successful = False # Initialize
-        try:
-             # Use the internal method for atomic update
-             update_successful = job_manager._update_job_state(job_id, {
-                 "status": next_status_after_step4, # Should be STATUS_WAITING_FOR_REVIEW
-                 "progress": PROGRESS_WAITING_REVIEW,
-                 "review_data_paths": review_info # The dictionary created above
-             })
-        except Exception as e_update:
-             log(f"CRITICAL ERROR during final _update_job_state call: {e_update}", "CRITICAL")
-             log(traceback.format_exc(), "ERROR")
-             # Raise error to be caught by the main handler, ensuring job status becomes FAILED
-             raise RuntimeError("Failed during final job state update") from e_update
-
-        # --- Log result of update ---
-        log(f"Step 5 Checkpoint 6: Result of final state update call was: {update_successful}", "DEBUG")
-        if not update_successful:
-             # This might happen if the job was somehow removed, log critically.
-             log(f"CRITICAL WARNING: Final state update call for Part 1 failed (returned False). Job might be stuck (job_id: {job_id})!", "CRITICAL")
-             # Raise an error to ensure the job status becomes FAILED
-             raise RuntimeError(f"Job Manager failed to update final state for job {job_id} in Part 1.")
-        else:
-             log(f"Step 5 Checkpoint 7: Final state for Part 1 set successfully in Job Manager.", "DEBUG")
-
-        log(f"--- DEBUG: Checkpoint C - Exiting Step 5 successfully ---", "ERROR") # Final success log for try block
-        # --- !! END DEBUG BLOCK !! ---
+        # Saving, Step 4 name detection and Step 5 hand-over for review (CPU/IO + LLM)
+        await _part1_finalize(ctx)
+        part1_completed = True
 
     # --- Exception Handling for the Entire Part 1 ---
     except FileNotFoundError as e:
@@ -309,13 +253,400 @@ def run_part1(job_id: str, config_overrides: Dict[str, Any]):
         # Catch failures explicitly raised from specific steps within Part 1
         error_msg = f"Pipeline Part 1 failed during processing step: {e}"
         log(error_msg, "ERROR")
-        log(traceback.format_exc(), "DEBUG") # Log traceback for runtime errors
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG") # Log traceback for runtime errors
         job_manager.set_error(job_id, error_msg)
     except Exception as e:
         # Catch any other unexpected critical errors during execution
         error_msg = f"Unexpected critical error in Pipeline Part 1: {e}"
-        log(error_msg, "CRITICAL")
-        log(traceback.format_exc(), "ERROR") # Log full traceback for critical errors
+        log(error_msg, "CRITICAL", exc_info=True) # Include full traceback for critical errors
         job_manager.set_error(job_id, error_msg)
+    finally:
+        # Remove detection results of a failed/stopped job in one background task
+        # (nothing to do, and no syscalls, when detection never wrote anything)
+        if not part1_completed and ctx is not None and ctx.detection_output_paths:
+            submit_cleanup(ctx.detection_output_paths)
+
+# --- Part 1 Phases ---
+
+def _part1_prepare(job_id: str, config_overrides: Dict[str, Any]) -> Part1Context:
+    """
+    Prepare phase (CPU/IO): loads the configuration, validates the input,
+    builds output paths, starts model preloading and looks up the transcription cache.
+
+    Raises:
+        ValueError, FileNotFoundError, InterruptedError: Handled by run_part1_async.
+    """
+    # --- Step 1: Load and Merge Configuration ---
+    log(f"Step 1: Loading and merging configuration...", "DEBUG")
+    base_config = load_config() # Handles default generation & schema updates
+    job_config = merge_configs(base_config, config_overrides) # Apply job-specific overrides
+    # Store the final configuration used for this job run in the Job Manager
+    job_manager._update_job_state(job_id, {"config": job_config})
+    log(f"Part 1: Configuration prepared. Mode: {job_config.get('mode', 'N/A')}", "INFO")
+    check_stop(job_id, "configuration loading") # Check for stop request
+
+
+    # --- Step 2: Validate Input Paths and Parameters ---
+    log(f"Step 2: Validating inputs...", "DEBUG")
+    input_audio_rel_path_str = job_config.get("input_audio")
+    if not input_audio_rel_path_str:
+        raise ValueError("Configuration Error: 'input_audio' path missing.")
+    # Lexical normalization only: PROJECT_ROOT is already absolute, and resolve()
+    # would stat every path component to follow symlinks. normpath gives the same
+    # canonical form for the usual '../' or './' segments without any syscall.
+    input_audio_abs_path = Path(os.path.normpath(os.path.join(PROJECT_ROOT, input_audio_rel_path_str)))
+    # Final check: Does the file exist? A single stat serves this check
+    # and is reused below (cache fingerprint, size logging), which matters when
+    # the audio lives on a network share where every stat is a round trip.
+    try:
+        input_audio_stat = os.stat(input_audio_abs_path)
+    except OSError:
+        input_audio_stat = None
+    if input_audio_stat is None or not stat.S_ISREG(input_audio_stat.st_mode):
+         raise FileNotFoundError(f"Input audio file not found at resolved path: {input_audio_abs_path}")
+    # Header-only duration read (None for formats libsndfile cannot parse)
+    audio_duration = get_audio_duration(input_audio_abs_path)
+    duration_info = f", {audio_duration:.1f}s" if audio_duration is not None else ""
+    log(f"Input audio validated: {input_audio_abs_path.name} ({input_audio_stat.st_size / (1024 * 1024):.1f} MB{duration_info})", "INFO")
+    # Start pulling the audio into the page cache while the remaining setup runs
+    prefetch_file(input_audio_abs_path)
+
+
+    # --- Define and Prepare Intermediate File Paths ---
+    # Construct relative paths first (for storage in job state)
+    int_transcript_rel_str = job_config.get(
+        "intermediate_transcript_path", # Check if user specified a path in config
+        DEFAULT_INTERMEDIATE_TRANSCRIPT_REL # Default path
+    )
+    # On-disk format of the intermediate transcript (msgpack if installed, else JSON)
+    intermediate_format = resolve_segment_format(job_config.get("intermediate_format", "msgpack"))
+    # Build all relative/absolute output paths once
+    paths = IntermediatePaths.build(
+        Path(int_transcript_rel_str).with_suffix(SEGMENT_FORMAT_SUFFIXES[intermediate_format])
+    )
+
+    # Ensure parent directory for these intermediate files exists
+    os.makedirs(os.path.dirname(paths.transcript_abs), exist_ok=True)
+    log(f"Intermediate transcript relative path: {paths.transcript_rel}", "DEBUG")
+
+
+    # --- Deferred Heavy Imports (torch / faster-whisper / pyannote) ---
+    # Imported on first use; subsequent runs hit sys.modules
+    from src.transcriber import preload_models, auto_compute_type, \
+         DEFAULT_WHISPER_MODEL, DEFAULT_COMPUTE_TYPE, DEFAULT_PYANNOTE_PIPELINE
+
+    # --- Extract Relevant Config Values ---
+    compute_type = job_config.get("compute_type", DEFAULT_COMPUTE_TYPE)
+    if compute_type == "auto":
+        # Resolved before the cache key and preload, so both use the concrete type
+        compute_type = auto_compute_type()
+        log(f"Auto-selected Whisper compute type: {compute_type}", "INFO")
+    ctx = Part1Context(
+        job_id=job_id,
+        job_config=job_config,
+        input_audio_abs_path=input_audio_abs_path,
+        input_audio_stat=input_audio_stat,
+        audio_duration=audio_duration,
+        paths=paths,
+        intermediate_format=intermediate_format,
+        whisper_model=job_config.get("whisper_model", DEFAULT_WHISPER_MODEL),
+        compute_type=compute_type,
+        language=job_config.get("language"), # None is valid for auto-detect
+        pyannote_pipeline=job_config.get("pyannote_pipeline", DEFAULT_PYANNOTE_PIPELINE),
+        hf_token=_ENV_HF_TOKEN or job_config.get("hf_token"),
+        num_workers=job_config.get("whisper_num_workers") or 1,
+        cpu_threads=job_config.get("whisper_cpu_threads") or 0,
+    )
+    compile_diarization = job_config.get("diarization_backend", "eager") == "torch_compile"
+
+
+    # --- Step 3 (preparation): Model Preload and Cache Lookup ---
+    log(f"Step 3: Starting audio processing (Transcription & Diarization)...", "INFO")
+    job_manager.update_status(job_id, STATUS_PROCESSING_AUDIO) # Single status for combined step
+    ctx.start_time_audio = time.time()
+
+    # Warm the process-wide model cache in the background while the cache lookup
+    # (content hashing) runs; transcribe_and_diarize then picks up the loaded models.
+    threading.Thread(
+        target=preload_models,
+        args=(ctx.whisper_model, ctx.compute_type, ctx.pyannote_pipeline, ctx.hf_token, compile_diarization,
+              ctx.num_workers, ctx.cpu_threads),
+        daemon=True
+    ).start()
+
+    # Reuse a previous result for identical audio + settings if caching is enabled
+    if job_config.get("cache_enabled", True):
+        audio_digest = audio_cache.get_audio_digest(input_audio_abs_path, input_audio_stat)
+        if audio_digest:
+            ctx.cache_key = audio_cache.make_key(audio_digest, ctx.whisper_model, ctx.compute_type, ctx.language, ctx.pyannote_pipeline,
+                                                 job_config.get("whisper_batch_size") or 0)
+            ctx.segments_view = audio_cache.get(ctx.cache_key, intermediate_format)
+    if ctx.segments_view is not None:
+        ctx.cache_hit = True
+        ctx.audio_log_message = f"CACHE HIT: Reusing cached transcription and diarization results ({len(ctx.segments_view.segments)} segments)."
+    return ctx
+
+
+def _part1_transcribe(ctx: Part1Context):
+    """
+    Transcribe phase (GPU): runs transcription and diarization and caches the result.
+    Called while holding a GPU slot; does no other work.
+
+    Raises:
+        RuntimeError: If audio processing fails.
+    """
+    from src.transcriber import transcribe_and_diarize
+    job_config = ctx.job_config
+    intermediate_segments = transcribe_and_diarize(
+        input_audio_path=ctx.input_audio_abs_path,
+        whisper_model_size=ctx.whisper_model,
+        compute_type=ctx.compute_type,
+        language=ctx.language,
+        hf_token=ctx.hf_token,
+        pyannote_pipeline_name=ctx.pyannote_pipeline,
+        batch_size=job_config.get("whisper_batch_size") or 0,
+        feature_device=job_config.get("feature_device", "auto"), # Resolved by the transcriber
+        parallel_diarization=job_config.get("parallel_diarization", False),
+        compile_diarization=job_config.get("diarization_backend", "eager") == "torch_compile",
+        num_workers=ctx.num_workers,
+        cpu_threads=ctx.cpu_threads
+    )
+    # Check for failure
+    if intermediate_segments is None:
+         raise RuntimeError("Audio processing (transcription and diarization) failed.")
+
+    elapsed_audio = round(time.time() - ctx.start_time_audio, 2)
+    ctx.audio_log_message = f"Audio processing finished in {elapsed_audio}s."
+    # Serialize once; the same bytes feed the cache and the intermediate file
+    # (long JSON transcripts are stream-encoded by each writer instead)
+    ctx.segments_view = SegmentsView.from_segments(intermediate_segments, ctx.intermediate_format)
+
+
+async def _part1_finalize(ctx: Part1Context):
+    """
+    Finalize phase (CPU/IO + LLM): stores the result, runs optional name
+    detection and hands the job over for review.
+
+    Raises:
+        RuntimeError, InterruptedError: Handled by run_part1_async.
+    """
+    job_id = ctx.job_id
+    job_config = ctx.job_config
+    paths = ctx.paths
+    segments_view = ctx.segments_view
+    intermediate_segments = segments_view.segments
+    name_detection_enabled = job_config.get("speaker_name_detection_enabled", True)
+    # Write transcript, proposed map and context as one bundle file instead of separate files
+    use_bundle = job_config.get("intermediate_bundle", False)
+
+    # Store a fresh result for future runs (failures are logged, not fatal); done
+    # here rather than in the transcribe phase so the GPU slot is not held for I/O
+    if ctx.cache_key and not ctx.cache_hit:
+        await asyncio.to_thread(audio_cache.put, ctx.cache_key, segments_view)
+
+    _intern_speaker_labels(intermediate_segments)
+
+    # Save the intermediate result (raw transcript with speaker IDs) via the background
+    # writer. The write is independent of name detection, so both run concurrently; the
+    # result is awaited before the job is handed over for review (Step 5).
+    # (In bundle mode everything is written together once name detection is done.)
+    transcript_write_future = None if use_bundle else submit_segments_write(paths.transcript_abs, segments_view)
+
+    # Record the outcome and update progress after this significant step
+    with job_manager.transaction(job_id) as tx:
+        tx.log(ctx.audio_log_message, "SUCCESS")
+        tx.progress = PROGRESS_AFTER_AUDIO_PROCESSING
+    check_stop(job_id, "audio processing") # Check for stop request
+
+
+    # --- Step 4: Speaker Name Detection (Optional LLM step) ---
+    detected_speaker_map: Dict[str, Optional[str]] = {}
+    detection_context_snippets: Dict[int, str] = {}
+    # Background writes of detection results: (path, future, log message on success)
+    detection_write_futures: List[Tuple[str, Future, str]] = []
+    # Set once the corresponding file has actually been written by this job
+    wrote_proposed_map = False
+    wrote_context_snippets = False
+    # The snippet file is only usable together with its index
+    context_write_failed = False
+    # Determine the status to transition to after this section
+    next_status_after_step4 = STATUS_WAITING_FOR_REVIEW
+
+    # Cheap pre-filter: the LLM cannot assign distinct names with a single speaker
+    # (monologues, podcasts with one host) or very little text, so skip the
+    # round-trip in those cases. Missing/placeholder labels are not speakers.
+    unique_speakers = {
+        speaker for speaker in (segment.get("speaker") for segment in intermediate_segments)
+        if speaker and speaker not in PLACEHOLDER_SPEAKER_LABELS
+    }
+    min_detection_segments = job_config.get("name_detect_min_segments") or 0
+    detection_worthwhile = len(unique_speakers) > 1 and len(intermediate_segments) >= min_detection_segments
+
+    name_detector_available = NAME_DETECTOR_AVAILABLE
+    if name_detection_enabled and name_detector_available and detection_worthwhile:
+        try:
+            from src.speaker_name_detector import detect_speaker_names
+        except ImportError as e:
+            log(f"Speaker name detector could not be imported: {e}", "WARNING")
+            name_detector_available = False
+
+    if name_detection_enabled and name_detector_available and detection_worthwhile:
+        log(f"Step 4: Attempting speaker name detection (LLM)...", "INFO")
+        job_manager.update_status(job_id, STATUS_DETECTING_NAMES)
+        start_time_detect = time.time()
+        try:
+             detected_map_result, context_snippets_result = await asyncio.to_thread(
+                 detect_speaker_names,
+                 transcript_segments=intermediate_segments, # Use the result from step 3
+                 config=job_config                     # Pass job config for LLM settings
+             )
+             elapsed_detect = round(time.time() - start_time_detect, 2)
+
+             # Handle detector failure
+             if detected_map_result is None:
+                  raise RuntimeError("Speaker name detection function failed.")
+
+             detected_speaker_map = detected_map_result
+             detection_context_snippets = context_snippets_result or {}
+             detection_log_message = f"Speaker name detection finished in {elapsed_detect}s. Proposed map: {detected_speaker_map}"
+
+             # Queue detection results for the review API on the background writer
+             # (bundle mode writes them together with the transcript below)
+             if not use_bundle:
+                  detection_write_futures.append((
+                      paths.map_abs,
+                      submit_write(paths.map_abs, dumps_json(detected_speaker_map)),
+                      f"Proposed speaker map saved: {paths.map_rel}"
+                  ))
+             if detection_context_snippets and not use_bundle:
+                  # Snippet text file + index sidecar (see file_io.encode_context_snippets)
+                  context_text, context_index = encode_context_snippets(detection_context_snippets)
+                  detection_write_futures.append((
+                      paths.context_abs,
+                      submit_write(paths.context_abs, context_text),
+                      f"Context snippets saved: {paths.context_rel}"
+                  ))
+                  detection_write_futures.append((
+                      paths.context_index_abs,
+                      submit_write(paths.context_index_abs, context_index),
+                      "Context snippet index saved."
+                  ))
+             ctx.detection_output_paths.extend(path for path, _, _ in detection_write_futures)
 
-# --- End of pipeline_part1.py ---
\ No newline at end of file
+        except Exception as e:
+             # Treat errors during the detection step itself as critical? Let's assume yes.
+             raise RuntimeError(f"Speaker name detection step encountered an error: {e}")
+
+        # Record the outcome and update progress after name detection step completes
+        with job_manager.transaction(job_id) as tx:
+            tx.log(detection_log_message, "SUCCESS")
+            tx.progress = PROGRESS_AFTER_NAME_DETECT
+        # check_stop removed from here, moved below
+
+    elif not name_detector_available:
+         job_manager.add_log(job_id, "Speaker name detector module not found, skipping.", "WARNING")
+    elif not name_detection_enabled: # Name detection disabled in config
+        job_manager.add_log(job_id, "Automatic speaker name detection disabled in config.", "INFO")
+    elif len(unique_speakers) <= 1: # Nothing to tell apart
+        job_manager.add_log(job_id, "Single-speaker audio detected; skipping LLM name detection.", "INFO")
+    else: # Too little text for detection to help
+        job_manager.add_log(job_id, f"Skipping name detection: only {len(intermediate_segments)} segments (minimum {min_detection_segments}).", "INFO")
+    # If skipped, map/snippets remain empty dicts, next status is still WAITING_FOR_REVIEW
+
+    # Bundle mode: one file (header, transcript, proposed map, context), one fsync
+    bundle_offsets: Optional[Dict[str, List[int]]] = None
+    bundle_write_future: Optional[Future] = None
+    if use_bundle:
+        bundle_sections: Dict[str, Any] = {"transcript": intermediate_segments}
+        if detected_speaker_map:
+            bundle_sections["proposed_map"] = detected_speaker_map
+        if detection_context_snippets:
+            bundle_sections["context_snippets"] = detection_context_snippets
+        bundle_write_future = submit_bundle_write(paths.bundle_abs, bundle_sections)
+
+    # Wait for the background writes to surface any I/O error (job logs batched)
+    with job_manager.transaction(job_id) as tx:
+        if bundle_write_future is not None:
+            try:
+                bundle_offsets = await asyncio.wrap_future(bundle_write_future)
+                tx.log(f"Intermediate bundle saved: {paths.bundle_rel} (sections: {', '.join(bundle_offsets)})", "INFO")
+            except Exception as e:
+                raise RuntimeError(f"Failed to save intermediate bundle to '{paths.bundle_abs}': {e}")
+        else:
+            try:
+                await asyncio.wrap_future(transcript_write_future)
+                tx.log(f"Intermediate transcript saved: {paths.transcript_rel}", "INFO")
+            except Exception as e:
+                raise RuntimeError(f"Failed to save intermediate transcript to '{paths.transcript_abs}': {e}")
+        for output_path, write_future, saved_message in detection_write_futures:
+            try:
+                await asyncio.wrap_future(write_future)
+                tx.log(saved_message, "INFO")
+                if output_path == paths.map_abs:
+                    wrote_proposed_map = True
+                else:
+                    wrote_context_snippets = True
+            except Exception as e:
+                # Log saving error but don't necessarily fail the pipeline
+                if output_path != paths.map_abs:
+                    context_write_failed = True
+                tx.log(f"Warning: Failed to save name detection results (map/context files): {e}", "WARNING")
+        wrote_context_snippets = wrote_context_snippets and not context_write_failed
+
+    # --- Step 5: Finalize Part 1 and Set State for Review ---
+    # Checkpoint tracing is only emitted when PART1_TRACE=1 (see _CHECKPOINT_TRACE)
+    if _CHECKPOINT_TRACE: log(f"Part 1 trace: entering Step 5. Next status: '{next_status_after_step4}'", "DEBUG")
+    # Job logs for the final state update, applied together with it (single lock acquisition)
+    final_log_entries = [("Part 1 processing complete. Preparing for review.", "INFO")]
+
+    # --- Create review_info dictionary ---
+    try:
+        # Only reference detection files written by this job; checking exists() here
+        # would cost a stat each and could pick up stale files from an earlier job
+        if bundle_offsets is not None:
+            # Consumers read the sections from the bundle via file_io.read_bundle
+            review_info = {
+                "intermediate_transcript_path": None,
+                "proposed_map_path": None,
+                "context_snippets_path": None,
+                "bundle_path": paths.bundle_rel,
+                "bundle_offsets": bundle_offsets,
+            }
+        else:
+            review_info = {
+                "intermediate_transcript_path": paths.transcript_rel, # Relative path for API
+                "proposed_map_path": paths.map_rel if wrote_proposed_map else None,
+                "context_snippets_path": paths.context_rel if wrote_context_snippets else None,
+            }
+        if _CHECKPOINT_TRACE: log(f"Part 1 trace: review_info created: {review_info}", "DEBUG")
+    except Exception as e_info:
+         log(f"CRITICAL ERROR creating review_info dictionary: {e_info}", "CRITICAL")
+         # Re-raise to be caught by the main exception handler for Part 1
+         raise RuntimeError("Failed to create review_info dictionary") from e_info
+
+    # --- Last stop check before handing the job over for review ---
+    # (InterruptedError propagates to the main handler for correct STOPPED handling)
+    check_stop(job_id, "before final state update")
+
+    # --- Final state update ---
+    try:
+         # Apply status, progress, review paths and the queued logs in one atomic update
+         update_successful = job_manager.batch_update(job_id, {
+             "status": next_status_after_step4, # Should be STATUS_WAITING_FOR_REVIEW
+             "progress": PROGRESS_WAITING_REVIEW,
+             "review_data_paths": review_info # The dictionary created above
+         }, final_log_entries)
+    except Exception as e_update:
+         log(f"CRITICAL ERROR during final batch_update call: {e_update}", "CRITICAL", exc_info=True)
+         # Raise error to be caught by the main handler, ensuring job status becomes FAILED
+         raise RuntimeError("Failed during final job state update") from e_update
+
+    if not update_successful:
+         # This might happen if the job was somehow removed, log critically.
+         log(f"CRITICAL WARNING: Final state update call for Part 1 failed (returned False). Job might be stuck (job_id: {job_id})!", "CRITICAL")
+         # Raise an error to ensure the job status becomes FAILED
+         raise RuntimeError(f"Job Manager failed to update final state for job {job_id} in Part 1.")
+
+    if _CHECKPOINT_TRACE: log(f"Part 1 trace: final state set, exiting Step 5.", "DEBUG")
+
+# --- End of pipeline_part1.py ---
@@ -1,10 +1,10 @@
 # src/pipeline_part2.py
 import time
 import os
-import json
 import traceback
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from concurrent.futures import Future
+from typing import Dict, Any, List, Optional, Tuple
 
 # Import application components
 from src.job_manager import job_manager, STATUS_MAPPING_SPEAKERS, \
@@ -12,25 +12,34 @@ from src.job_manager import job_manager, STATUS_MAPPING_SPEAKERS, \
     STATUS_FAILED, STATUS_STOPPED # Import needed statuses
 # Import core processing functions
 from src.speaker_mapping import apply_speaker_mapping
-from src.transcript_reformatter import format_transcript_html
+from src.transcript_reformatter import render_transcript_outputs, transcript_analysis_text
 # Import LLM functions/modules (these now expect text input)
 from src.utils.llm import summarize_transcript
 from src.analysis_tasks import advanced_tasks
 # Import helpers and utilities
-from src.utils.pipeline_helpers import check_stop
-from src.utils.config_schema import PROJECT_ROOT
-from src.database_logger import log_job_to_db, get_db_path
-from src.utils.log import log
+from src.utils.pipeline_helpers import check_stop, maybe_update_progress, flush_progress, forget_progress
+from src.utils.config_schema import PROJECT_ROOT, RESULTS_FOLDER_NAME, RESULTS_FOLDER
+from src.utils.file_io import read_segments, read_bundle, dumps_json, loads_json, ensure_dir
+from src.utils.io_queue import submit_write
+from src.database_logger import submit_job_log, get_db_path
+from src.utils.log import log, log_enabled
 
 # --- Constants ---
-RESULTS_DIR_NAME = "results"
+RESULTS_DIR_NAME = RESULTS_FOLDER_NAME # Shared with the download routes and results index
 TRANSCRIPTS_DIR_NAME = "transcripts"
-RESULTS_DIR = PROJECT_ROOT / RESULTS_DIR_NAME
+RESULTS_DIR = RESULTS_FOLDER
 TRANSCRIPTS_DIR = PROJECT_ROOT / TRANSCRIPTS_DIR_NAME
 DEFAULT_FINAL_JSON_FILENAME = "final_transcript.json"
 DEFAULT_HTML_TRANSCRIPT_FILENAME = "transcript.html"
 DEFAULT_SUMMARY_FILENAME = "summary.txt"
 DEFAULT_ADVANCED_ANALYSIS_FILENAME = "advanced_analysis.json"
+# Output locations that do not depend on the job (relative paths are reported to the UI)
+HTML_TRANSCRIPT_PATH_REL = Path(RESULTS_DIR_NAME) / DEFAULT_HTML_TRANSCRIPT_FILENAME
+SUMMARY_PATH_REL = Path(RESULTS_DIR_NAME) / DEFAULT_SUMMARY_FILENAME
+ADVANCED_ANALYSIS_PATH_REL = Path(RESULTS_DIR_NAME) / DEFAULT_ADVANCED_ANALYSIS_FILENAME
+HTML_TRANSCRIPT_PATH = PROJECT_ROOT / HTML_TRANSCRIPT_PATH_REL
+SUMMARY_PATH = PROJECT_ROOT / SUMMARY_PATH_REL
+ADVANCED_ANALYSIS_PATH = PROJECT_ROOT / ADVANCED_ANALYSIS_PATH_REL
 
 # Progress constants
 PROGRESS_AFTER_MAPPING = 50
@@ -39,6 +48,28 @@ PROGRESS_AFTER_ANALYSIS = 95
 PROGRESS_COMPLETE = 100
 
 
+# --- Helper Functions ---
+def _wait_for_writes(job_id: str, pending_writes: Dict[str, Tuple[Future, Path]]):
+    """
+    Waits for queued output writes and records each outcome in the job log.
+
+    Write failures are logged as warnings, not raised; the final result only
+    lists files that exist on disk.
+
+    Args:
+        job_id: The job the outputs belong to.
+        pending_writes: Output label -> (write Future, relative path). Emptied on return.
+    """
+    for label, (future, rel_path) in pending_writes.items():
+        try:
+            future.result()
+            job_manager.add_log(job_id, f"{label} saved: {rel_path}", "SUCCESS")
+        except Exception as e:
+            job_manager.add_log(job_id, f"Warning: Failed to save {label}: {e}", "WARNING")
+            if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
+    pending_writes.clear()
+
+
 # --- Pipeline Part 2 Function ---
 def run_part2(
     job_id: str,
@@ -57,6 +88,8 @@ def run_part2(
     job_config: Optional[Dict[str, Any]] = None
     final_segments: Optional[List[Dict[str, Any]]] = None
     intermediate_transcript_path: Optional[Path] = None
+    intermediate_transcript_path_rel: Optional[Path] = None
+    final_transcript_path_rel: Optional[Path] = None
     start_time_total: Optional[float] = None
     final_transcript_path: Optional[Path] = None
     html_transcript_path: Optional[Path] = None
@@ -64,7 +97,9 @@ def run_part2(
     advanced_analysis_path: Optional[Path] = None
     summary_result: Optional[str] = None
     advanced_results: Optional[Dict[str, Any]] = None
-
+    # Output files are written on the background writer (src.utils.io_queue) while
+    # the pipeline moves on; all writes are collected before the job is finalized
+    pending_writes: Dict[str, Tuple[Future, Path]] = {}
 
     # --- Retrieve Job Info and Prepare ---
     try:
@@ -73,17 +108,23 @@ def run_part2(
         job_config = job_data.get("config")
         if not isinstance(job_config, dict): raise ValueError(f"Job config missing or invalid for job {job_id}.")
         review_paths = job_data.get("review_data_paths", {})
-        intermediate_transcript_rel_path_str = review_paths.get("intermediate_transcript_path")
+        # Bundle mode (intermediate_bundle): the transcript is a section of the bundle file
+        bundle_offsets = review_paths.get("bundle_offsets") if review_paths.get("bundle_path") else None
+        intermediate_transcript_rel_path_str = review_paths.get("bundle_path") or review_paths.get("intermediate_transcript_path")
         if not intermediate_transcript_rel_path_str: raise ValueError("Intermediate transcript path missing.")
-        intermediate_transcript_path = (PROJECT_ROOT / Path(intermediate_transcript_rel_path_str)).resolve()
+        # Resolve all per-job paths once (normpath is purely lexical; no filesystem walk)
+        intermediate_transcript_path = Path(os.path.normpath(os.path.join(PROJECT_ROOT, intermediate_transcript_rel_path_str)))
+        intermediate_transcript_path_rel = intermediate_transcript_path.relative_to(PROJECT_ROOT) # ValueError if outside the project
         if not intermediate_transcript_path.is_file(): raise FileNotFoundError(f"Intermediate transcript file not found: {intermediate_transcript_path}")
+        final_transcript_path_rel = intermediate_transcript_path_rel.parent / DEFAULT_FINAL_JSON_FILENAME
+        final_transcript_path = intermediate_transcript_path.parent / DEFAULT_FINAL_JSON_FILENAME
         start_time_total = job_data.get("start_time")
     except (ValueError, FileNotFoundError, Exception) as e:
          log(f"Error preparing for Part 2 for job {job_id}: {e}", "ERROR")
          job_manager.set_error(job_id, f"Failed to initialize Part 2: {e}")
          # Attempt DB log even on init failure
          final_job_data_for_db = job_manager.get_status(job_id); db_path=get_db_path(job_config)
-         if final_job_data_for_db: log_job_to_db(final_job_data_for_db, db_path)
+         if final_job_data_for_db: submit_job_log(final_job_data_for_db, db_path)
          return
 
 
@@ -92,8 +133,10 @@ def run_part2(
     try:
         # --- Step 1: Load Intermediate Transcript ---
         log(f"Step 1: Loading intermediate segments from {intermediate_transcript_path.name}", "INFO")
-        with open(intermediate_transcript_path, "r", encoding='utf-8') as f:
-            segments_to_process = json.load(f)
+        if bundle_offsets is not None:
+            segments_to_process = read_bundle(intermediate_transcript_path, bundle_offsets, ["transcript"]).get("transcript")
+        else:
+            segments_to_process = read_segments(intermediate_transcript_path) # JSON or msgpack, by suffix
         if not segments_to_process or not isinstance(segments_to_process, list):
             raise RuntimeError("Loaded intermediate transcript data is empty or invalid.")
 
@@ -102,19 +145,27 @@ def run_part2(
         log(f"Step 2: Applying final speaker map...", "INFO") # Map details logged in job manager if needed
         final_segments = apply_speaker_mapping(segments_to_process, final_speaker_map)
         if final_segments is None: raise RuntimeError("Applying final speaker mapping failed.")
-        job_manager.add_log(job_id, "Final speaker name assignment complete.", "SUCCESS")
-        job_manager.update_progress(job_id, PROGRESS_AFTER_MAPPING)
+        maybe_update_progress(job_id, PROGRESS_AFTER_MAPPING, log_entry=("Final speaker name assignment complete.", "SUCCESS"))
+
+        # Render the HTML transcript and the LLM input text in one pass over the
+        # final segments; Steps 4 and 5 only write/consume the results
+        html_output_string: Optional[str] = None
+        rendered_analysis_text: Optional[str] = None
+        try:
+            html_output_string, rendered_analysis_text = render_transcript_outputs(final_segments)
+        except Exception as e:
+            log(f"Rendering transcript outputs failed: {e}", "WARNING")
+            if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
 
         # --- Step 3: Save Final Transcript JSON ---
-        # Construct relative and absolute paths
-        final_transcript_path_rel = intermediate_transcript_path.relative_to(PROJECT_ROOT).parent / DEFAULT_FINAL_JSON_FILENAME
-        final_transcript_path = PROJECT_ROOT / final_transcript_path_rel
         log(f"Step 3: Saving final transcript to {final_transcript_path_rel}...", "INFO")
         try:
-            final_transcript_path.parent.mkdir(parents=True, exist_ok=True) # Ensure directory exists
-            with open(final_transcript_path, "w", encoding='utf-8') as f:
-                 json.dump(final_segments, f, indent=2, ensure_ascii=False)
-            job_manager.add_log(job_id, f"Final transcript JSON saved: {final_transcript_path_rel}", "INFO")
+            ensure_dir(final_transcript_path.parent) # Ensure directory exists (checked once per process)
+            pending_writes["Final transcript JSON"] = (
+                # Written atomically (temp file + os.replace), so readers never see a partial file;
+                # the segments stay in memory, so the written pages need not stay cached
+                submit_write(final_transcript_path, dumps_json(final_segments), drop_cache=True), final_transcript_path_rel
+            )
         except Exception as e:
             job_manager.add_log(job_id, f"Warning: Failed to save final transcript JSON: {e}", "WARNING")
             # Consider if this should be a critical error
@@ -123,23 +174,22 @@ def run_part2(
         # --- Step 4: Generate and Save HTML Transcript ---
         job_manager.update_status(job_id, STATUS_REFORMATTING)
         log(f"Step 4: Generating HTML transcript...", "INFO")
-        html_transcript_path_rel = Path(RESULTS_DIR_NAME) / DEFAULT_HTML_TRANSCRIPT_FILENAME
-        html_transcript_path = PROJECT_ROOT / html_transcript_path_rel
+        html_transcript_path = HTML_TRANSCRIPT_PATH
         try:
-            html_output_string = format_transcript_html(final_segments)
             if html_output_string:
-                 html_transcript_path.parent.mkdir(parents=True, exist_ok=True)
-                 with open(html_transcript_path, "w", encoding='utf-8') as f: f.write(html_output_string)
-                 job_manager.add_log(job_id, f"HTML transcript saved: {html_transcript_path_rel}", "SUCCESS")
+                 ensure_dir(html_transcript_path.parent)
+                 pending_writes["HTML transcript"] = (
+                      submit_write(html_transcript_path, html_output_string.encode("utf-8")), HTML_TRANSCRIPT_PATH_REL
+                 )
             else: job_manager.add_log(job_id, "HTML generation returned empty string.", "WARNING")
         except Exception as e:
             job_manager.add_log(job_id, f"Warning: HTML transcript generation/saving failed: {e}", "WARNING")
-            log(traceback.format_exc(), "DEBUG")
-        job_manager.update_progress(job_id, PROGRESS_AFTER_REFORMAT)
+            if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
         check_stop(job_id, "HTML reformatting")
 
         # --- Step 5: LLM Analysis ---
-        job_manager.update_status(job_id, STATUS_ANALYZING)
+        # Reformatting done and analysis started, published as one transition
+        maybe_update_progress(job_id, PROGRESS_AFTER_REFORMAT, status=STATUS_ANALYZING)
         mode = job_config.get("mode", "fast")
         log(f"Step 5: Starting LLM analysis (Mode: {mode})...", "INFO")
         start_time_analysis = time.time()
@@ -147,23 +197,19 @@ def run_part2(
         # --- Load and Prepare Transcript Text (Once) ---
         analysis_input_text: Optional[str] = None
         try:
-            # Ensure the final transcript file (with names) was created successfully
-            if not final_transcript_path or not final_transcript_path.is_file():
-                 raise FileNotFoundError(f"Final transcript JSON for analysis not found at {final_transcript_path}")
-
-            log(f"Loading text from {final_transcript_path.name} for LLM analysis...", "DEBUG")
-            with open(final_transcript_path, "r", encoding='utf-8') as f:
-                 # Reload segments (could optimize by reusing 'final_segments' if guaranteed valid)
-                 loaded_final_segments = json.load(f)
-            if not isinstance(loaded_final_segments, list):
-                 raise ValueError("Invalid format in final transcript JSON (expected list).")
-
-            # Construct text string including speaker names (important for context)
-            text_lines = [
-                f"{segment.get('speaker_name', 'Unknown')}: {segment.get('text', '')}"
-                for segment in loaded_final_segments if isinstance(segment, dict) and segment.get('text')
-            ]
-            analysis_input_text = "\n".join(text_lines).strip()
+            # Use the text rendered from the in-memory segments alongside the HTML;
+            # re-reading the file is only a fallback if rendering failed
+            analysis_input_text = rendered_analysis_text
+            if analysis_input_text is None:
+                 _wait_for_writes(job_id, pending_writes) # The final JSON may still be queued
+                 if not final_transcript_path or not final_transcript_path.is_file():
+                      raise FileNotFoundError(f"Final transcript JSON for analysis not found at {final_transcript_path}")
+                 log(f"Loading text from {final_transcript_path.name} for LLM analysis...", "DEBUG")
+                 loaded_final_segments = loads_json(final_transcript_path.read_bytes())
+                 if not isinstance(loaded_final_segments, list):
+                      raise ValueError("Invalid format in final transcript JSON (expected list).")
+                 # Text string includes speaker names (important for context)
+                 analysis_input_text = transcript_analysis_text(loaded_final_segments)
 
             if not analysis_input_text:
                  log("No text content found in final transcript JSON. Skipping LLM analysis.", "WARNING")
@@ -184,13 +230,11 @@ def run_part2(
 
             try: # Inner try for the analysis execution block
                 extra_context = job_config.get("extra_context_prompt", "")
-                # Define output paths
-                summary_path_rel = Path(RESULTS_DIR_NAME) / DEFAULT_SUMMARY_FILENAME
-                advanced_analysis_path_rel = Path(RESULTS_DIR_NAME) / DEFAULT_ADVANCED_ANALYSIS_FILENAME
-                summary_path = PROJECT_ROOT / summary_path_rel
-                advanced_analysis_path = PROJECT_ROOT / advanced_analysis_path_rel
+                # Output paths
+                summary_path = SUMMARY_PATH
+                advanced_analysis_path = ADVANCED_ANALYSIS_PATH
                 # Ensure results directory exists
-                advanced_analysis_path.parent.mkdir(parents=True, exist_ok=True)
+                ensure_dir(advanced_analysis_path.parent)
 
                 if mode == "fast":
                      log(f"Running LLM 'fast' mode (Summary)...", "INFO")
@@ -198,30 +242,29 @@ def run_part2(
                      summary_result = summarize_transcript(analysis_input_text, job_config, extra_context)
                      # -------------------------------------------------
                      if summary_result is None: raise RuntimeError("Summary generation failed.")
-                     try:
-                          with open(summary_path, "w", encoding='utf-8') as f: f.write(summary_result)
-                          job_manager.add_log(job_id, f"Summary saved: {summary_path_rel}", "SUCCESS")
-                     except IOError as e: job_manager.add_log(job_id, f"Failed to save summary file: {e}", "ERROR")
+                     pending_writes["Summary"] = (submit_write(summary_path, summary_result.encode("utf-8")), SUMMARY_PATH_REL)
 
                 elif mode == "advanced":
                      log(f"Running LLM 'advanced' mode...", "INFO")
-                     results_dict: Dict[str, Any] = {}
-                     tasks_to_run = { "summary": advanced_tasks.summary, "intent": advanced_tasks.intent, "actions": advanced_tasks.actions, "emotion": advanced_tasks.emotion, "questions": advanced_tasks.questions, "legal": advanced_tasks.legal }
-                     total_tasks = len(tasks_to_run) + 1; completed_tasks = 0
+                     total_tasks = len(advanced_tasks.ADVANCED_TASKS) + 1; completed_tasks = 0
 
-                     for task_name, task_func in tasks_to_run.items():
-                          check_stop(job_id, f"advanced LLM task '{task_name}'")
-                          job_manager.add_log(job_id, f"Running LLM task: {task_name}...", "INFO")
-                          # --- Pass text string to advanced task functions ---
-                          task_result = task_func(analysis_input_text, job_config, extra_context)
-                          # ---------------------------------------------------
-                          results_dict[task_name] = task_result
+                     def _on_task_done(task_name: str, task_result: Optional[str]):
+                          """Records one finished analysis task (called in completion order)."""
+                          nonlocal completed_tasks
                           log_level = "SUCCESS" if task_result is not None else "WARNING"
-                          job_manager.add_log(job_id, f"LLM task '{task_name}' finished.", log_level)
                           completed_tasks += 1
-                          # Update progress incrementally
+                          # Update progress incrementally (coalesced into steps of PROGRESS_MIN_DELTA),
+                          # together with the task's log entry
                           current_progress = PROGRESS_AFTER_REFORMAT + int((completed_tasks / total_tasks) * (PROGRESS_AFTER_ANALYSIS - PROGRESS_AFTER_REFORMAT))
-                          job_manager.update_progress(job_id, current_progress)
+                          maybe_update_progress(job_id, current_progress, log_entry=(f"LLM task '{task_name}' finished.", log_level))
+                          check_stop(job_id, f"advanced LLM task '{task_name}'")
+
+                     # All tasks run as one concurrent batch sharing the transcript prompt prefix
+                     check_stop(job_id, "advanced LLM tasks")
+                     job_manager.add_log(job_id, f"Running LLM tasks: {', '.join(advanced_tasks.ADVANCED_TASKS)}...", "INFO")
+                     results_dict: Dict[str, Any] = advanced_tasks.batch_advanced(
+                          analysis_input_text, job_config, extra_context, on_task_done=_on_task_done
+                     )
 
                      check_stop(job_id, "final LLM analysis")
                      job_manager.add_log(job_id, "Running final aggregating LLM analysis...", "INFO")
@@ -231,13 +274,9 @@ def run_part2(
                      job_manager.add_log(job_id, "Final aggregating analysis completed.", "SUCCESS")
                      advanced_results = results_dict
 
-                     try: # Save advanced results JSON
-                          with open(advanced_analysis_path, "w", encoding='utf-8') as f:
-                              json.dump(advanced_results, f, indent=2, ensure_ascii=False)
-                          job_manager.add_log(job_id, f"Advanced analysis results saved: {advanced_analysis_path_rel}", "SUCCESS")
-                     except Exception as e:
-                          job_manager.add_log(job_id, f"Failed to save advanced analysis JSON: {e}", "ERROR")
-                          log(traceback.format_exc(), "DEBUG")
+                     pending_writes["Advanced analysis results"] = (
+                          submit_write(advanced_analysis_path, dumps_json(advanced_results)), ADVANCED_ANALYSIS_PATH_REL
+                     )
                 else:
                      job_manager.add_log(job_id, f"Unknown analysis mode '{mode}'. Skipping LLM analysis.", "WARNING")
 
@@ -249,19 +288,21 @@ def run_part2(
              # Case where analysis_input_text was None
              log("Skipping LLM analysis because transcript text could not be prepared.", "WARNING")
 
-        job_manager.update_progress(job_id, PROGRESS_AFTER_ANALYSIS)
+        maybe_update_progress(job_id, PROGRESS_AFTER_ANALYSIS)
+        flush_progress(job_id) # Publish the final Step 5 value even if it was coalesced
         check_stop(job_id, "LLM analysis completion")
 
 
         # --- Step 6: Finalize Job ---
         log(f"Step 6: Finalizing job results for {job_id}...", "INFO")
+        _wait_for_writes(job_id, pending_writes) # Outputs must be on disk before they are reported
         # Prepare the final result dictionary for JobManager and DB logging
         final_result_data = {
-            "intermediate_transcript_path": str(intermediate_transcript_path.relative_to(PROJECT_ROOT)) if intermediate_transcript_path else None,
+            "intermediate_transcript_path": str(intermediate_transcript_path_rel) if intermediate_transcript_path_rel else None,
             "final_transcript_json_path": str(final_transcript_path_rel) if final_transcript_path and final_transcript_path.exists() else None,
-            "html_transcript_path": str(html_transcript_path_rel) if html_transcript_path and html_transcript_path.exists() else None,
-            "summary_path": str(summary_path_rel) if mode == "fast" and summary_path and summary_path.exists() else None,
-            "advanced_analysis_path": str(advanced_analysis_path_rel) if mode == "advanced" and advanced_analysis_path and advanced_analysis_path.exists() else None,
+            "html_transcript_path": str(HTML_TRANSCRIPT_PATH_REL) if html_transcript_path and html_transcript_path.exists() else None,
+            "summary_path": str(SUMMARY_PATH_REL) if mode == "fast" and summary_path and summary_path.exists() else None,
+            "advanced_analysis_path": str(ADVANCED_ANALYSIS_PATH_REL) if mode == "advanced" and advanced_analysis_path and advanced_analysis_path.exists() else None,
             # Include direct content
             "summary_content": summary_result if mode == "fast" else (advanced_results.get("summary") if advanced_results else None),
             "intent_result": advanced_results.get("intent") if advanced_results else None,
@@ -270,8 +311,9 @@ def run_part2(
             "questions_result": advanced_results.get("questions") if advanced_results else None,
             "legal_result": advanced_results.get("legal") if advanced_results else None,
             "final_analysis_result": advanced_results.get("final_analysis") if advanced_results else None,
-            # Include actual data used/produced for DB logging
-            "final_transcript_segments": final_segments, # Transcript with names
+            # Include actual data used/produced for DB logging. The transcript itself is
+            # not embedded (it can be many MB and the result is served on every status
+            # poll); the in-memory segments are handed to the DB logger directly.
             "speaker_mapping_used": final_speaker_map, # Map applied
          }
         # Set final result and mark job as COMPLETED
@@ -289,24 +331,30 @@ def run_part2(
     except (RuntimeError, ValueError, FileNotFoundError) as e: # Catch specific expected errors
         error_msg = f"Pipeline Part 2 failed: {e}"
         log(error_msg, "ERROR")
-        log(traceback.format_exc(), "DEBUG")
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
         job_manager.set_error(job_id, error_msg)
     except Exception as e: # Catch unexpected errors
         error_msg = f"Unexpected critical error in Pipeline Part 2: {e}"
-        log(error_msg, "CRITICAL")
-        log(traceback.format_exc(), "ERROR")
+        log(error_msg, "CRITICAL", exc_info=True)
         job_manager.set_error(job_id, error_msg)
 
     # --- Database Logging (Always Attempted) ---
     finally:
+        forget_progress(job_id)
         log(f"Pipeline Part 2 execution finished for job {job_id}. Attempting database logging...", "INFO")
         final_job_data_for_db = job_manager.get_status(job_id)
         if final_job_data_for_db:
             log(f"Final job status for DB logging: {final_job_data_for_db.get('status')}", "DEBUG")
             # Pass config retrieved at start of Part 2 to get correct DB path
             db_path = get_db_path(job_config if job_config else None)
-            logged_ok = log_job_to_db(final_job_data_for_db, db_path)
-            job_manager.add_log(job_id, f"Database logging attempt complete (Success: {logged_ok}).", "INFO" if logged_ok else "WARNING")
+            # Written by the background DB logger; the outcome is added to the job log when done
+            submit_job_log(
+                final_job_data_for_db, db_path,
+                on_done=lambda logged_ok: job_manager.add_log(
+                    job_id, f"Database logging attempt complete (Success: {logged_ok}).", "INFO" if logged_ok else "WARNING"
+                ),
+                transcript_segments=final_segments,
+            )
         else:
             log(f"CRITICAL: Could not retrieve final job data for {job_id} in Part 2 finally block! DB log skipped.", "CRITICAL")
 
@@ -1,22 +1,32 @@
 # src/routes/file_routes.py
 import os
 import uuid
+import mimetypes
+import shutil
 import traceback
 from pathlib import Path
-from flask import Blueprint, request, jsonify, abort, send_from_directory
+from urllib.parse import quote
+from flask import Blueprint, Response, current_app, request, jsonify, abort, send_from_directory
+from werkzeug.exceptions import NotFound
 from werkzeug.utils import secure_filename
 
 # Import utilities and constants
-from src.utils.log import log
-# Import PROJECT_ROOT for constructing paths safely
-from src.utils.config_schema import PROJECT_ROOT
-
-# --- Define Paths Used by this Blueprint ---
-# Consider getting these from app.config in a real application
-UPLOAD_FOLDER_NAME = "audio"
-UPLOAD_FOLDER = PROJECT_ROOT / UPLOAD_FOLDER_NAME
-RESULTS_FOLDER_NAME = "results"
-RESULTS_FOLDER = PROJECT_ROOT / RESULTS_FOLDER_NAME
+from src.utils.log import log, log_lazy, log_enabled
+from src.utils.file_io import ensure_dir
+from src.utils.results_index import is_known_result
+# Folder locations used by this blueprint (defined once next to PROJECT_ROOT)
+from src.utils.config_schema import UPLOAD_FOLDER_NAME, UPLOAD_FOLDER, RESULTS_FOLDER
+
+# --- Upload Streaming ---
+# Uploads are copied to disk in large blocks (fewer read/write syscalls than
+# FileStorage.save(), which copies in 16 KB chunks)
+UPLOAD_COPY_BUFFER_SIZE = 4 * 1024 * 1024 # 4 MB
+
+# --- Resolved Directories ---
+# Process-lifetime constants, resolved once here instead of building paths per request
+# (resolve() does not need the folders to exist yet)
+UPLOAD_DIR_ABS = str(UPLOAD_FOLDER.resolve())
+RESULTS_DIR_ABS = str(RESULTS_FOLDER.resolve())
 
 # --- Define the Blueprint ---
 file_bp = Blueprint(
@@ -25,6 +35,42 @@ file_bp = Blueprint(
     # url_prefix='/api/files' # Optional URL prefix
 )
 
+# --- Helper Functions ---
+
+def _safe_name(name: str) -> str:
+    """
+    Returns `name` if it is already a safe plain file name, otherwise aborts with 400.
+
+    Names with path separators are rejected before running secure_filename;
+    secure_filename never returns separators, so its result needs no further
+    basename step and only has to equal the input.
+    """
+    if "/" in name or "\\" in name:
+        log(f"API Warning: Download request blocked for filename with path separators: '{name}'", "WARNING")
+        abort(400, description="Invalid filename provided.") # Bad Request
+    safe_basename = secure_filename(name)
+    if not safe_basename or safe_basename != name:
+        log(f"API Warning: Download request blocked for potentially unsafe filename. Original='{name}', Sanitized='{safe_basename}'", "WARNING")
+        abort(400, description="Invalid filename provided.") # Bad Request
+    return safe_basename
+
+def _accel_redirect_response(prefix: str, safe_basename: str) -> Response:
+    """
+    Builds an empty download response telling nginx to serve the file itself.
+
+    nginx maps `prefix` (an 'internal' location aliased to RESULTS_FOLDER) to
+    the file and sends it with sendfile(2); no file bytes pass through Python.
+
+    Args:
+        prefix: The internal location, e.g. '/_protected/results/'.
+        safe_basename: The sanitized file name inside RESULTS_FOLDER.
+    """
+    mimetype = mimetypes.guess_type(safe_basename)[0] or "application/octet-stream"
+    response = Response(status=200, mimetype=mimetype)
+    response.headers["X-Accel-Redirect"] = f"{prefix.rstrip('/')}/{quote(safe_basename)}"
+    response.headers["Content-Disposition"] = f"attachment; filename=\"{safe_basename}\""
+    return response
+
 # --- File Routes ---
 
 @file_bp.route("/upload_audio", methods=["POST"])
@@ -56,12 +102,18 @@ def upload_audio():
              log(f"API Warning: Original filename ('{file.filename}') was unsafe or empty, using generated name: {filename}", "WARNING")
 
         # Construct the full path to save the file
-        save_path = UPLOAD_FOLDER / filename
+        save_path = os.path.join(UPLOAD_DIR_ABS, filename)
         # Ensure the upload directory exists (should be handled at app startup ideally)
-        UPLOAD_FOLDER.mkdir(parents=True, exist_ok=True)
+        ensure_dir(UPLOAD_DIR_ABS)
 
-        # Save the file stream to the designated path
-        file.save(str(save_path))
+        # Stream the upload to the designated path in large blocks
+        with open(save_path, "wb", buffering=0) as out:
+            shutil.copyfileobj(file.stream, out, length=UPLOAD_COPY_BUFFER_SIZE)
+            # Hint that the written pages need not stay cached (Linux/POSIX only);
+            # Part 1 prefetches the file again when it starts reading it
+            if hasattr(os, "posix_fadvise"):
+                try: os.posix_fadvise(out.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+                except OSError: pass
 
         # Construct the relative path to return to the client
         # This path should be relative to the location defined by UPLOAD_FOLDER_NAME
@@ -77,7 +129,7 @@ def upload_audio():
     except Exception as e:
         # Catch potential exceptions during file saving (e.g., disk full, permissions)
         log(f"API Error: Failed to save uploaded file '{file.filename}': {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG") # Log traceback for server debugging
+        log_lazy("DEBUG", traceback.format_exc) # Log traceback for server debugging
         # Return 500 Internal Server Error
         return jsonify({"error": "Failed to save file on server"}), 500
 
@@ -87,36 +139,54 @@ def download_result_file(filename):
     """
     API endpoint to allow downloading of result files stored in the RESULTS_FOLDER.
     Uses Flask's send_from_directory for secure file serving.
+
+    Responses are conditional: they carry an ETag and Last-Modified (a matching
+    If-None-Match / If-Modified-Since gets a 304), advertise 'Accept-Ranges:
+    bytes' and answer Range requests with 206 partial content, so resumed
+    downloads and media seeking only transfer the requested bytes.
     """
-    log(f"API: Request to download result file: {filename}", "INFO")
+    # Per-request logging at DEBUG only (range requests hit this route many times per
+    # download); the check skips building the f-strings when DEBUG is off
+    debug_enabled = log_enabled("DEBUG")
+    if debug_enabled: log(f"API: Request to download result file: {filename}", "DEBUG")
 
-    # --- Sanitize Filename ---
-    # Use secure_filename and then extract only the basename to prevent path manipulation
-    safe_basename = Path(secure_filename(filename)).name
-    # Double-check that sanitization didn't result in an empty name or fundamentally change it
-    if not safe_basename or safe_basename != filename:
-         log(f"API Warning: Download request blocked for potentially unsafe filename. Original='{filename}', Sanitized='{safe_basename}'", "WARNING")
-         abort(400, description="Invalid filename provided.") # Bad Request
+    # --- Sanitize Filename (aborts with 400 if it is not a plain, safe name) ---
+    safe_basename = _safe_name(filename)
+
+    # Unknown names are answered from the in-memory index, without a stat()
+    if not is_known_result(safe_basename):
+        log(f"API Error: Download failed - result file not found: {safe_basename}", "ERROR")
+        abort(404, description="Result file not found.") # Not Found
 
     # --- Serve File ---
     try:
+        # Behind nginx: let it send the file (see _accel_redirect_response)
+        accel_prefix = current_app.config.get("X_ACCEL_REDIRECT_PREFIX")
+        if accel_prefix:
+            if not os.path.isfile(os.path.join(RESULTS_DIR_ABS, safe_basename)):
+                raise FileNotFoundError(safe_basename)
+            return _accel_redirect_response(accel_prefix, safe_basename)
+
         # Use Flask's built-in function for safely sending files from a directory
         # It handles security checks (e.g., preventing access outside the directory)
         # and sets appropriate Content-Disposition headers.
-        log(f"API: Attempting to send file from directory '{RESULTS_FOLDER}' with safe path '{safe_basename}'", "DEBUG")
+        if debug_enabled: log(f"API: Attempting to send file from directory '{RESULTS_DIR_ABS}' with safe path '{safe_basename}'", "DEBUG")
         return send_from_directory(
-                directory=str(RESULTS_FOLDER), # Directory must be an absolute path string
+                directory=RESULTS_DIR_ABS,     # Directory must be an absolute path string
                 path=safe_basename,            # The sanitized filename
-                as_attachment=True             # Suggest to the browser to download the file
+                as_attachment=True,            # Suggest to the browser to download the file
+                conditional=True,              # 304 / 206 handling (If-None-Match, If-Modified-Since, Range)
+                etag=True,                     # ETag from mtime + size, no hashing of the content
+                max_age=0                      # Revalidate on every request instead of heuristic caching
             )
-    except FileNotFoundError:
+    except (FileNotFoundError, NotFound): # send_from_directory raises NotFound for missing files
         # Log error and return 404 if the file doesn't exist in the results directory
         log(f"API Error: Download failed - result file not found: {safe_basename}", "ERROR")
         abort(404, description="Result file not found.") # Not Found
     except Exception as e:
         # Catch other potential server errors (e.g., file permission issues)
         log(f"API Error: Server error during result file download ('{safe_basename}'): {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG")
+        log_lazy("DEBUG", traceback.format_exc)
         abort(500, description="Server error during file download.") # Internal Server Error
 
 # --- End of src/routes/file_routes.py ---
\ No newline at end of file
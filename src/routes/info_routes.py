@@ -1,25 +1,84 @@
 # src/routes/info_routes.py
+import os
+import time
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
 from flask import Blueprint, jsonify
 
 # Import utilities
-from src.utils.log import log
-from src.utils.config_schema import parse_schema_for_ui
+from src.utils.log import log, log_lazy
+from src.utils.config_schema import parse_schema_for_ui, DEFAULT_SCHEMA_PATH
+from src.utils.route_helpers import make_etag, not_modified_response, cacheable_json_response
 from src.utils.llm import get_local_models
-# --- Import the device detection utility ---
-# Note: Ensure this import path is correct relative to your structure
-# Assuming _get_compute_device is still accessible via transcriber for now
-# A cleaner approach might be to move _get_compute_device to a common util module
-try:
-    from src.transcriber import _get_compute_device
-except ImportError:
-    log("Could not import _get_compute_device from src.transcriber in info_routes. Using fallback 'cpu'.", "ERROR")
-    # Provide a fallback if import fails, though this indicates a potential structure issue
-    def _get_compute_device(): return "cpu"
+# Device detection only needs torch, not the transcription stack
+from src.utils.device import get_compute_device
+
+# --- Info Gathering Pool ---
+# The schema parse (disk), 'ollama list' (subprocess) and device probe (torch) are
+# independent; running them side by side makes a cold request cost the slowest
+# of the three instead of their sum
+_info_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="config-info")
+
+# --- Single-flight Cache ---
+# A burst of /config_info requests (several tabs opening at once) is answered by
+# one gather: the first request does the work under the lock, the others wait
+# for it and reuse its result for a few seconds.
+CONFIG_INFO_TTL_SECONDS = 5
+_config_info_lock = threading.Lock()
+_config_info_cache: Dict[str, Any] = {"time": 0.0, "value": None} # value: (data, etag, schema_mtime)
 
 # Define the Blueprint object
 info_bp = Blueprint('info', __name__, url_prefix='/api/v1')
 
+# --- Helper Functions ---
+
+def _gather_config_info(response_data: Dict[str, Any]) -> Tuple[str, Optional[float]]:
+    """
+    Fills `response_data` with the schema, local models and compute device.
+
+    Returns:
+        The response ETag (schema mtime, model names, device) and the schema file mtime.
+
+    Raises:
+        Exception: Unexpected errors; `response_data` keeps whatever was gathered.
+    """
+    # Start all three lookups at once
+    schema_future = _info_executor.submit(parse_schema_for_ui)
+    models_future = _info_executor.submit(get_local_models)
+    device_future = _info_executor.submit(get_compute_device)
+
+    # Get the parsed schema for the UI
+    schema_info = schema_future.result()
+    if not schema_info:
+         log("API Error: Failed to load/parse schema for /config_info.", "ERROR")
+         # Still try to return models and device info if possible
+         response_data["schema"] = {} # Indicate schema loading failed
+    else:
+         response_data["schema"] = schema_info
+
+    # Get available local LLM models
+    local_models = models_future.result()
+    response_data["available_models"] = local_models
+
+    # --- Get detected compute device ---
+    try:
+        detected_device = device_future.result() # Re-raises any detection error
+        response_data["detected_device"] = detected_device
+        log(f"Detected compute device for config info: {detected_device}", "DEBUG")
+    except Exception as device_err:
+         log(f"API Error: Failed to detect compute device: {device_err}", "ERROR")
+         response_data["detected_device"] = "error" # Indicate error during detection
+
+    # --- Validator for conditional requests ---
+    try:
+        schema_mtime = os.stat(DEFAULT_SCHEMA_PATH).st_mtime
+    except OSError:
+        schema_mtime = None
+    etag = make_etag(schema_mtime, tuple(local_models or ()), response_data["detected_device"], bool(response_data["schema"]))
+    return etag, schema_mtime
+
 # --- Info Routes ---
 
 @info_bp.route("/config_info", methods=["GET"])
@@ -27,42 +86,41 @@ def get_config_info():
     """
     API endpoint that returns UI-friendly schema information,
     locally available Ollama models, and the detected compute device.
+
+    The response carries an ETag derived from the schema file's mtime, the
+    model names and the device; a matching If-None-Match gets a 304.
+    Concurrent requests share one gather (see CONFIG_INFO_TTL_SECONDS).
     """
     log("API: Request received for /config_info", "INFO")
     response_data = {"schema": {}, "available_models": [], "detected_device": "unknown"}
     try:
-        # Get the parsed schema for the UI
-        schema_info = parse_schema_for_ui()
-        if not schema_info:
-             log("API Error: Failed to load/parse schema for /config_info.", "ERROR")
-             # Still try to return models and device info if possible
-             response_data["schema"] = {} # Indicate schema loading failed
-        else:
-             response_data["schema"] = schema_info
-
-        # Get available local LLM models
-        local_models = get_local_models()
-        response_data["available_models"] = local_models
-
-        # --- Get detected compute device ---
-        try:
-            detected_device = _get_compute_device() # Call the utility function
-            response_data["detected_device"] = detected_device
-            log(f"Detected compute device for config info: {detected_device}", "DEBUG")
-        except Exception as device_err:
-             log(f"API Error: Failed to detect compute device: {device_err}", "ERROR")
-             response_data["detected_device"] = "error" # Indicate error during detection
+        with _config_info_lock:
+            cached = _config_info_cache["value"]
+            if cached is not None and time.monotonic() - _config_info_cache["time"] < CONFIG_INFO_TTL_SECONDS:
+                response_data, etag, schema_mtime = cached
+            else:
+                etag, schema_mtime = _gather_config_info(response_data)
+                # Only successful gathers are shared
+                _config_info_cache["value"] = (response_data, etag, schema_mtime)
+                _config_info_cache["time"] = time.monotonic()
+
+        # --- Conditional response (304 if the client's copy is current) ---
+        not_modified = not_modified_response(etag)
+        if not_modified is not None:
+            log("API: Config info unchanged, returning 304.", "DEBUG")
+            return not_modified
 
         # --- Return combined data ---
         log(f"API: Returning config info - Schema fields: {len(response_data['schema'])}, Models: {len(response_data['available_models'])}, Device: {response_data['detected_device']}", "DEBUG")
-        return jsonify(response_data)
+        return cacheable_json_response(response_data, etag, last_modified=schema_mtime)
 
     except Exception as e:
         # Catch unexpected errors during info gathering
         log(f"API Error: Unexpected error while gathering config info: {e}", "CRITICAL")
-        log(traceback.format_exc(), "ERROR")
-        # Return 500 but try to include any partial data gathered if helpful
-        response_data["error"] = "Failed to retrieve complete server configuration info."
-        return jsonify(response_data), 500
+        log_lazy("ERROR", traceback.format_exc)
+        # Return 500 but try to include any partial data gathered if helpful.
+        # Built as a new dict: response_data may be the shared cached payload.
+        error_data = {**response_data, "error": "Failed to retrieve complete server configuration info."}
+        return jsonify(error_data), 500
 
 # --- End of src/routes/info_routes.py ---
\ No newline at end of file
@@ -1,26 +1,54 @@
 # src/routes/pipeline_routes.py
-import threading
+import os
 import traceback
-import json
-import time
-from pathlib import Path
+from functools import lru_cache
 from typing import Dict, Any, Optional
-from flask import Blueprint, request, jsonify, abort, current_app
+from flask import Blueprint, Response, request, jsonify, abort, current_app
 from werkzeug.utils import secure_filename
 
-from src.job_manager import job_manager
+from src.job_manager import job_manager, STATUS_COMPLETED, STATUS_FAILED, STATUS_STOPPED
 from src.pipeline_part1 import run_part1
-from src.utils.log import log
-from src.utils.route_helpers import parse_config_overrides_from_form
-from src.utils.config_schema import PROJECT_ROOT
-
-UPLOAD_FOLDER_NAME = "audio"
-UPLOAD_FOLDER = PROJECT_ROOT / UPLOAD_FOLDER_NAME
-RESULTS_FOLDER_NAME = "results"
-RESULTS_FOLDER = PROJECT_ROOT / RESULTS_FOLDER_NAME
+from src.utils.log import log, log_lazy
+from src.utils.route_helpers import parse_config_overrides_from_form, json_response
+from src.utils.pipeline_helpers import submit_pipeline_job, PIPELINE_MAX_WORKERS
+from src.utils.config_schema import UPLOAD_FOLDER_NAME, UPLOAD_FOLDER
+from src.utils.file_io import dumps_json
 
 pipeline_bp = Blueprint('pipeline', __name__, url_prefix='/api/v1')
 
+# --- Status Stream Settings ---
+# Comment line sent when nothing changed for this long, so dead connections are noticed (seconds)
+STATUS_STREAM_HEARTBEAT = 15.0
+
+# Resolved once at import, as a string prefix: the upload path checks work on plain strings
+_UPLOAD_ROOT_STR = str(UPLOAD_FOLDER.resolve()) + os.sep
+
+# --- Helper Functions ---
+
+@lru_cache(maxsize=512)
+def _validate_audio_rel(raw_path: str) -> str:
+    """
+    Validates a submitted audio path and returns its relative path for the job config.
+
+    Only the file name is used (secure_filename), looked up in the upload
+    folder. Successful validations are cached by the raw form value, so
+    starting the same upload again skips the resolve()/stat calls; failures
+    raise and are never cached. Uploads are never deleted by the app; a file
+    removed by hand after validation makes the job fail when Part 1 opens it.
+
+    Raises:
+        ValueError: If no safe file name can be derived or the path escapes the upload folder.
+        FileNotFoundError: If the file does not exist in the upload folder.
+    """
+    # secure_filename never returns separators or '..', so the joined path stays a direct child of the folder
+    safe_filename = secure_filename(os.path.basename(raw_path))
+    if not safe_filename: raise ValueError("Invalid filename derived from path.")
+    # Containment is checked lexically on the normalized path, before touching the filesystem
+    abs_path_str = os.path.normpath(os.path.join(_UPLOAD_ROOT_STR, safe_filename))
+    if not abs_path_str.startswith(_UPLOAD_ROOT_STR): raise ValueError("Security check failed: Resolved path is outside.")
+    if not os.path.isfile(abs_path_str): raise FileNotFoundError(f"Audio file '{safe_filename}' not found in upload directory.")
+    return os.path.join(UPLOAD_FOLDER_NAME, safe_filename)
+
 @pipeline_bp.route("/start_pipeline", methods=["POST"])
 def start_pipeline_route():
     # --- Unchanged ---
@@ -30,13 +58,7 @@ def start_pipeline_route():
     if not relative_audio_path_from_form: return jsonify({"error": "Missing 'relative_audio_path'"}), 400
     validated_relative_path_for_config: Optional[str] = None
     try:
-        submitted_path = Path(relative_audio_path_from_form)
-        safe_filename = secure_filename(submitted_path.name)
-        if not safe_filename: raise ValueError("Invalid filename derived from path.")
-        abs_path = (UPLOAD_FOLDER / safe_filename).resolve()
-        if not abs_path.is_file(): raise FileNotFoundError(f"Audio file '{safe_filename}' not found in upload directory.")
-        if not abs_path.is_relative_to(UPLOAD_FOLDER.resolve()): raise ValueError("Security check failed: Resolved path is outside.")
-        validated_relative_path_for_config = str(Path(UPLOAD_FOLDER_NAME) / safe_filename)
+        validated_relative_path_for_config = _validate_audio_rel(relative_audio_path_from_form)
         log(f"Validated input path. Using relative path for config: '{validated_relative_path_for_config}'", "DEBUG")
     except (ValueError, FileNotFoundError, Exception) as e:
         log(f"API Error: /start_pipeline invalid 'relative_audio_path' ('{relative_audio_path_from_form}'): {e}", "WARNING")
@@ -48,41 +70,73 @@ def start_pipeline_route():
     try:
         job_id = job_manager.create_job(initial_config=config_overrides)
         log(f"API: Created job {job_id} via /start_pipeline.", "INFO")
-        pipeline_thread = threading.Thread(target=run_part1, args=(job_id, config_overrides), daemon=True)
-        pipeline_thread.start()
-        log(f"API: Started Part 1 thread for job {job_id}.", "INFO")
+        # Runs on the bounded pipeline pool; waits in QUEUED while all workers are busy
+        submit_pipeline_job(run_part1, job_id, config_overrides)
+        log(f"API: Submitted Part 1 for job {job_id} (pipeline workers: {PIPELINE_MAX_WORKERS}).", "INFO")
         return jsonify({"job_id": job_id}), 202 # Accepted
     except Exception as e:
-        log(f"API Error: Failed to create/start job for Part 1: {e}", "CRITICAL"); log(traceback.format_exc(), "ERROR")
+        log(f"API Error: Failed to create/start job for Part 1: {e}", "CRITICAL"); log_lazy("ERROR", traceback.format_exc)
         return jsonify({"error": "Failed to start pipeline job due to internal server error"}), 500
 
-# --- RESTORED get_job_status with <string:job_id> converter ---
 @pipeline_bp.route("/status/<string:job_id>", methods=["GET"]) # Use <string:job_id> converter
 def get_job_status(job_id):
-    """API endpoint to get the status of a specific job, using string converter."""
-    log(f"API: Status request for job {job_id} (using string route)", "DEBUG")
-    status_data = job_manager.get_status(job_id) # Get data from JobManager
+    """
+    API endpoint to get the status of a specific job.
 
-    if status_data:
-        try:
-            log(f"Attempting to jsonify status_data for job {job_id}. Keys: {list(status_data.keys())}", "DEBUG")
-            return jsonify(status_data) # Attempt to return REAL JSON response
-        except TypeError as e:
-            log(f"API Error: Failed to jsonify job status data for job {job_id}. Error: {e}", "CRITICAL")
-            safe_log_data = {}
-            for k, v in status_data.items():
-                 try: json.dumps({k: v}); safe_log_data[k] = v
-                 except TypeError: safe_log_data[k] = f"<{type(v).__name__} - Not Serializable>"
-                 except Exception as dump_e: safe_log_data[k] = f"<Error serializing field '{k}': {dump_e}>"
-            try: log(f"Problematic status_data (sanitized): {json.dumps(safe_log_data, indent=2)}", "ERROR")
-            except Exception as final_dump_e: log(f"Could not dump sanitized status data: {final_dump_e}", "ERROR")
-            return jsonify(error="Internal Server Error", message="Failed to serialize job status data."), 500
-        except Exception as e:
-             log(f"API Error: Unexpected error during jsonify for job {job_id}: {e}", "CRITICAL"); log(traceback.format_exc(), "ERROR")
-             return jsonify(error="Internal Server Error", message="Unexpected error processing job status."), 500
-    else:
+    JobManager stores job state JSON-safe, so it is encoded directly with no
+    serialization fallback on the request path.
+    """
+    log(f"API: Status request for job {job_id}", "DEBUG")
+    status_data = job_manager.get_status(job_id) # Get data from JobManager
+    if not status_data:
         log(f"API Warning: Status request for non-existent job ID '{job_id}'.", "WARNING")
         abort(404, description=f"Job with ID '{job_id}' not found.")
+    return json_response(status_data)
+
+
+@pipeline_bp.route("/status_stream/<string:job_id>", methods=["GET"])
+def stream_job_status(job_id):
+    """
+    Server-Sent Events stream of a job's status.
+
+    Sends the same JSON as /status/<job_id>, but only when the job's version
+    counter moved, instead of the client re-fetching the full state every few
+    seconds. Ends with an 'end' event once the job is finished. /status stays
+    available for clients without EventSource.
+
+    Each open stream holds one server thread, blocked in
+    job_manager.wait_for_change() until the job changes (no polling); the
+    threaded Flask server handles a handful of UI clients fine.
+    """
+    if job_manager.get_version(job_id) is None:
+        abort(404, description=f"Job with ID '{job_id}' not found.")
+    log(f"API: Status stream opened for job {job_id}", "DEBUG")
+
+    def generate():
+        last_version = -1 # Sends the current state right away
+        while True:
+            version = job_manager.wait_for_change(job_id, last_version, timeout=STATUS_STREAM_HEARTBEAT)
+            if version is None: # Job disappeared
+                yield "event: end\ndata: {}\n\n"
+                return
+            if version == last_version: # Timed out without a change
+                yield ": keep-alive\n\n"
+                continue
+            status_data = job_manager.get_status(job_id)
+            if status_data is None:
+                yield "event: end\ndata: {}\n\n"
+                return
+            last_version = status_data.get("version", version)
+            yield f"data: {dumps_json(status_data, indent=False)}\n\n"
+            if status_data.get("status") in (STATUS_COMPLETED, STATUS_FAILED, STATUS_STOPPED):
+                yield "event: end\ndata: {}\n\n"
+                log(f"API: Status stream for job {job_id} finished.", "DEBUG")
+                return
+
+    response = Response(generate(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no" # Don't let a reverse proxy buffer the stream
+    return response
 
 
 @pipeline_bp.route("/stop_pipeline/<job_id>", methods=["POST"])
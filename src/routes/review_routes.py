@@ -1,23 +1,26 @@
 # src/routes/review_routes.py
-import threading
-import json
+import os
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Optional, Tuple
 
 # Define SecurityError if not already imported
 class SecurityError(Exception):
     """Custom exception for security-related errors."""
     pass
-from flask import Blueprint, request, jsonify, abort
+from flask import Blueprint, request, jsonify, abort, send_file, url_for
 
 # Import application components and utilities
 # Make sure job_manager and STATUS_WAITING_FOR_REVIEW are imported correctly
 from src.job_manager import job_manager, STATUS_WAITING_FOR_REVIEW
 from src.pipeline_part2 import run_part2
-from src.utils.log import log
+from src.utils.log import log, log_lazy
+from src.utils.pipeline_helpers import submit_pipeline_job
 # Import PROJECT_ROOT for resolving file paths safely
 from src.utils.config_schema import PROJECT_ROOT
+from src.utils.file_io import read_segments, read_context_snippets, read_bundle, read_decoded, loads_json
+from src.utils.route_helpers import json_response, make_etag, not_modified_response, cacheable_json_response
 
 # Define the Blueprint object for review-related routes
 review_bp = Blueprint( # Ensure this name 'review_bp' is unique and used here
@@ -26,6 +29,111 @@ review_bp = Blueprint( # Ensure this name 'review_bp' is unique and used here
     url_prefix='/api/v1' # Use the same prefix for consistency
 )
 
+# Resolved once at import; path security checks compare against it on every request
+_PROJECT_ROOT_RESOLVED = PROJECT_ROOT.resolve()
+# Prefix every job file path must start with (trailing separator so '/app2' never matches '/app')
+_PROJECT_ROOT_PREFIX = str(_PROJECT_ROOT_RESOLVED) + os.sep
+
+# Reads the (up to) three review files of a job in parallel; on slow or networked
+# disks the reads are I/O bound and independent
+_review_io_executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="review-io")
+
+# Largest accepted review submission (a speaker map is a few hundred bytes). Checked
+# per route: an app-wide MAX_CONTENT_LENGTH would also cap audio uploads.
+MAX_REVIEW_BODY_BYTES = 1024 * 1024
+
+# Sections of the review data, each also served by its own endpoint
+REVIEW_SECTIONS = ("intermediate_transcript", "proposed_map", "context_snippets")
+# Bundle section names (see pipeline_part1) for each review section
+_BUNDLE_SECTION_NAMES = {"intermediate_transcript": "transcript", "proposed_map": "proposed_map", "context_snippets": "context_snippets"}
+# review_data_paths key holding each section's own file
+_SECTION_PATH_KEYS = {"intermediate_transcript": "intermediate_transcript_path", "proposed_map": "proposed_map_path", "context_snippets": "context_snippets_path"}
+
+# --- Helper Functions ---
+
+def _resolve_review_file(rel_path: str) -> Path:
+    """
+    Builds the absolute path of a job file (relative to PROJECT_ROOT) and checks it stays inside the project.
+
+    The check is lexical (normpath collapses '..' and absolute components are
+    caught by the prefix test) instead of Path.resolve(), which stats every
+    path component. The job output tree is written by the pipeline itself and
+    contains no symlinks, so following links is not needed here.
+
+    Raises:
+        SecurityError: If the path points outside PROJECT_ROOT.
+    """
+    full_path = os.path.normpath(os.path.join(_PROJECT_ROOT_RESOLVED, rel_path))
+    if not full_path.startswith(_PROJECT_ROOT_PREFIX): raise SecurityError("Attempted path traversal.")
+    return Path(full_path)
+
+def _read_json_file(full_path: Path) -> Any:
+    """Reads and parses a JSON file (binary read + orjson; large files are memory-mapped)."""
+    return read_decoded(full_path, loads_json)
+
+
+def _load_review_file(rel_path: str, loader: Callable[[Path], Any]) -> Tuple[Any, Optional[Exception]]:
+    """
+    Loads one review file (path security check included), for use in a worker thread.
+
+    Args:
+        rel_path: File path relative to PROJECT_ROOT, as stored by Part 1.
+        loader: Callable reading and decoding the file at the absolute path.
+
+    Returns:
+        (data, None) on success, or (None, error) if the check or the load failed.
+    """
+    try:
+        return loader(_resolve_review_file(rel_path)), None
+    except Exception as e:
+        if not isinstance(e, FileNotFoundError): log_lazy("DEBUG", traceback.format_exc) # Full traceback for debugging
+        return None, e
+
+def _review_files_validator(job_id: str, review_paths: Dict[str, Any]) -> Optional[Tuple[str, float]]:
+    """
+    Builds an ETag for a job's review data from the (mtime, size) of its files.
+
+    Only stats the files, so an unchanged payload can be answered with a 304
+    before anything is read.
+
+    Returns:
+        (etag, newest mtime), or None if no validator can be built (then the
+        response is simply sent without one).
+    """
+    rel_paths = [review_paths.get("bundle_path")] if review_paths.get("bundle_path") else \
+        [review_paths.get(key) for key in _SECTION_PATH_KEYS.values()]
+    stats = []
+    for rel_path in rel_paths:
+        if not rel_path:
+            stats.append(None); continue
+        try:
+            st = os.stat(_resolve_review_file(rel_path))
+            stats.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stats.append(None) # Missing optional files are part of the state too
+        except (OSError, SecurityError):
+            return None
+    if not any(stats):
+        return None
+    newest_mtime = max(stat[0] for stat in stats if stat) / 1e9
+    return make_etag(job_id, stats), newest_mtime
+
+def _validate_review_submission(data: Any) -> Optional[str]:
+    """
+    Checks a review submission: {"final_speaker_map": {speaker_id: name, ...}} with string names.
+
+    Returns:
+        None if valid, otherwise an error message for the client.
+    """
+    if not isinstance(data, dict):
+        return "Request body must be a JSON object."
+    final_map = data.get("final_speaker_map")
+    if not isinstance(final_map, dict):
+        return "Invalid or missing 'final_speaker_map' (must be a JSON object/dictionary)"
+    if not all(isinstance(name, str) for name in final_map.values()):
+        return "All names in 'final_speaker_map' must be strings."
+    return None
+
 # --- Review Routes ---
 
 @review_bp.route("/get_review_data/<job_id>", methods=["GET"])
@@ -34,6 +142,10 @@ def get_review_data(job_id):
     API endpoint to retrieve data needed for the speaker review step UI.
     Loads content from intermediate files (transcript, proposed map, context)
     identified in the job state.
+
+    With '?inline=0' only the URLs of the per-section endpoints are returned
+    (see get_review_section), so the client can fetch the large files directly
+    and in parallel, with HTTP caching.
     """
     log(f"API: Request received for review data for job {job_id}", "INFO")
     job_data = job_manager.get_status(job_id)
@@ -48,82 +160,89 @@ def get_review_data(job_id):
         # Return 409 Conflict if the job is not in the correct state
         return jsonify({"error": f"Job status is '{current_status}', expected '{STATUS_WAITING_FOR_REVIEW}'"}), 409
 
+    # --- URL-only Response ---
+    if request.args.get("inline", "1").lower() in ("0", "false", "no"):
+        return jsonify({"urls": {
+            section: url_for("review.get_review_section", job_id=job_id, section=section)
+            for section in REVIEW_SECTIONS
+        }})
+
     # --- Get Relative Paths Stored by Part 1 ---
     review_paths = job_data.get("review_data_paths", {})
     intermediate_transcript_rel_path = review_paths.get("intermediate_transcript_path")
     proposed_map_rel_path = review_paths.get("proposed_map_path")
     context_snippets_rel_path = review_paths.get("context_snippets_path")
 
+    # --- Conditional Request: 304 if the client already has this data ---
+    validator = _review_files_validator(job_id, review_paths)
+    if validator is not None:
+        not_modified = not_modified_response(validator[0])
+        if not_modified is not None:
+            log(f"API: Review data for job {job_id} unchanged, returning 304.", "DEBUG")
+            return not_modified
+
     # --- Load Data Content from Files ---
     # Initialize payload structure
     review_payload = {"intermediate_transcript": None, "proposed_map": {}, "context_snippets": {}}
     load_errors = [] # Collect errors encountered during file loading
 
-    # Load Intermediate Transcript (Considered Essential)
-    if intermediate_transcript_rel_path:
+    # Bundle mode: all three sections live in one file written by Part 1
+    bundle_rel_path = review_paths.get("bundle_path")
+    if bundle_rel_path:
         try:
-            # Construct absolute path safely relative to PROJECT_ROOT
-            full_path = (PROJECT_ROOT / intermediate_transcript_rel_path).resolve()
-            # Security check: prevent accessing files outside project root
-            if not full_path.is_relative_to(PROJECT_ROOT.resolve()):
-                raise SecurityError("Attempted path traversal.")
-            if not full_path.is_file():
-                raise FileNotFoundError(f"File not found at resolved path: {full_path}")
-
-            # Read and parse the JSON file
-            with open(full_path, "r", encoding='utf-8') as f:
-                review_payload["intermediate_transcript"] = json.load(f)
-            log(f"API: Successfully loaded intermediate transcript for review: {intermediate_transcript_rel_path}", "DEBUG")
-        except (FileNotFoundError, SecurityError, json.JSONDecodeError, Exception) as e:
-            msg = f"Error loading intermediate transcript '{intermediate_transcript_rel_path}': {type(e).__name__}: {e}"
+            full_path = _resolve_review_file(bundle_rel_path)
+            sections = read_bundle(full_path, review_paths.get("bundle_offsets") or {})
+            review_payload["intermediate_transcript"] = sections.get("transcript")
+            review_payload["proposed_map"] = sections.get("proposed_map") or {}
+            review_payload["context_snippets"] = sections.get("context_snippets") or {}
+            log(f"API: Successfully loaded review data from bundle: {bundle_rel_path}", "DEBUG")
+        except Exception as e:
+            msg = f"Error loading intermediate bundle '{bundle_rel_path}': {type(e).__name__}: {e}"
             log(msg, "ERROR"); load_errors.append(msg)
-            log(traceback.format_exc(), "DEBUG") # Log full traceback for debugging
+            log_lazy("DEBUG", traceback.format_exc)
     else:
-        # If the path itself is missing from job_data
-        msg = "Intermediate transcript path missing in job data."
-        log(msg, "ERROR"); load_errors.append(msg)
+        # Separate files: read them concurrently so their disk I/O overlaps
+        file_loads = {
+            "intermediate_transcript": (intermediate_transcript_rel_path, read_segments), # JSON or msgpack, by suffix
+            "proposed_map": (proposed_map_rel_path, _read_json_file),
+            "context_snippets": (context_snippets_rel_path, read_context_snippets), # Text + index (or JSON for older jobs)
+        }
+        futures = {
+            name: _review_io_executor.submit(_load_review_file, rel_path, loader)
+            for name, (rel_path, loader) in file_loads.items() if rel_path
+        }
 
-    # Load Proposed Speaker Map (Optional - may not exist)
-    if proposed_map_rel_path:
-        try:
-            full_path = (PROJECT_ROOT / proposed_map_rel_path).resolve()
-            if not full_path.is_relative_to(PROJECT_ROOT.resolve()): raise SecurityError("Attempted path traversal.")
-            # Only try loading if the file exists
-            if full_path.is_file():
-                 with open(full_path, "r", encoding='utf-8') as f:
-                     review_payload["proposed_map"] = json.load(f)
-                 log(f"API: Successfully loaded proposed map for review: {proposed_map_rel_path}", "DEBUG")
+        # Load Intermediate Transcript (Considered Essential)
+        if "intermediate_transcript" in futures:
+            data, error = futures["intermediate_transcript"].result()
+            if error is None:
+                review_payload["intermediate_transcript"] = data
+                log(f"API: Successfully loaded intermediate transcript for review: {intermediate_transcript_rel_path}", "DEBUG")
             else:
-                 # File not found is expected if name detection didn't produce a map
-                 log(f"API Info: Proposed map file not found at '{proposed_map_rel_path}'. Returning empty map.", "INFO")
-                 review_payload["proposed_map"] = {} # Default to empty dict if not found
-        except (SecurityError, json.JSONDecodeError, Exception) as e:
-             # Treat loading errors here as warnings, as proposed map is optional
-             msg = f"Could not load proposed map '{proposed_map_rel_path}': {type(e).__name__}: {e}"
-             log(msg, "WARNING"); load_errors.append(msg) # Add to errors but don't fail request yet
-             log(traceback.format_exc(), "DEBUG")
-    else:
-        log("API Info: No proposed map path found in job data. Returning empty map.", "INFO")
-
+                msg = f"Error loading intermediate transcript '{intermediate_transcript_rel_path}': {type(error).__name__}: {error}"
+                log(msg, "ERROR"); load_errors.append(msg)
+        else:
+            # If the path itself is missing from job_data
+            msg = "Intermediate transcript path missing in job data."
+            log(msg, "ERROR"); load_errors.append(msg)
 
-    # Load Context Snippets (Optional - may not exist)
-    if context_snippets_rel_path:
-        try:
-            full_path = (PROJECT_ROOT / context_snippets_rel_path).resolve()
-            if not full_path.is_relative_to(PROJECT_ROOT.resolve()): raise SecurityError("Attempted path traversal.")
-            if full_path.is_file():
-                 with open(full_path, "r", encoding='utf-8') as f:
-                     review_payload["context_snippets"] = json.load(f)
-                 log(f"API: Successfully loaded context snippets for review: {context_snippets_rel_path}", "DEBUG")
+        # Proposed Speaker Map and Context Snippets (Optional - may not exist)
+        for name, label in (("proposed_map", "proposed map"), ("context_snippets", "context snippets")):
+            rel_path = file_loads[name][0]
+            if name not in futures:
+                log(f"API Info: No {label} path found in job data. Returning empty dict.", "INFO")
+                continue
+            data, error = futures[name].result()
+            if error is None:
+                review_payload[name] = data
+                log(f"API: Successfully loaded {label} for review: {rel_path}", "DEBUG")
+            elif isinstance(error, FileNotFoundError):
+                # Expected if name detection didn't produce this file; keep the empty default
+                log(f"API Info: {label.capitalize()} file not found at '{rel_path}'. Returning empty dict.", "INFO")
             else:
-                 log(f"API Info: Context snippets file not found at '{context_snippets_rel_path}'. Returning empty dict.", "INFO")
-                 review_payload["context_snippets"] = {}
-        except (SecurityError, json.JSONDecodeError, Exception) as e:
-             msg = f"Could not load context snippets '{context_snippets_rel_path}': {type(e).__name__}: {e}"
-             log(msg, "WARNING"); load_errors.append(msg)
-             log(traceback.format_exc(), "DEBUG")
-    else:
-        log("API Info: No context snippets path found in job data. Returning empty dict.", "INFO")
+                # Treat loading errors here as warnings, as these sections are optional
+                msg = f"Could not load {label} '{rel_path}': {type(error).__name__}: {error}"
+                log(msg, "WARNING"); load_errors.append(msg) # Add to errors but don't fail request yet
 
     # --- Final Check and Return Response ---
     # If the essential transcript data couldn't be loaded, return a server error
@@ -134,7 +253,63 @@ def get_review_data(job_id):
 
     # If loading succeeded (at least for the transcript), return the payload
     log(f"API: Successfully prepared review data payload for job {job_id}.", "INFO")
-    return jsonify(review_payload)
+    if validator is not None:
+        return cacheable_json_response(review_payload, validator[0], last_modified=validator[1])
+    return json_response(review_payload) # orjson-encoded; the transcript can be large
+
+
+@review_bp.route("/review_data/<job_id>/<section>", methods=["GET"])
+def get_review_section(job_id, section):
+    """
+    API endpoint returning one section of the review data as JSON.
+
+    JSON files on disk (the transcript and the proposed map) are sent as-is
+    with send_file: no parse/re-encode, sendfile(2) where available and
+    conditional requests (ETag / Last-Modified, 304). Sections stored in other
+    layouts (msgpack transcripts, snippet text + index, bundles) are decoded
+    and encoded once.
+    """
+    if section not in REVIEW_SECTIONS:
+        abort(404, description=f"Unknown review data section '{section}'.")
+    log(f"API: Request received for review section '{section}' of job {job_id}", "DEBUG")
+    job_data = job_manager.get_status(job_id)
+    if not job_data:
+        abort(404, description="Job not found")
+    current_status = job_data.get("status")
+    if current_status != STATUS_WAITING_FOR_REVIEW:
+        return jsonify({"error": f"Job status is '{current_status}', expected '{STATUS_WAITING_FOR_REVIEW}'"}), 409
+
+    review_paths = job_data.get("review_data_paths", {})
+    try:
+        # Bundle mode: every section lives in the single bundle file
+        bundle_rel_path = review_paths.get("bundle_path")
+        if bundle_rel_path:
+            name = _BUNDLE_SECTION_NAMES[section]
+            sections = read_bundle(_resolve_review_file(bundle_rel_path), review_paths.get("bundle_offsets") or {}, [name])
+            return json_response(sections.get(name) if section == "intermediate_transcript" else (sections.get(name) or {}))
+
+        rel_path = review_paths.get(_SECTION_PATH_KEYS[section])
+        if not rel_path:
+            raise FileNotFoundError(f"No {section} path in job data.")
+        full_path = _resolve_review_file(rel_path)
+        # No is_file() pre-check: a missing file raises FileNotFoundError from open/stat below
+        if section == "context_snippets":
+            return json_response(read_context_snippets(full_path))
+        if full_path.suffix != ".json": # e.g. msgpack transcripts
+            return json_response(read_segments(full_path))
+        # Zero-copy passthrough of the JSON file
+        return send_file(full_path, mimetype="application/json", conditional=True, etag=True, max_age=0)
+    except FileNotFoundError:
+        if section == "intermediate_transcript":
+            return jsonify({"error": "Intermediate transcript not available."}), 404
+        return json_response({}) # Optional sections default to empty (as in get_review_data)
+    except SecurityError as e:
+        log(f"API Error: Review section '{section}' for job {job_id} rejected: {e}", "WARNING")
+        abort(400, description="Invalid review data path.")
+    except Exception as e:
+        log(f"API Error: Failed to load review section '{section}' for job {job_id}: {type(e).__name__}: {e}", "ERROR")
+        log_lazy("DEBUG", traceback.format_exc)
+        return jsonify({"error": f"Failed to load review data section '{section}'."}), 500
 
 
 @review_bp.route("/update_review_data/<job_id>", methods=["POST"])
@@ -160,35 +335,38 @@ def update_review_data(job_id):
         log(f"API Error: Update review data request body is not JSON for job '{job_id}'.", "WARNING")
         return jsonify({"error": "Request body must be JSON"}), 415 # Unsupported Media Type
 
-    # --- Extract Final Map from JSON Payload ---
-    request_data = request.get_json()
-    final_map = request_data.get("final_speaker_map")
+    # Reject oversized bodies before reading them (Content-Length is known up front)
+    if request.content_length is not None and request.content_length > MAX_REVIEW_BODY_BYTES:
+        log(f"API Error: Review submission for job '{job_id}' too large ({request.content_length} bytes).", "WARNING")
+        return jsonify({"error": f"Request body too large (max {MAX_REVIEW_BODY_BYTES} bytes)."}), 413 # Payload Too Large
 
-    # Validate that 'final_speaker_map' exists and is a dictionary
-    if not isinstance(final_map, dict):
-        log(f"API Error: 'final_speaker_map' missing or not a dictionary in JSON payload for job '{job_id}'.", "WARNING")
-        return jsonify({"error": "Invalid or missing 'final_speaker_map' (must be a JSON object/dictionary)"}), 400 # Bad Request
+    # --- Parse and Validate the JSON Payload ---
+    try:
+        request_data = loads_json(request.get_data(cache=False))
+    except ValueError:
+        log(f"API Error: Review submission for job '{job_id}' is not valid JSON.", "WARNING")
+        return jsonify({"error": "Request body is not valid JSON."}), 400 # Bad Request
+    validation_error = _validate_review_submission(request_data)
+    if validation_error:
+        log(f"API Error: Invalid review submission for job '{job_id}': {validation_error}", "WARNING")
+        return jsonify({"error": validation_error}), 400 # Bad Request
+    final_map = request_data["final_speaker_map"]
 
     log(f"API: Received final speaker map for job {job_id}: {final_map}", "DEBUG")
 
-    # --- Start Part 2 Thread ---
+    # --- Start Part 2 on the Pipeline Pool ---
     try:
-        # Start Part 2 in a background thread, passing the job_id and the received final_map
-        pipeline_thread_part2 = threading.Thread(
-            target=run_part2,
-            args=(job_id, final_map), # Pass the map from the user
-            daemon=True
-        )
-        pipeline_thread_part2.start()
-        log(f"API: Started Part 2 thread for job {job_id} after review.", "INFO")
+        # Submit Part 2 to the shared pipeline workers, passing the job_id and the received final_map
+        submit_pipeline_job(run_part2, job_id, final_map)
+        log(f"API: Submitted Part 2 for job {job_id} after review.", "INFO")
 
         # Return '202 Accepted' to indicate the request was received and processing started
         return jsonify({"message": "Review submitted successfully. Continuing pipeline."}), 202
 
     except Exception as e:
-        # Catch potential errors during thread creation/start
+        # Catch potential errors during job submission
         log(f"API Error: Failed to start Part 2 thread for job {job_id}: {e}", "CRITICAL")
-        log(traceback.format_exc(), "ERROR")
+        log_lazy("ERROR", traceback.format_exc)
         # Attempt to update the job status to reflect this failure
         job_manager.set_error(job_id, "Failed to start pipeline Part 2 after review submission")
         # Return 500 Internal Server Error
@@ -1,10 +1,39 @@
 # src/speaker_mapping.py
 # Removed unused json import
+import sys
+from collections import Counter
 from typing import List, Dict, Any, Optional
 
 # Assuming log utility is set up and functional
 from src.utils.log import log
 
+def _normalize_speaker_mapping(final_speaker_mapping: Dict[str, Optional[str]]) -> Dict[str, str]:
+    """
+    Reduces a speaker map to the usable entries, with stripped names.
+
+    Done once per mapping, so segments only need a single dict lookup. IDs and
+    names are interned: every mapped segment shares one name object, and
+    lookups with equal (e.g. also interned) ID strings short-circuit on identity.
+
+    Args:
+        final_speaker_mapping: Map of speaker IDs to assigned names (or None/empty).
+
+    Returns:
+        Speaker ID -> stripped name, for the entries holding a non-empty string.
+        IDs without a usable name are left out (they fall back to the ID itself).
+    """
+    clean_map: Dict[str, str] = {}
+    for speaker_id, assigned_name in final_speaker_mapping.items():
+        # Check if a valid, non-empty string name was provided in the map for this ID
+        stripped_name = assigned_name.strip() if isinstance(assigned_name, str) else ""
+        if stripped_name:
+            clean_map[sys.intern(speaker_id) if isinstance(speaker_id, str) else speaker_id] = sys.intern(stripped_name)
+        else:
+            # The ID *was* present in the map but the value was unusable
+            log(f"No valid name assigned for '{speaker_id}', using ID as fallback name.", "DEBUG")
+    return clean_map
+
+
 def apply_speaker_mapping(
     transcript_segments: List[Dict[str, Any]],
     final_speaker_mapping: Dict[str, Optional[str]]
@@ -38,44 +67,32 @@ def apply_speaker_mapping(
     # Log the provided mapping at DEBUG level for troubleshooting if needed
     log(f"Using mapping: {final_speaker_mapping}", "DEBUG")
 
-    updated_segments = []
+    # Validate and strip the map once; each segment then needs a single lookup.
+    # Output segments are built with one dict display in one comprehension
+    # ({**segment, ...} is cheaper than segment.copy() followed by an assignment).
+    clean_map = _normalize_speaker_mapping(final_speaker_mapping)
+
+    # Copies, so the input dictionaries are never modified. Segments missing the
+    # 'speaker' key get a fixed placeholder; unmapped IDs keep the ID as their name.
+    updated_segments = [
+        {**segment, "speaker_name": clean_map.get(speaker_id, speaker_id) if (speaker_id := segment.get("speaker")) else "SPEAKER_MISSING_ID"}
+        for segment in transcript_segments
+    ]
+
+    # --- Counters for the summary (per distinct ID, not per segment) ---
+    id_counts = Counter(segment.get("speaker") for segment in transcript_segments)
     missing_id_count = 0 # Count segments where original 'speaker' key was missing
     unmapped_count = 0   # Count segments where ID was present but no valid name was mapped
     mapped_count = 0     # Count segments where a name was successfully assigned from the map
-
-    for segment in transcript_segments:
-        # Work on a copy to avoid modifying the original input dictionaries in place
-        updated_segment = segment.copy()
-        original_speaker_id = updated_segment.get("speaker") # Get original ID (e.g., "SPEAKER_01")
-
-        if not original_speaker_id:
-            # Case 1: Original segment data is missing the 'speaker' key
-            updated_segment["speaker_name"] = "SPEAKER_MISSING_ID" # Assign a fixed placeholder
-            missing_id_count += 1
-            # Improve warning log with segment context (start time)
-            start_time = updated_segment.get('start', '?') # Get start time if available
-            log(f"Segment starting around {start_time}s is missing the 'speaker' key. Assigning '{updated_segment['speaker_name']}'.", "WARNING")
-        else:
-            # Case 2: Original speaker ID exists, look it up in the final map provided
-            # Use .get() to safely handle cases where an ID might not be in the map (defaults to None)
-            assigned_name = final_speaker_mapping.get(original_speaker_id)
-
-            # Check if a valid, non-empty string name was provided in the map for this ID
-            if assigned_name and isinstance(assigned_name, str) and assigned_name.strip():
-                # Case 2a: Valid name found - assign it (strip leading/trailing whitespace)
-                updated_segment["speaker_name"] = assigned_name.strip()
-                mapped_count += 1
-            else:
-                # Case 2b: No name in map OR name is None/empty/invalid - use original ID as fallback name
-                updated_segment["speaker_name"] = original_speaker_id
-                unmapped_count += 1
-                # Log specifically if the ID *was* present in the map but the value was unusable
-                if original_speaker_id in final_speaker_mapping:
-                     log(f"No valid name assigned for '{original_speaker_id}', using ID as fallback name.", "DEBUG")
-                # If ID wasn't in map, using fallback is expected, no specific log needed here.
-
-        # Add the processed segment (always containing 'speaker_name') to the new list
-        updated_segments.append(updated_segment)
+    for original_speaker_id, count in id_counts.items():
+        if not original_speaker_id: missing_id_count += count
+        elif original_speaker_id in clean_map: mapped_count += count
+        else: unmapped_count += count
+
+    if missing_id_count:
+        # One summary warning instead of one per segment, with the first segment as context
+        first_start = next((segment.get('start', '?') for segment in transcript_segments if not segment.get("speaker")), '?')
+        log(f"{missing_id_count} segment(s) are missing the 'speaker' key (first starting around {first_start}s). Assigning 'SPEAKER_MISSING_ID'.", "WARNING")
 
     # Log a summary of the mapping process results for confirmation
     log(f"Speaker mapping complete. Results - Assigned names: {mapped_count}, Used original ID (unmapped/invalid): {unmapped_count}, Segments missing original ID: {missing_id_count}.", "SUCCESS")
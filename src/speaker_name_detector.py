@@ -6,7 +6,7 @@ from pathlib import Path
 from typing import List, Dict, Optional, Tuple, Union, Any
 
 # Import utilities
-from src.utils.log import log
+from src.utils.log import log, log_enabled
 # Use the centralized LLM runner which handles model selection and fallback
 from src.utils.llm import run_llm
 
@@ -156,7 +156,7 @@ def detect_speaker_names(
         log(f"Built name detection prompt ({len(prompt)} chars). Context snippets generated: {len(context_snippets)}", "DEBUG")
     except Exception as e:
          log(f"Critical error building name detection prompt: {e}", "ERROR")
-         log(traceback.format_exc(), "DEBUG")
+         if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
          return None, None # Indicate critical failure if prompt cannot be built
 
     # --- Step 3: Determine LLM Model(s) ---
@@ -254,7 +254,7 @@ def detect_speaker_names(
         final_mapping = None # Indicate parsing failure
     except Exception as e:
         log(f"Unexpected error parsing/validating LLM response: {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG")
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
         final_mapping = None # Indicate general failure
 
     # Return the final mapping (dict or None) and the context snippets (dict)
@@ -4,8 +4,8 @@ import os
 import time
 import json
 import traceback
-import platform
 import uuid # Import uuid for unique temp filename generation
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Optional, Any, Tuple # Added Tuple hint
 
@@ -15,6 +15,15 @@ try:
 except ImportError as e:
     raise ImportError("Error: faster-whisper is not installed. Please run 'pip install faster-whisper'.") from e
 
+# Batched inference (decodes several 30s windows of a file per GPU call) is only
+# available in newer faster-whisper releases; fall back to sequential decoding.
+try:
+    from faster_whisper import BatchedInferencePipeline
+    BATCHED_INFERENCE_AVAILABLE = True
+except ImportError:
+    BatchedInferencePipeline = None
+    BATCHED_INFERENCE_AVAILABLE = False
+
 try:
     import torch
     from pyannote.audio import Pipeline as PyannotePipeline
@@ -24,81 +33,189 @@ except ImportError as e:
     raise ImportError("Error: pyannote.audio or torch is not installed. Please run 'pip install pyannote.audio torch torchaudio'.") from e
 
 # --- Local Imports ---
-from src.utils.log import log
+from src.utils.log import log, log_enabled
+from src.model_registry import model_registry
+from src.feature_extraction import install_feature_extractor
 # Import the refactored audio conversion utility
-from src.utils.audio_utils import convert_to_wav
+from src.utils.audio_utils import convert_to_wav, get_audio_duration, duration_bucket
+# Device detection lives in a torch-only utility module (shared with the info route)
+from src.utils.device import get_compute_device as _get_compute_device
 
 # --- Constants ---
 DEFAULT_WHISPER_MODEL = "small"
 DEFAULT_COMPUTE_TYPE = "int8"
 DEFAULT_PYANNOTE_PIPELINE = "pyannote/speaker-diarization-3.1"
 
-# --- Global cache for compute device ---
-_compute_device_cache: Optional[str] = None
+# --- Background diarization worker ---
+# Used when diarization runs alongside transcription (CTranslate2 and torch both
+# release the GIL during inference, so the two overlap on separate threads).
+_diarization_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarization")
 
-# --- Helper Function for Device Detection (CORRECTED FORMATTING) ---
-def _get_compute_device() -> str:
-    """Automatically detects and caches the optimal compute device (cuda > mps > cpu)."""
-    global _compute_device_cache
-    # Return cached value if already detected
-    if _compute_device_cache is not None:
-        return _compute_device_cache
+def auto_compute_type() -> str:
+    """
+    Picks the fastest Whisper compute type for the detected hardware.
 
-    device = "cpu" # Default fallback
+    - CUDA with compute capability >= 7.5 (Turing and newer, INT8 tensor cores): 'int8_float16'
+    - Older CUDA GPUs: 'float16'
+    - CPU / Apple MPS: 'int8'
+    """
+    if _get_compute_device() != "cuda":
+        return "int8"
     try:
-        if torch.cuda.is_available():
-            device = "cuda"
-            log("CUDA (NVIDIA GPU) detected. Using 'cuda'.", "INFO")
-        elif platform.system() == "Darwin" and hasattr(torch.backends, "mps") and torch.backends.mps.is_available() and torch.backends.mps.is_built():
-            # Check specifically for Apple Silicon MPS support
-            device = "mps"
-            log("Apple MPS detected and available. Using 'mps'.", "INFO")
-        else:
-            # If no GPU detected or MPS not available/built
-            log("No CUDA or available MPS GPU detected. Using 'cpu'.", "INFO")
-            # device remains "cpu"
+        major, minor = torch.cuda.get_device_capability()
     except Exception as e:
-        # Catch potential errors during detection (e.g., library issues)
-        log(f"Error during compute device detection: {e}. Falling back to 'cpu'.", "WARNING")
-        device = "cpu" # Ensure fallback on error
+        log(f"Could not read CUDA compute capability ({e}). Using 'float16'.", "WARNING")
+        return "float16"
+    return "int8_float16" if (major, minor) >= (7, 5) else "float16"
+
+def _resolve_feature_device(feature_device: Optional[str]) -> str:
+    """Maps the 'feature_device' setting to a torch device name ('auto' -> GPU if present)."""
+    if not feature_device or feature_device == "auto":
+        # Only CUDA is used automatically; torch.stft on MPS is not reliably faster
+        return "cuda" if _get_compute_device() == "cuda" else "cpu"
+    if feature_device == "cuda" and not torch.cuda.is_available():
+        log("feature_device 'cuda' requested but CUDA is not available. Using CPU.", "WARNING")
+        return "cpu"
+    return feature_device
+
+# --- Model Registry Helpers ---
+# Models are kept in the process-wide ModelRegistry (src/model_registry.py),
+# so they are loaded once and reused across jobs.
+
+def _release_model(model: Any):
+    """
+    Called when the registry evicts a model.
 
-    # Cache and return the determined device
-    _compute_device_cache = device
-    return device
+    The model is deliberately left untouched: a job that fetched it before the
+    eviction (a preload thread, or a second GPU slot) may still be running on
+    it, and moving it to the CPU would break that run with a device mismatch.
+    Dropping the registry's reference is enough; the weights are freed by
+    garbage collection once the last job using them is done.
+    """
+    del model
+    if torch.cuda.is_available():
+        # Only returns blocks that are already unused; live models are unaffected
+        torch.cuda.empty_cache()
 
-# --- Internal Helper Functions for Transcription and Diarization ---
 
-def _load_models(
-    whisper_model_size: str,
-    compute_type: str,
-    pyannote_pipeline_name: str,
-    hf_token: Optional[str],
-    compute_device: str
-    ) -> Tuple[Optional[WhisperModel], Optional[PyannotePipeline]]:
-    """Loads Whisper and Pyannote models onto the specified device."""
-    whisper_model = None
-    diarization_pipeline = None
-    log(f"Attempting to load models (Whisper: {whisper_model_size}, Pyannote: {pyannote_pipeline_name}) on device '{compute_device}'...", "INFO")
+def get_whisper_model(whisper_model_size: str, compute_type: str, compute_device: str,
+                      num_workers: int = 1, cpu_threads: int = 0) -> WhisperModel:
+    """
+    Returns a loaded Whisper model, loading it on first use.
 
-    try:
-        # Determine torch device object for Pyannote
-        pyannote_torch_device = torch.device(compute_device) # Use the determined device string
+    num_workers is the number of CTranslate2 model replicas that can decode in
+    parallel (only useful when several jobs transcribe at once; each replica
+    costs memory). cpu_threads sets the intra-op threads per replica for CPU
+    decoding (0 keeps CTranslate2's default).
 
-        # Load FasterWhisper model
+    Raises:
+        Exception: Any error raised by WhisperModel while loading.
+    """
+    def _load() -> WhisperModel:
         log(f"Loading Whisper model '{whisper_model_size}' (Compute: {compute_type})...", "DEBUG")
         # Use 'auto' device argument for Whisper when MPS is detected for best compatibility
         whisper_device_arg = "auto" if compute_device == "mps" else compute_device
-        whisper_model = WhisperModel(whisper_model_size, device=whisper_device_arg, compute_type=compute_type)
+        whisper_model = WhisperModel(
+            whisper_model_size, device=whisper_device_arg, compute_type=compute_type,
+            num_workers=max(1, num_workers), cpu_threads=max(0, cpu_threads)
+        )
         log("Whisper model loaded successfully.", "SUCCESS")
+        return whisper_model
+
+    key = ("whisper", whisper_model_size, compute_type, compute_device, num_workers, cpu_threads)
+    return model_registry.get(key, _load, release=_release_model)
 
-        # Load Pyannote pipeline
+
+def _compile_diarization_model(diarization_pipeline: PyannotePipeline):
+    """
+    Wraps the pipeline's segmentation network in torch.compile (in place).
+
+    Only the PyTorch side of the pipeline can be compiled: Whisper runs on
+    CTranslate2, which already uses fused, quantized kernels. Compilation itself
+    happens lazily on the first diarization call.
+    """
+    segmentation = getattr(diarization_pipeline, "_segmentation", None)
+    model = getattr(segmentation, "model", None)
+    if not hasattr(torch, "compile") or model is None:
+        log("torch.compile not available for this Pyannote pipeline. Running uncompiled.", "WARNING")
+        return
+    try:
+        segmentation.model = torch.compile(model, dynamic=True)
+        log("Pyannote segmentation model wrapped with torch.compile.", "INFO")
+    except Exception as e:
+        log(f"torch.compile failed for Pyannote segmentation model: {e}. Running uncompiled.", "WARNING")
+
+
+def get_pyannote_pipeline(pyannote_pipeline_name: str, hf_token: Optional[str], compute_device: str,
+                          compile_model: bool = False) -> PyannotePipeline:
+    """
+    Returns a loaded Pyannote pipeline on the given device, loading it on first use.
+    With compile_model, its segmentation network is wrapped in torch.compile.
+
+    Raises:
+        Exception: Any error raised by Pyannote while loading (e.g. auth failures).
+    """
+    def _load() -> PyannotePipeline:
         log(f"Loading Pyannote pipeline '{pyannote_pipeline_name}'...", "DEBUG")
         auth_token_arg = {"use_auth_token": hf_token} if hf_token else {}
         if not hf_token: log("Hugging Face token not provided. Pyannote model loading might fail if authentication is required.", "WARNING")
         diarization_pipeline = PyannotePipeline.from_pretrained(pyannote_pipeline_name, **auth_token_arg)
+        if diarization_pipeline is None:
+            # from_pretrained returns None (instead of raising) on some auth failures
+            raise RuntimeError(f"Pyannote pipeline '{pyannote_pipeline_name}' could not be loaded (check token and model terms).")
+        pyannote_torch_device = torch.device(compute_device) # Use the determined device string
         diarization_pipeline.to(pyannote_torch_device) # Move pipeline to target device
         log(f"Pyannote pipeline loaded successfully onto device '{pyannote_torch_device}'.", "SUCCESS")
+        if compile_model:
+            _compile_diarization_model(diarization_pipeline)
+        return diarization_pipeline
 
+    key = ("pyannote", pyannote_pipeline_name, hf_token, compute_device, compile_model)
+    return model_registry.get(key, _load, release=_release_model)
+
+
+def preload_models(
+    whisper_model_size: str = DEFAULT_WHISPER_MODEL,
+    compute_type: str = DEFAULT_COMPUTE_TYPE,
+    pyannote_pipeline_name: str = DEFAULT_PYANNOTE_PIPELINE,
+    hf_token: Optional[str] = None,
+    compile_diarization: bool = False,
+    num_workers: int = 1,
+    cpu_threads: int = 0
+    ) -> bool:
+    """
+    Warms the model caches so a following transcribe_and_diarize call starts immediately.
+    Safe to call from a background thread.
+
+    Returns:
+        True if both models are loaded, False if loading failed (errors are logged).
+    """
+    whisper_model, diarization_pipeline = _load_models(
+        whisper_model_size, compute_type, pyannote_pipeline_name, hf_token, _get_compute_device(),
+        compile_diarization, num_workers, cpu_threads
+    )
+    return whisper_model is not None and diarization_pipeline is not None
+
+# --- Internal Helper Functions for Transcription and Diarization ---
+
+def _load_models(
+    whisper_model_size: str,
+    compute_type: str,
+    pyannote_pipeline_name: str,
+    hf_token: Optional[str],
+    compute_device: str,
+    compile_diarization: bool = False,
+    num_workers: int = 1,
+    cpu_threads: int = 0
+    ) -> Tuple[Optional[WhisperModel], Optional[PyannotePipeline]]:
+    """Loads (or fetches from the process cache) Whisper and Pyannote models for the specified device."""
+    whisper_model = None
+    diarization_pipeline = None
+    log(f"Attempting to load models (Whisper: {whisper_model_size}, Pyannote: {pyannote_pipeline_name}) on device '{compute_device}'...", "INFO")
+
+    try:
+        whisper_model = get_whisper_model(whisper_model_size, compute_type, compute_device, num_workers, cpu_threads)
+        diarization_pipeline = get_pyannote_pipeline(pyannote_pipeline_name, hf_token, compute_device, compile_diarization)
         return whisper_model, diarization_pipeline
 
     except Exception as e:
@@ -106,26 +223,41 @@ def _load_models(
         failed_model = whisper_model_size if whisper_model is None else pyannote_pipeline_name
         log(f"Error loading AI model '{failed_model}': {e}", "CRITICAL")
         log("Check model names, Hugging Face token/terms, network connection, and system requirements (RAM/VRAM).", "ERROR")
-        log(traceback.format_exc(), "DEBUG") # Log full traceback for detailed debugging
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG") # Log full traceback for detailed debugging
         return None, None # Return None tuple on failure
 
 
 def _run_transcription(
     whisper_model: WhisperModel,
     wav_path: Path,
-    language: Optional[str]
+    language: Optional[str],
+    batch_size: int = 0
     ) -> Optional[List[Any]]:
-    """Runs Whisper transcription on the provided WAV audio file."""
+    """
+    Runs Whisper transcription on the provided WAV audio file.
+
+    With batch_size > 0 (and a faster-whisper version that supports it), the
+    audio is split on voice activity and the chunks are decoded batch_size
+    at a time, which keeps a GPU far busier than sequential decoding.
+    """
     log(f"Starting transcription on '{wav_path.name}'...", "INFO")
     try:
         start_time = time.time()
+        transcribe_kwargs: Dict[str, Any] = {
+            "beam_size": 5,            # Standard beam size for decoding
+            "language": language,      # None for auto-detect, or specify e.g., "en"
+            "word_timestamps": False   # Set True for word-level detail (slower)
+        }
+        if batch_size > 0 and BATCHED_INFERENCE_AVAILABLE:
+            log(f"Using batched inference (batch size {batch_size}).", "DEBUG")
+            transcriber = BatchedInferencePipeline(model=whisper_model)
+            transcribe_kwargs["batch_size"] = batch_size
+        else:
+            if batch_size > 0:
+                log("Batched inference not supported by the installed faster-whisper version. Decoding sequentially.", "WARNING")
+            transcriber = whisper_model
         # Transcribe the audio file
-        segments_generator, info = whisper_model.transcribe(
-            str(wav_path),
-            beam_size=5,            # Standard beam size for decoding
-            language=language,      # None for auto-detect, or specify e.g., "en"
-            word_timestamps=False   # Set True for word-level detail (slower)
-        )
+        segments_generator, info = transcriber.transcribe(str(wav_path), **transcribe_kwargs)
         # Collect all segments from the generator into a list
         whisper_results = list(segments_generator)
         elapsed = round(time.time() - start_time, 2)
@@ -137,7 +269,7 @@ def _run_transcription(
 
     except Exception as e:
         log(f"Transcription step failed: {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG")
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
         return None # Return None on failure
 
 
@@ -166,7 +298,7 @@ def _run_diarization(
     except Exception as e:
         log(f"Speaker diarization step failed: {e}", "ERROR")
         log("Check Hugging Face token validity, model terms acceptance, and input audio integrity.", "ERROR")
-        log(traceback.format_exc(), "DEBUG")
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
         return None # Return None on failure
 
 
@@ -237,7 +369,7 @@ def _merge_results(
     except Exception as e:
         # Catch unexpected errors during the overall merging loop
         log(f"Merging results failed overall: {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG")
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
         return None # Return None if the merge process fails
 
 
@@ -253,30 +385,20 @@ def _cleanup_temp_file(temp_file_path: Optional[Path], original_input_path: Path
             log(f"Failed to remove temporary WAV file '{temp_file_path.name}': {e}", "WARNING")
 
 
-# --- Main Public Function ---
-
-def transcribe_and_diarize(
+def _process_audio_file(
     input_audio_path: Path,
-    whisper_model_size: str = DEFAULT_WHISPER_MODEL,
-    compute_type: str = DEFAULT_COMPUTE_TYPE,
-    language: Optional[str] = None,
-    hf_token: Optional[str] = os.environ.get("HUGGING_FACE_TOKEN"), # Default to env var
-    pyannote_pipeline_name: str = DEFAULT_PYANNOTE_PIPELINE,
+    whisper_model: WhisperModel,
+    diarization_pipeline: PyannotePipeline,
+    language: Optional[str],
+    batch_size: int,
+    parallel_diarization: bool = False
 ) -> Optional[List[Dict[str, Any]]]:
     """
-    Performs transcription and diarization using a structured workflow with helper functions.
+    Converts, transcribes, diarizes and merges one audio file with already loaded models.
 
-    Args:
-        input_audio_path: Path to the input audio file.
-        whisper_model_size: Size of the FasterWhisper model.
-        compute_type: Compute type for Whisper.
-        language: Optional language code for transcription (None for auto-detect).
-        hf_token: Hugging Face API token for Pyannote model access.
-        pyannote_pipeline_name: Name of the Pyannote pipeline model.
-
-    Returns:
-        A list of merged segment dictionaries (with 'text', 'start', 'end', 'speaker'),
-        or None if a critical error occurs.
+    With parallel_diarization, diarization runs on a background thread while
+    Whisper transcribes, so total time approaches the longer of the two
+    instead of their sum (at the cost of both models working at once).
     """
     log(f"Starting transcription & diarization process for: {input_audio_path.name}", "INFO")
     if not input_audio_path.is_file():
@@ -285,17 +407,10 @@ def transcribe_and_diarize(
 
     # Initialize variables
     temp_wav_path: Optional[Path] = None
-    whisper_model: Optional[WhisperModel] = None
-    diarization_pipeline: Optional[PyannotePipeline] = None
     final_result: Optional[List[Dict[str, Any]]] = None
 
     try:
-        # Step 1: Determine Compute Device
-        compute_device = _get_compute_device()
-        if not compute_device: # Should not happen based on _get_compute_device logic
-             raise RuntimeError("Could not determine compute device.")
-
-        # Step 2: Prepare WAV Audio File
+        # Step 1: Prepare WAV Audio File
         temp_wav_path = input_audio_path.parent / f"{input_audio_path.stem}__{uuid.uuid4().hex[:8]}_temp.wav"
         log(f"Using temporary WAV path: {temp_wav_path}", "DEBUG")
         if not convert_to_wav(input_audio_path, temp_wav_path):
@@ -303,23 +418,26 @@ def transcribe_and_diarize(
         wav_path_to_process = temp_wav_path if input_audio_path.suffix.lower() != ".wav" else input_audio_path
         log(f"Processing audio from: {wav_path_to_process.name}", "DEBUG")
 
-        # Step 3: Load AI Models
-        whisper_model, diarization_pipeline = _load_models(
-            whisper_model_size, compute_type, pyannote_pipeline_name, hf_token, compute_device
-        )
-        if not whisper_model or not diarization_pipeline:
-            raise RuntimeError("Failed to load necessary AI models.")
-
-        # Step 4: Run Transcription
-        transcript_segments = _run_transcription(whisper_model, wav_path_to_process, language)
+        # Step 2: Run Transcription (with diarization alongside if enabled)
+        diarization_future = None
+        if parallel_diarization:
+            log("Running diarization concurrently with transcription.", "DEBUG")
+            diarization_future = _diarization_executor.submit(_run_diarization, diarization_pipeline, wav_path_to_process)
+        try:
+            transcript_segments = _run_transcription(whisper_model, wav_path_to_process, language, batch_size)
+        finally:
+            # Always wait, so the temporary WAV is never removed while diarization still reads it
+            # (_run_diarization handles its own errors and returns None on failure)
+            diarization_result = diarization_future.result() if diarization_future else None
         if transcript_segments is None:
             raise RuntimeError("Transcription step failed.")
 
-        # Step 5: Run Diarization
-        diarization_result = _run_diarization(diarization_pipeline, wav_path_to_process)
+        # Step 3: Run Diarization (unless it already ran alongside transcription)
+        if diarization_future is None:
+            diarization_result = _run_diarization(diarization_pipeline, wav_path_to_process)
         # Diarization failure (result=None) is handled within the merge step
 
-        # Step 6: Merge Results
+        # Step 4: Merge Results
         final_result = _merge_results(transcript_segments, diarization_result)
         if final_result is None:
             raise RuntimeError("Merging transcription and diarization results failed.")
@@ -333,12 +451,131 @@ def transcribe_and_diarize(
          final_result = None # Ensure failure state
 
     finally:
-        # Step 7: Cleanup Temporary File (always attempt)
+        # Step 5: Cleanup Temporary File (always attempt)
         _cleanup_temp_file(temp_wav_path, input_audio_path)
 
     return final_result
 
 
+# --- Main Public Functions ---
+
+def transcribe_and_diarize(
+    input_audio_path: Path,
+    whisper_model_size: str = DEFAULT_WHISPER_MODEL,
+    compute_type: str = DEFAULT_COMPUTE_TYPE,
+    language: Optional[str] = None,
+    hf_token: Optional[str] = os.environ.get("HUGGING_FACE_TOKEN"), # Default to env var
+    pyannote_pipeline_name: str = DEFAULT_PYANNOTE_PIPELINE,
+    batch_size: int = 0,
+    models: Optional[Tuple[WhisperModel, PyannotePipeline]] = None,
+    feature_device: str = "auto",
+    parallel_diarization: bool = False,
+    compile_diarization: bool = False,
+    num_workers: int = 1,
+    cpu_threads: int = 0,
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Performs transcription and diarization using a structured workflow with helper functions.
+
+    Args:
+        input_audio_path: Path to the input audio file.
+        whisper_model_size: Size of the FasterWhisper model.
+        compute_type: Compute type for Whisper.
+        language: Optional language code for transcription (None for auto-detect).
+        hf_token: Hugging Face API token for Pyannote model access.
+        pyannote_pipeline_name: Name of the Pyannote pipeline model.
+        batch_size: Whisper batched-inference batch size (0 decodes sequentially).
+        models: Optional pre-loaded (Whisper model, Pyannote pipeline) pair, e.g. from
+                get_whisper_model / get_pyannote_pipeline. Fetched from the model
+                registry when omitted.
+        feature_device: Device for Whisper's mel feature extraction ('auto' uses the
+                        compute device when it is a GPU, else 'cpu').
+        parallel_diarization: Run diarization concurrently with transcription.
+        compile_diarization: Wrap the Pyannote segmentation model in torch.compile.
+        num_workers: CTranslate2 workers (parallel model replicas) for Whisper.
+        cpu_threads: CTranslate2 threads per worker for CPU decoding (0 = default).
+
+    Returns:
+        A list of merged segment dictionaries (with 'text', 'start', 'end', 'speaker'),
+        or None if a critical error occurs.
+    """
+    results = transcribe_and_diarize_batch(
+        [input_audio_path], whisper_model_size, compute_type, language,
+        hf_token, pyannote_pipeline_name, batch_size, models, feature_device,
+        parallel_diarization, compile_diarization, num_workers, cpu_threads
+    )
+    return results[0]
+
+
+def transcribe_and_diarize_batch(
+    input_audio_paths: List[Path],
+    whisper_model_size: str = DEFAULT_WHISPER_MODEL,
+    compute_type: str = DEFAULT_COMPUTE_TYPE,
+    language: Optional[str] = None,
+    hf_token: Optional[str] = os.environ.get("HUGGING_FACE_TOKEN"), # Default to env var
+    pyannote_pipeline_name: str = DEFAULT_PYANNOTE_PIPELINE,
+    batch_size: int = 0,
+    models: Optional[Tuple[WhisperModel, PyannotePipeline]] = None,
+    feature_device: str = "auto",
+    parallel_diarization: bool = False,
+    compile_diarization: bool = False,
+    num_workers: int = 1,
+    cpu_threads: int = 0,
+) -> List[Optional[List[Dict[str, Any]]]]:
+    """
+    Transcribes and diarizes several audio files with one set of loaded models.
+
+    The models are fetched once for the whole batch. Files are grouped into
+    duration buckets (0-30s, 30-120s, 120-600s, 600s+, read from the audio
+    header) and processed shortest first, so similarly long recordings run back
+    to back and batched decoding does not pad short files to a long one.
+    Files whose duration cannot be read are ordered by size after the others.
+    Results are returned in input order.
+
+    Args:
+        input_audio_paths: Paths to the input audio files.
+        (remaining arguments as for transcribe_and_diarize, shared by all files)
+
+    Returns:
+        One entry per input path: its merged segment list, or None if that file failed.
+    """
+    results: List[Optional[List[Dict[str, Any]]]] = [None] * len(input_audio_paths)
+    if not input_audio_paths:
+        return results
+
+    # Step 1: Load AI Models (once for every file in the batch) unless the caller supplied them
+    if models is not None:
+        whisper_model, diarization_pipeline = models
+    else:
+        whisper_model, diarization_pipeline = _load_models(
+            whisper_model_size, compute_type, pyannote_pipeline_name, hf_token, _get_compute_device(),
+            compile_diarization, num_workers, cpu_threads
+        )
+    if not whisper_model or not diarization_pipeline:
+        log("Failed to load necessary AI models. No files in the batch were processed.", "ERROR")
+        return results
+
+    # Compute mel features on the GPU so decoding is not held up by CPU preprocessing
+    install_feature_extractor(whisper_model, _resolve_feature_device(feature_device))
+
+    def _schedule_key(index: int) -> Tuple[int, int, float]:
+        duration = get_audio_duration(input_audio_paths[index])
+        if duration is not None:
+            return (0, duration_bucket(duration), duration)
+        try:
+            return (1, 0, float(input_audio_paths[index].stat().st_size))
+        except OSError:
+            return (1, 0, 0.0) # Missing files fail fast in _process_audio_file
+
+    # Step 2: Process each file, grouping similar durations together
+    for index in sorted(range(len(input_audio_paths)), key=_schedule_key):
+        results[index] = _process_audio_file(
+            input_audio_paths[index], whisper_model, diarization_pipeline, language, batch_size,
+            parallel_diarization
+        )
+    return results
+
+
 # Example usage block (remains the same for testing the public function)
 if __name__ == "__main__":
     from src.utils.log import setup_logging # Need setup for the test
@@ -1,7 +1,7 @@
 # src/transcript_reformatter.py
 import html  # For escaping user-generated text to prevent XSS
 import math
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path # Keep for test block
 
 # Assuming log utility is set up and functional
@@ -37,35 +37,17 @@ def _format_timestamp(seconds: Optional[float]) -> str:
         return "[??:??]" # Placeholder indicating an error
 
 
-def format_transcript_html(transcript_segments: List[Dict[str, Any]]) -> str:
-    """
-    Formats a list of transcript segments (containing 'start', 'text', and 'speaker_name')
-    into a structured and styled HTML string representation.
-
-    Args:
-        transcript_segments: The list of transcript segment dictionaries.
-
-    Returns:
-        A string containing the complete HTML document.
-    """
-    # Handle empty transcript input gracefully
-    if not transcript_segments:
-        log("Cannot format HTML: Input transcript segments list is empty.", "WARNING")
-        # Return a minimal valid HTML structure indicating emptiness
-        # Added some basic styling for the empty message
-        return """<!DOCTYPE html>
+# --- HTML Templates ---
+# Returned when there are no segments to render
+_EMPTY_TRANSCRIPT_HTML = """<!DOCTYPE html>
 <html lang="en">
 <head><meta charset="utf-8"><title>Transcript</title><style>body{font-family:sans-serif;padding:20px;}.empty-transcript{color:grey;font-style:italic;text-align:center;}</style></head>
 <body><p class="empty-transcript">[Transcript data is empty or missing]</p></body>
 </html>"""
 
-    log(f"Formatting {len(transcript_segments)} segments into HTML...", "INFO")
-    html_parts = [] # Use a list to build the HTML string efficiently
-    current_speaker_name = None # Track the current speaker to group segments
-
-    # --- HTML Header and Inline CSS Styling ---
-    # Inline CSS makes the HTML file self-contained. Can be moved external if preferred.
-    html_parts.append("""<!DOCTYPE html>
+# Document head with inline CSS (keeps the HTML file self-contained; can be moved
+# external if preferred) and the opening of the transcript container
+_HTML_HEADER = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -136,52 +118,105 @@ def format_transcript_html(transcript_segments: List[Dict[str, Any]]) -> str:
 </head>
 <body>
 <div class="transcript-container">
-    <h2>Conversation Transcript</h2>""") # Main title for the transcript
+    <h2>Conversation Transcript</h2>"""
+
+
+def render_transcript_outputs(transcript_segments: List[Dict[str, Any]]) -> Tuple[str, str]:
+    """
+    Renders the HTML transcript and the plain-text LLM input in a single pass.
+
+    Both outputs are derived from the same segments; building them in one loop
+    reads each segment's fields once instead of walking the list per output.
+
+    Args:
+        transcript_segments: The list of transcript segment dictionaries
+                             (containing 'start', 'text', and 'speaker_name').
+
+    Returns:
+        (html, analysis_text): The complete HTML document and the transcript as
+        'Speaker: text' lines (segments without text are left out).
+    """
+    # Handle empty transcript input gracefully
+    if not transcript_segments:
+        log("Cannot format HTML: Input transcript segments list is empty.", "WARNING")
+        # Return a minimal valid HTML structure indicating emptiness
+        return _EMPTY_TRANSCRIPT_HTML, ""
+
+    log(f"Formatting {len(transcript_segments)} segments into HTML and text...", "INFO")
+    html_parts = [_HTML_HEADER] # Use a list to build the HTML string efficiently
+    text_lines = [] # 'Speaker: text' lines for LLM analysis
+    current_speaker_name = None # Track the current speaker to group segments
 
     # --- Process Each Transcript Segment ---
-    for i, segment in enumerate(transcript_segments):
+    for segment in transcript_segments:
+        if not isinstance(segment, dict): continue # Skip malformed entries
         # Safely get segment data, providing default fallbacks
-        speaker_name = segment.get("speaker_name", "Unknown Speaker")
         start_time = segment.get("start") # Format function handles None
-        text = segment.get("text", "").strip() # Use stripped text
+        raw_text = segment.get("text") or ""
+        speaker_name = segment.get("speaker_name") # Looked up once for both outputs
+
+        # --- Plain-text line for analysis (includes speaker names for context) ---
+        if raw_text:
+            text_lines.append(f"{'Unknown' if speaker_name is None else speaker_name}: {raw_text}")
 
         # --- Security: Escape speaker name and text to prevent XSS ---
-        safe_speaker_name = html.escape(speaker_name, quote=True)
-        safe_text = html.escape(text, quote=True)
+        safe_speaker_name = html.escape("Unknown Speaker" if speaker_name is None else str(speaker_name), quote=True)
+        safe_text = html.escape(raw_text.strip(), quote=True) # Use stripped text
 
         # --- Group Segments by Speaker ---
         # Check if the speaker has changed from the previous segment
         if safe_speaker_name != current_speaker_name:
-            # If this isn't the very first segment, close the previous speaker's block
-            if i > 0:
+            # If a speaker block is already open, close it
+            if current_speaker_name is not None:
                  html_parts.append('</div>') # Close previous speaker-block div
             # Start a new block for the new speaker
-            html_parts.append('<div class="speaker-block">')
-            html_parts.append(f'<div class="speaker-name">{safe_speaker_name}</div>')
+            html_parts.append(f'<div class="speaker-block"><div class="speaker-name">{safe_speaker_name}</div>')
             current_speaker_name = safe_speaker_name # Remember the new current speaker
 
         # --- Add Formatted Segment Content ---
-        # Format the start timestamp using the helper function
-        timestamp_str = _format_timestamp(start_time)
-        # Create a div for the segment row (timestamp + text)
-        html_parts.append(f'<div class="segment">')
-        html_parts.append(f'<span class="timestamp">{timestamp_str}</span>')
-        # Replace escaped newline characters with HTML <br> tags for display
-        safe_text_with_breaks = safe_text.replace('\n', '<br>')
-        html_parts.append(f'<span class="segment-text">{safe_text_with_breaks}</span>')
-        html_parts.append('</div>') # Close segment div
+        # Segment row (timestamp + text); escaped newlines become <br> tags for display
+        html_parts.append(
+            f'<div class="segment"><span class="timestamp">{_format_timestamp(start_time)}</span>'
+            f'<span class="segment-text">{safe_text.replace(chr(10), "<br>")}</span></div>'
+        )
 
     # --- Final HTML Cleanup ---
-    # Ensure the very last speaker block div is closed if there were segments
-    if transcript_segments:
-         html_parts.append('</div>') # Close final speaker-block div
-    # Close the main container and HTML body/html tags
-    html_parts.append('</div>') # Close transcript-container div
-    html_parts.append('</body></html>')
+    # Close the last speaker block, the main container and the HTML body/html tags
+    html_parts.append('</div></div></body></html>')
 
     log("HTML transcript formatting complete.", "SUCCESS")
-    # Efficiently join all generated HTML parts into a single string
-    return "".join(html_parts)
+    # Efficiently join all generated parts into single strings
+    return "".join(html_parts), "\n".join(text_lines).strip()
+
+
+def format_transcript_html(transcript_segments: List[Dict[str, Any]]) -> str:
+    """
+    Formats a list of transcript segments (containing 'start', 'text', and 'speaker_name')
+    into a structured and styled HTML string representation.
+
+    Args:
+        transcript_segments: The list of transcript segment dictionaries.
+
+    Returns:
+        A string containing the complete HTML document.
+    """
+    return render_transcript_outputs(transcript_segments)[0]
+
+
+def transcript_analysis_text(transcript_segments: List[Dict[str, Any]]) -> str:
+    """
+    Builds only the 'Speaker: text' LLM input (same text as render_transcript_outputs).
+
+    Args:
+        transcript_segments: The list of transcript segment dictionaries.
+
+    Returns:
+        The transcript as newline-separated 'Speaker: text' lines.
+    """
+    return "\n".join(
+        f"{segment.get('speaker_name', 'Unknown')}: {segment['text']}"
+        for segment in transcript_segments if isinstance(segment, dict) and segment.get("text")
+    ).strip()
 
 
 # Example usage block (no changes needed here)
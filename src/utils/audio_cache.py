@@ -0,0 +1,213 @@
+# src/utils/audio_cache.py
+
+import os
+import mmap
+import hashlib
+import threading
+import traceback
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.utils.log import log, log_enabled
+from src.utils.config_schema import PROJECT_ROOT
+from src.utils.file_io import SegmentsView, decode_segments, loads_json, write_json, ensure_dir, \
+    SEGMENT_FORMAT_SUFFIXES, DEFAULT_SEGMENT_FORMAT
+
+# --- Constants ---
+# Cached transcription + diarization results live here, one JSON file per key
+CACHE_DIR = PROJECT_ROOT / ".cache" / "transcribe"
+# Sidecar mapping cheap file fingerprints (path, size, mtime) to content digests
+INDEX_PATH = CACHE_DIR / "index.json"
+# Keep the fingerprint index bounded; oldest entries are dropped first
+MAX_INDEX_ENTRIES = 1000
+
+# --- Fingerprint Index (loaded lazily, shared between job threads) ---
+_index: Optional[Dict[str, str]] = None
+_index_lock = threading.Lock()
+
+
+def hash_file(file_path: Path) -> Optional[str]:
+    """
+    Computes a content hash of a file.
+
+    The file is memory-mapped and hashed in one call, letting the kernel page it
+    in instead of copying it through Python-level reads. Uses BLAKE2b from the
+    standard library (fast, no extra dependency).
+
+    Args:
+        file_path: Path to the file to hash.
+
+    Returns:
+        The hex digest of the file contents, or None if the file could not be read.
+    """
+    hasher = hashlib.blake2b()
+    try:
+        with open(file_path, "rb") as f:
+            # mmap cannot map empty files; an empty file hashes to the empty digest
+            if os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hasher.update(mapped)
+    except (OSError, ValueError) as e:
+        log(f"Could not hash '{file_path}' for transcription cache: {e}", "WARNING")
+        return None
+    return hasher.hexdigest()
+
+
+def _load_index() -> Dict[str, str]:
+    """Returns the in-memory fingerprint index, reading the sidecar file on first use."""
+    global _index
+    if _index is None:
+        _index = {}
+        if INDEX_PATH.is_file():
+            try:
+                loaded = loads_json(INDEX_PATH.read_bytes())
+                if isinstance(loaded, dict):
+                    _index = loaded
+            except (OSError, ValueError) as e:
+                log(f"Ignoring unreadable transcription cache index: {e}", "WARNING")
+    return _index
+
+
+def get_audio_digest(file_path: Path, stat_result: Optional[os.stat_result] = None) -> Optional[str]:
+    """
+    Returns the content digest of an audio file, hashing only when necessary.
+
+    A cheap fingerprint (path, size, mtime_ns) is looked up in the sidecar index
+    first; the file is only hashed when the fingerprint is unknown, so re-runs
+    of an unchanged file skip hashing entirely.
+
+    Args:
+        file_path: Absolute path to the audio file.
+        stat_result: Optional stat result for the file, to avoid a second stat call.
+
+    Returns:
+        The content hex digest, or None if the file could not be read.
+    """
+    try:
+        st = stat_result or os.stat(file_path)
+    except OSError as e:
+        log(f"Could not stat '{file_path}' for transcription cache: {e}", "WARNING")
+        return None
+    fast_key = f"{file_path}:{st.st_size}:{st.st_mtime_ns}"
+
+    with _index_lock:
+        digest = _load_index().get(fast_key)
+    if digest:
+        log(f"Audio fingerprint known, skipping content hash for '{file_path.name}'.", "DEBUG")
+        return digest
+
+    digest = hash_file(file_path)
+    if not digest:
+        return None
+
+    with _index_lock:
+        index = _load_index()
+        index[fast_key] = digest
+        while len(index) > MAX_INDEX_ENTRIES:
+            index.pop(next(iter(index)))
+        try:
+            ensure_dir(CACHE_DIR)
+            write_json(INDEX_PATH, index, indent=False)
+        except OSError as e:
+            log(f"Failed to update transcription cache index: {e}", "WARNING")
+    return digest
+
+
+def make_key(audio_digest: str, whisper_model: str, compute_type: str,
+             language: Optional[str], pyannote_pipeline: str, batch_size: int = 0) -> str:
+    """
+    Builds the cache key for one audio file + processing settings combination.
+
+    The settings are folded into the key because any of them changes the output.
+    The combined string is hashed again so the key is safe to use as a filename
+    (pipeline names such as 'pyannote/speaker-diarization-3.1' contain slashes).
+
+    Args:
+        audio_digest: Content hash of the audio file (see get_audio_digest).
+        whisper_model: Whisper model size used for transcription.
+        compute_type: Compute type used for transcription.
+        language: Transcription language code, or None for auto-detect.
+        pyannote_pipeline: Name of the diarization pipeline.
+        batch_size: Whisper batched-inference batch size (0 = sequential). Batched
+            decoding segments the audio differently, so it yields other results.
+
+    Returns:
+        A hex string uniquely identifying the cached result.
+    """
+    key_parts = [audio_digest, str(whisper_model), str(compute_type), str(language), str(pyannote_pipeline)]
+    if batch_size > 0:
+        # Appended only when batched, so existing sequential cache entries stay valid
+        key_parts.append(f"batch{batch_size}")
+    raw_key = "-".join(key_parts)
+    return hashlib.sha256(raw_key.encode("utf-8")).hexdigest()
+
+
+def _cache_path(key: str, fmt: str) -> Path:
+    """Returns the cache file path for a given key and segment format."""
+    return CACHE_DIR / f"{key}{SEGMENT_FORMAT_SUFFIXES[fmt]}"
+
+
+def get(key: str, fmt: str = DEFAULT_SEGMENT_FORMAT) -> Optional[SegmentsView]:
+    """
+    Looks up previously produced transcript segments for a cache key.
+
+    Entries are stored in the same format as the intermediate transcript, so
+    a hit can be written out again without re-encoding.
+
+    Args:
+        key: The cache key (see make_key).
+        fmt: The segment format to look up ('json' or 'msgpack').
+
+    Returns:
+        A SegmentsView holding the cached bytes and the parsed segment list,
+        or None on a cache miss or if the cached file is unreadable/corrupt.
+    """
+    cache_file = _cache_path(key, fmt)
+    try:
+        payload = cache_file.read_bytes()
+    except FileNotFoundError:
+        log(f"Transcription cache miss for key {key[:12]}...", "DEBUG")
+        return None
+    except OSError as e:
+        log(f"Failed to read transcription cache entry '{cache_file.name}': {e}", "WARNING")
+        return None
+    try:
+        segments = decode_segments(payload, fmt)
+    except ValueError as e:
+        log(f"Ignoring corrupt transcription cache entry '{cache_file.name}': {e}", "WARNING")
+        return None
+    if not isinstance(segments, list):
+        log(f"Ignoring invalid transcription cache entry (not a list): {cache_file.name}", "WARNING")
+        return None
+    log(f"Transcription cache hit for key {key[:12]}... ({len(segments)} segments).", "DEBUG")
+    return SegmentsView(payload=payload, segments=segments, format=fmt)
+
+
+def put(key: str, view: SegmentsView) -> bool:
+    """
+    Stores serialized transcript segments in the cache under the given key.
+
+    The already-encoded payload is written as-is, so caching never
+    serializes the segments a second time (long JSON transcripts without a
+    payload are streamed to the cache file instead).
+
+    Args:
+        key: The cache key (see make_key).
+        view: The segments and their JSON payload.
+
+    Returns:
+        True if the entry was written, False otherwise. Cache write failures
+        are logged but never fatal for the pipeline.
+    """
+    cache_file = _cache_path(key, view.format)
+    try:
+        ensure_dir(CACHE_DIR)
+        view.write_to(cache_file)
+        log(f"Stored transcription result in cache: {cache_file.name}", "DEBUG")
+        return True
+    except Exception as e:
+        log(f"Failed to write transcription cache entry '{cache_file.name}': {e}", "WARNING")
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
+        return False
+
+# --- End of src/utils/audio_cache.py ---
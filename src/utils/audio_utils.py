@@ -1,11 +1,14 @@
 # src/utils/audio_utils.py
 
+import os
 import traceback
 import shutil
+import threading
 from pathlib import Path
+from typing import Optional
 
 # Import logging utility
-from src.utils.log import log
+from src.utils.log import log, log_enabled
 
 # --- Pydub Import (Optional Dependency) ---
 try:
@@ -21,6 +24,15 @@ except ImportError:
     CouldntDecodeError = None # Define exception type as None if pydub missing
     PYDUB_AVAILABLE = False
 
+# --- SoundFile Import (Optional Dependency) ---
+try:
+    # SoundFile reads audio headers (duration) without decoding the samples
+    import soundfile
+    SOUNDFILE_AVAILABLE = True
+except ImportError:
+    soundfile = None
+    SOUNDFILE_AVAILABLE = False
+
 def convert_to_wav(input_path: Path, output_path: Path) -> bool:
     """
     Converts an audio file to WAV format, saving it to the output path.
@@ -96,7 +108,78 @@ def convert_to_wav(input_path: Path, output_path: Path) -> bool:
     except Exception as e:
         # Catch any other unexpected errors during the conversion process
         log(f"Unexpected error converting '{input_path.name}' to WAV: {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG") # Log traceback for detailed debugging
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG") # Log traceback for detailed debugging
         return False
 
+
+# Chunk size for the fallback read-ahead (keeps memory use flat for large files)
+PREFETCH_CHUNK_SIZE = 4 * 1024 * 1024
+
+def _read_and_discard(file_path: Path):
+    """Reads a file in chunks and discards the data, pulling it into the OS page cache."""
+    try:
+        with open(file_path, "rb") as f:
+            while f.read(PREFETCH_CHUNK_SIZE):
+                pass
+        log(f"Prefetched '{file_path.name}' into page cache.", "DEBUG")
+    except OSError as e:
+        log(f"Prefetch of '{file_path.name}' failed (ignored): {e}", "DEBUG")
+
+def prefetch_file(file_path: Path):
+    """
+    Starts reading a file into the OS page cache without blocking the caller.
+
+    On Linux this is a posix_fadvise(WILLNEED) hint that the kernel serves
+    asynchronously; elsewhere a daemon thread reads the file once. Failures are
+    ignored, since prefetching is purely an optimization.
+
+    Args:
+        file_path: Path to the file that will be read soon.
+    """
+    if hasattr(os, "posix_fadvise"):
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+            log(f"Requested kernel read-ahead for '{file_path.name}'.", "DEBUG")
+        except OSError as e:
+            log(f"posix_fadvise prefetch for '{file_path.name}' failed (ignored): {e}", "DEBUG")
+        return
+    threading.Thread(target=_read_and_discard, args=(file_path,), daemon=True).start()
+
+
+# Upper bounds (seconds) of the duration buckets used to group similar recordings;
+# anything longer than the last bound falls into a final open-ended bucket
+DURATION_BUCKET_BOUNDS = (30.0, 120.0, 600.0)
+
+def get_audio_duration(file_path: Path) -> Optional[float]:
+    """
+    Returns the duration of an audio file in seconds, read from its header.
+
+    Only the file header is parsed, so this is cheap even for long recordings.
+
+    Args:
+        file_path: Path to the audio file.
+
+    Returns:
+        The duration in seconds, or None if soundfile is not installed or the
+        format is not supported by libsndfile (callers fall back to file size).
+    """
+    if not SOUNDFILE_AVAILABLE:
+        return None
+    try:
+        return float(soundfile.info(str(file_path)).duration)
+    except Exception as e:
+        log(f"Could not read duration of '{file_path.name}': {e}", "DEBUG")
+        return None
+
+def duration_bucket(duration: float) -> int:
+    """Returns the index of the duration bucket (0-30s, 30-120s, 120-600s, 600s+) for a duration."""
+    for index, upper_bound in enumerate(DURATION_BUCKET_BOUNDS):
+        if duration < upper_bound:
+            return index
+    return len(DURATION_BUCKET_BOUNDS)
+
 # --- End of src/utils/audio_utils.py ---
\ No newline at end of file
@@ -2,6 +2,8 @@
 
 import yaml
 import os # Keep os for path checks if needed, though pathlib is primary
+import copy
+import functools
 from pathlib import Path
 # Import the configured logger
 # Assuming log.py is correctly set up and importable
@@ -17,6 +19,11 @@ except NameError:
      PROJECT_ROOT = Path.cwd()
      log(f"Could not resolve PROJECT_ROOT from __file__, using current working directory: {PROJECT_ROOT}", "WARNING")
 
+# Web app folders for uploaded audio and downloadable results (shared by app.py and the routes)
+UPLOAD_FOLDER_NAME = "audio"
+RESULTS_FOLDER_NAME = "results"
+UPLOAD_FOLDER = PROJECT_ROOT / UPLOAD_FOLDER_NAME
+RESULTS_FOLDER = PROJECT_ROOT / RESULTS_FOLDER_NAME
 
 # Define the default path to the schema file, expected in the project root
 DEFAULT_SCHEMA_PATH = PROJECT_ROOT / "config_schema.yaml"
@@ -29,14 +36,25 @@ def load_schema(schema_path: Path = DEFAULT_SCHEMA_PATH) -> dict:
         schema_path: The path to the schema file. Defaults to DEFAULT_SCHEMA_PATH
                      (config_schema.yaml in the project root).
 
+    Parsed schemas are cached per (path, mtime), so repeated calls (every job
+    and config request) skip the YAML parse until the file changes. Callers
+    get their own copy and may modify it freely.
+
     Returns:
         A dictionary containing the loaded schema, or an empty dictionary if
         the file is not found, empty, invalid, or not a dictionary.
     """
-    if not schema_path.is_file():
+    try:
+        mtime_ns = os.stat(schema_path).st_mtime_ns
+    except OSError:
         log(f"Configuration schema file not found at: {schema_path}", "ERROR")
         return {}
+    return copy.deepcopy(_load_schema_cached(str(schema_path), mtime_ns))
 
+@functools.lru_cache(maxsize=4)
+def _load_schema_cached(schema_path_str: str, mtime_ns: int) -> dict:
+    """Parses the schema file; memoized on (path, mtime_ns) so edits invalidate it."""
+    schema_path = Path(schema_path_str)
     try:
         with open(schema_path, "r", encoding='utf-8') as f:
             schema = yaml.safe_load(f) # Use safe_load for security
@@ -76,9 +94,24 @@ def parse_schema_for_ui(schema_path: Path = DEFAULT_SCHEMA_PATH) -> dict:
         A dictionary where keys are configuration item names and values are
         dictionaries containing UI-relevant info ('type', 'description', 'default',
         'options'?, 'properties'?), or an empty dictionary on error.
+
+    Like load_schema, the result is memoized per (path, mtime), so every
+    /config_info request after the first skips the parse until the schema
+    file changes. Callers get their own copy.
     """
-    # log(f"Parsing schema for UI from: {schema_path}", "DEBUG") # Optional debug log
-    schema = load_schema(schema_path)
+    try:
+        mtime_ns = os.stat(schema_path).st_mtime_ns
+    except OSError:
+        log(f"Configuration schema file not found at: {schema_path}", "ERROR")
+        return {}
+    return copy.deepcopy(_parse_schema_for_ui_cached(str(schema_path), mtime_ns))
+
+@functools.lru_cache(maxsize=4)
+def _parse_schema_for_ui_cached(schema_path_str: str, mtime_ns: int) -> dict:
+    """Builds the UI schema; memoized on (path, mtime_ns) so edits invalidate it."""
+    # log(f"Parsing schema for UI from: {schema_path_str}", "DEBUG") # Optional debug log
+    # Read-only use of the cached schema; the result is copied by parse_schema_for_ui
+    schema = _load_schema_cached(schema_path_str, mtime_ns)
     if not schema:
         # load_schema already logged the error
         return {}
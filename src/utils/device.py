@@ -0,0 +1,67 @@
+# src/utils/device.py
+
+import platform
+import threading
+from typing import Optional
+
+# Import logging utility
+from src.utils.log import log
+
+# --- torch Import (Optional Dependency) ---
+try:
+    # Only needed to probe for GPUs; without it everything runs on the CPU
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    log("torch library not found. Compute device detection will report 'cpu'.", "DEBUG")
+    torch = None
+    TORCH_AVAILABLE = False
+
+# --- Cached Detection Result ---
+# The hardware does not change while the process runs, so it is probed once
+_compute_device_cache: Optional[str] = None
+_compute_device_lock = threading.Lock()
+
+
+def get_compute_device() -> str:
+    """
+    Detects and caches the optimal compute device (cuda > mps > cpu).
+
+    Kept free of the model libraries (faster-whisper, pyannote) so lightweight
+    callers such as the /config_info route can use it without importing them.
+
+    Returns:
+        'cuda', 'mps' or 'cpu'.
+    """
+    global _compute_device_cache
+    # Return cached value if already detected
+    if _compute_device_cache is not None:
+        return _compute_device_cache
+
+    with _compute_device_lock:
+        if _compute_device_cache is not None: # Detected by another thread meanwhile
+            return _compute_device_cache
+        device = "cpu" # Default fallback
+        try:
+            if not TORCH_AVAILABLE:
+                log("torch not available. Using 'cpu'.", "INFO")
+            elif torch.cuda.is_available():
+                device = "cuda"
+                log("CUDA (NVIDIA GPU) detected. Using 'cuda'.", "INFO")
+            elif platform.system() == "Darwin" and hasattr(torch.backends, "mps") and torch.backends.mps.is_available() and torch.backends.mps.is_built():
+                # Check specifically for Apple Silicon MPS support
+                device = "mps"
+                log("Apple MPS detected and available. Using 'mps'.", "INFO")
+            else:
+                # If no GPU detected or MPS not available/built
+                log("No CUDA or available MPS GPU detected. Using 'cpu'.", "INFO")
+        except Exception as e:
+            # Catch potential errors during detection (e.g., library issues)
+            log(f"Error during compute device detection: {e}. Falling back to 'cpu'.", "WARNING")
+            device = "cpu" # Ensure fallback on error
+
+        # Cache and return the determined device
+        _compute_device_cache = device
+        return device
+
+# --- End of src/utils/device.py ---
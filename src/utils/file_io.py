@@ -0,0 +1,545 @@
+# src/utils/file_io.py
+
+import os
+import re
+import json
+import mmap
+import tempfile
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+# Import logging utility
+from src.utils.log import log
+from src.utils.results_index import register_result
+
+# --- orjson Import (Optional Dependency) ---
+try:
+    # orjson is a C extension that serializes JSON several times faster than the stdlib
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    log("orjson library not found. Falling back to the standard json module. Install with 'pip install orjson'.", "DEBUG")
+    orjson = None
+    ORJSON_AVAILABLE = False
+
+# --- msgpack Import (Optional Dependency) ---
+try:
+    # msgpack gives a compact binary encoding for large transcript segment lists
+    import msgpack
+    MSGPACK_AVAILABLE = True
+except ImportError:
+    log("msgpack library not found. Intermediate transcripts will be stored as JSON. Install with 'pip install msgpack'.", "DEBUG")
+    msgpack = None
+    MSGPACK_AVAILABLE = False
+
+# --- Segment File Formats ---
+# On-disk formats for transcript segment lists, mapped to their file suffix
+SEGMENT_FORMAT_SUFFIXES = {"json": ".json", "msgpack": ".msgpack"}
+DEFAULT_SEGMENT_FORMAT = "json"
+# JSON segment lists longer than this are streamed to disk element by element
+# instead of being encoded into one large in-memory blob first
+STREAM_SEGMENTS_THRESHOLD = 5000
+# Files at least this large are memory-mapped for decoding instead of read into bytes (see read_decoded)
+MMAP_READ_THRESHOLD = 1024 * 1024
+# Process umask, read once at import (os.umask can only be queried by setting it,
+# which is not thread-safe later on); applied to atomically written files
+_UMASK = os.umask(0o022)
+os.umask(_UMASK)
+
+# --- Context Snippet Files ---
+# Name detection context snippets are stored as one text file (snippets joined
+# by this separator) plus a small JSON index sidecar listing their keys in order
+CONTEXT_SNIPPET_SEPARATOR = "\n---SPKR_BREAK---\n"
+CONTEXT_INDEX_SUFFIX = "_index.json"
+# A snippet that itself contains the separator's marker would split into two on
+# read. Markers inside snippets are therefore escaped by adding one underscore
+# ('---SPKR_BREAK---' -> '---SPKR_BREAK_---', '---SPKR_BREAK_---' ->
+# '---SPKR_BREAK__---', ...) and unescaped by removing it again.
+_SNIPPET_MARKER_RE = re.compile(r"---SPKR_BREAK(_*)---")
+_ESCAPED_SNIPPET_MARKER_RE = re.compile(r"---SPKR_BREAK_(_*)---")
+
+# --- Intermediate Bundle Files ---
+# Optional single-file layout for Part 1's outputs: a JSON header line listing
+# the sections, then one compact JSON document per line (see write_bundle)
+BUNDLE_FORMAT_NAME = "transcriber-intermediate-bundle"
+BUNDLE_FORMAT_VERSION = 1
+
+# --- Directory Creation ---
+# Directories already created (or found) by ensure_dir in this process
+_ensured_dirs: set = set()
+_ensured_dirs_lock = threading.Lock()
+
+
+def ensure_dir(dir_path: Union[str, Path]) -> None:
+    """
+    Creates a directory (and its parents) once per process.
+
+    Later calls for the same path return without touching the filesystem,
+    so output directories can be "ensured" before every write for free.
+    Directories removed while the process runs are not re-created.
+
+    Raises:
+        OSError: If the directory cannot be created.
+    """
+    key = os.fspath(dir_path)
+    if key in _ensured_dirs: # Plain set lookup; the lock only guards insertion
+        return
+    os.makedirs(key, exist_ok=True)
+    with _ensured_dirs_lock:
+        _ensured_dirs.add(key)
+
+
+# --- Atomic Writes ---
+
+@contextmanager
+def _atomic_open(file_path: Path, mode: str = "wb", **open_kwargs) -> Iterator[IO]:
+    """
+    Opens a temporary file next to `file_path` that replaces it on success.
+
+    The data is written to a uniquely named '<name>.<random>.tmp' file, flushed
+    and fsync'ed once, then moved over the destination with os.replace (atomic
+    on POSIX and Windows). Readers therefore see either the old file or the
+    complete new one, never a truncated file from an interrupted write, and
+    concurrent writers to the same destination never share a temp file (the
+    last replace wins). On error the temp file is removed and the destination
+    is left untouched.
+
+    Args:
+        file_path: Final destination path (parent directory must exist).
+        mode: Write mode for open() ('wb' or 'w').
+        **open_kwargs: Passed to open() (encoding, buffering, ...).
+
+    Yields:
+        The open temporary file.
+    """
+    file_path = Path(file_path)
+    fd, tmp_name = tempfile.mkstemp(dir=file_path.parent, prefix=file_path.name + ".", suffix=".tmp")
+    tmp_path = Path(tmp_name)
+    try:
+        with os.fdopen(fd, mode, **open_kwargs) as f:
+            if hasattr(os, "fchmod"):
+                # mkstemp creates the file 0600; give it the permissions open() would have
+                os.fchmod(f.fileno(), 0o666 & ~_UMASK)
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        register_result(file_path) # Keep the download index current (no-op outside results/)
+    except BaseException:
+        try:
+            tmp_path.unlink(missing_ok=True)
+        except OSError:
+            pass
+        raise
+
+
+def atomic_write_bytes(file_path: Path, payload: bytes, drop_cache: bool = False) -> int:
+    """
+    Writes bytes to a file atomically (see _atomic_open).
+
+    Args:
+        file_path: Final destination path (parent directory must exist).
+        payload: The bytes to write.
+        drop_cache: Advise the kernel to evict the file's pages from the page
+            cache once written (POSIX only; ignored elsewhere). For large
+            outputs that are rarely read back.
+
+    Returns:
+        The number of bytes written.
+
+    Raises:
+        OSError: If the file cannot be written.
+    """
+    with _atomic_open(file_path, "wb") as f:
+        written = f.write(payload)
+        if drop_cache and hasattr(os, "posix_fadvise"):
+            # Pages must be clean to be dropped, so flush them out first
+            f.flush()
+            os.fsync(f.fileno())
+            try: os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+            except OSError: pass
+        return written
+
+
+def dumps_json(obj: Any, indent: bool = True) -> bytes:
+    """
+    Serializes an object to UTF-8 encoded JSON bytes.
+
+    Non-ASCII characters are kept as-is and non-string dictionary keys
+    (e.g. the integer keys of context snippets) are converted to strings,
+    matching the behaviour of json.dump(..., ensure_ascii=False).
+
+    Args:
+        obj: The object to serialize.
+        indent: Whether to indent the output by two spaces (human-readable files).
+
+    Returns:
+        The serialized JSON as bytes.
+    """
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option)
+    # Standard library fallback
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False).encode("utf-8")
+
+
+def loads_json(data: Union[bytes, memoryview, str]) -> Any:
+    """
+    Parses JSON from bytes (or another bytes-like buffer) or a string.
+
+    Args:
+        data: The JSON document.
+
+    Returns:
+        The parsed object.
+
+    Raises:
+        ValueError: If the data is not valid JSON (json.JSONDecodeError and
+                    orjson.JSONDecodeError are both ValueError subclasses).
+    """
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes() # json.loads only takes bytes/str
+    return json.loads(data)
+
+
+def write_json(file_path: Path, obj: Any, indent: bool = True) -> None:
+    """
+    Writes an object to a JSON file.
+
+    With orjson the document is encoded in one call and written with a single
+    write. Without it, json.dump streams the encoder's output straight into a
+    buffered file instead of first building the whole document as a string.
+    Either way the file is replaced atomically.
+
+    Args:
+        file_path: Destination path.
+        obj: The object to serialize.
+        indent: Whether to indent the output by two spaces.
+
+    Raises:
+        OSError: If the file cannot be written.
+        TypeError: If the object is not JSON serializable.
+    """
+    if ORJSON_AVAILABLE:
+        atomic_write_bytes(file_path, dumps_json(obj, indent=indent))
+        return
+    with _atomic_open(file_path, "w", encoding="utf-8", buffering=1024 * 1024) as f:
+        json.dump(obj, f, indent=2 if indent else None, ensure_ascii=False)
+
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[bytes]:
+    """
+    Encodes an iterable as a JSON array, yielding one chunk per element.
+
+    Each element is written compactly on its own line, so the output is
+    still a valid (and reasonably readable) JSON document while only a
+    single element is ever held in encoded form.
+
+    Args:
+        items: Any iterable of JSON-serializable objects (lists or generators).
+
+    Yields:
+        UTF-8 encoded chunks which, concatenated, form the JSON array.
+    """
+    yield b"["
+    separator = b"\n  "
+    for item in items:
+        yield separator + dumps_json(item, indent=False)
+        # Every element after the first is preceded by a comma (no trailing-comma fixup needed)
+        separator = b",\n  "
+    yield b"\n]"
+
+
+def write_json_array(file_path: Path, items: Iterable[Any]) -> int:
+    """
+    Streams an iterable to a JSON array file without building the full document.
+
+    The file is replaced atomically once all elements have been written.
+
+    Args:
+        file_path: Destination path.
+        items: Any iterable of JSON-serializable objects.
+
+    Returns:
+        The number of bytes written.
+
+    Raises:
+        OSError: If the file cannot be written.
+        TypeError: If an element is not JSON serializable.
+    """
+    written = 0
+    # Buffered writer coalesces the small per-element chunks into large writes
+    with _atomic_open(file_path, "wb", buffering=1024 * 1024) as f:
+        for chunk in iter_json_array(items):
+            written += f.write(chunk)
+    return written
+
+
+# --- Transcript Segment Files ---
+
+def resolve_segment_format(requested: Optional[str]) -> str:
+    """
+    Returns the segment file format to use for a requested format name.
+
+    Falls back to JSON for unknown names or when msgpack is not installed.
+
+    Args:
+        requested: The format from the configuration ('json' or 'msgpack').
+
+    Returns:
+        A key of SEGMENT_FORMAT_SUFFIXES.
+    """
+    if requested == "msgpack":
+        if MSGPACK_AVAILABLE:
+            return "msgpack"
+        log("msgpack requested for intermediate transcripts but not installed. Using JSON.", "WARNING")
+    elif requested and requested not in SEGMENT_FORMAT_SUFFIXES:
+        log(f"Unknown intermediate transcript format '{requested}'. Using JSON.", "WARNING")
+    return DEFAULT_SEGMENT_FORMAT
+
+
+def encode_segments(segments: List[Dict[str, Any]], fmt: str = DEFAULT_SEGMENT_FORMAT) -> bytes:
+    """Serializes a segment list in the given format ('json' or 'msgpack')."""
+    if fmt == "msgpack":
+        return msgpack.packb(segments, use_bin_type=True)
+    return dumps_json(segments)
+
+
+def read_decoded(file_path: Union[str, Path], decode: Callable[[Any], Any]) -> Any:
+    """
+    Reads a file and decodes it with `decode`, memory-mapping large files.
+
+    Files of MMAP_READ_THRESHOLD bytes or more are passed to `decode` as a
+    memoryview over a read-only mapping instead of being copied into a bytes
+    object first, roughly halving peak memory for long transcripts. Smaller
+    files are read normally (mapping costs more than it saves there).
+
+    Args:
+        file_path: The file to read.
+        decode: Callable taking a bytes-like object (e.g. loads_json, orjson and
+                msgpack both accept memoryviews).
+
+    Returns:
+        Whatever `decode` returns.
+
+    Raises:
+        OSError: If the file cannot be read.
+    """
+    with open(file_path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size < MMAP_READ_THRESHOLD:
+            return decode(f.read())
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            # The view must be released before the mapping can be closed
+            with memoryview(mapped) as view:
+                return decode(view)
+
+
+def decode_segments(payload: bytes, fmt: str = DEFAULT_SEGMENT_FORMAT) -> Any:
+    """
+    Parses a segment list serialized with encode_segments.
+
+    Raises:
+        ValueError: If the payload cannot be decoded (msgpack errors are
+                    re-raised as ValueError so callers handle one type).
+        RuntimeError: If the payload is msgpack but msgpack is not installed.
+    """
+    if fmt == "msgpack":
+        if not MSGPACK_AVAILABLE:
+            raise RuntimeError("Cannot read msgpack transcript: msgpack library is not installed.")
+        try:
+            return msgpack.unpackb(payload, raw=False)
+        except Exception as e:
+            raise ValueError(f"Invalid msgpack data: {e}") from e
+    return loads_json(payload)
+
+
+def segment_format_for_path(file_path: Path) -> str:
+    """Infers the segment file format from a file's suffix (JSON unless '.msgpack')."""
+    return "msgpack" if Path(file_path).suffix.lower() == SEGMENT_FORMAT_SUFFIXES["msgpack"] else DEFAULT_SEGMENT_FORMAT
+
+
+def read_segments(file_path: Path) -> Any:
+    """
+    Reads a transcript segment file, choosing the decoder from its suffix.
+
+    Args:
+        file_path: Path to a '.json' or '.msgpack' segment file.
+
+    Returns:
+        The decoded object (normally a list of segment dictionaries).
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If the content cannot be decoded.
+    """
+    fmt = segment_format_for_path(file_path)
+    return read_decoded(file_path, lambda payload: decode_segments(payload, fmt))
+
+
+# --- Context Snippet Files ---
+
+def context_index_path(text_path: Union[str, Path]) -> str:
+    """Returns the index sidecar path for a context snippet text file ('x.txt' -> 'x_index.json')."""
+    root, _ = os.path.splitext(os.fspath(text_path))
+    return root + CONTEXT_INDEX_SUFFIX
+
+
+def encode_context_snippets(snippets: Dict[Any, str]) -> Tuple[bytes, bytes]:
+    """
+    Serializes context snippets into a text payload and its index sidecar.
+
+    The snippets are written back to back in key order, so the review step
+    reads one plain text blob instead of parsing an indented JSON object of
+    long strings. Separator markers inside a snippet are escaped (see
+    _SNIPPET_MARKER_RE), so every snippet round-trips unchanged.
+
+    Args:
+        snippets: Mapping of segment index to snippet text.
+
+    Returns:
+        (text payload, JSON index payload listing the keys in snippet order).
+    """
+    keys = sorted(snippets)
+    text = CONTEXT_SNIPPET_SEPARATOR.join(_SNIPPET_MARKER_RE.sub(r"---SPKR_BREAK_\1---", snippets[key]) for key in keys)
+    return text.encode("utf-8"), dumps_json(keys, indent=False)
+
+
+def read_context_snippets(text_path: Union[str, Path]) -> Dict[str, str]:
+    """
+    Reads context snippets written with encode_context_snippets.
+
+    Files with a '.json' suffix (older jobs) are read as a JSON object.
+
+    Args:
+        text_path: Path to the snippet text file.
+
+    Returns:
+        Mapping of segment index (as a string, like the former JSON keys) to snippet text.
+
+    Raises:
+        OSError: If a file cannot be read.
+        ValueError: If the index does not match the number of snippets.
+    """
+    text_path = Path(text_path)
+    if text_path.suffix.lower() == ".json":
+        return loads_json(text_path.read_bytes())
+    keys = loads_json(Path(context_index_path(text_path)).read_bytes())
+    # Decoded from bytes: read_text's universal newlines would rewrite '\r\n' in snippets
+    texts = text_path.read_bytes().decode("utf-8").split(CONTEXT_SNIPPET_SEPARATOR) if keys else []
+    if len(keys) != len(texts):
+        raise ValueError(f"Context snippet index lists {len(keys)} entries but the file holds {len(texts)}.")
+    return {str(key): _ESCAPED_SNIPPET_MARKER_RE.sub(r"---SPKR_BREAK\1---", text) for key, text in zip(keys, texts)}
+
+
+# --- Intermediate Bundle Files ---
+
+def write_bundle(file_path: Union[str, Path], sections: Dict[str, Any]) -> Dict[str, List[int]]:
+    """
+    Writes several JSON documents into one newline-delimited bundle file.
+
+    Line 1 is a header naming the sections; each following line holds one
+    section as compact JSON. The byte offset and length of every section are
+    returned so readers can seek straight to the one they need. The file is
+    written with a single open and fsync and replaced atomically.
+
+    Args:
+        file_path: Destination path (parent directory must exist).
+        sections: Section name -> JSON-serializable document, in file order.
+
+    Returns:
+        Section name -> [byte offset, byte length] (length excludes the newline).
+
+    Raises:
+        OSError: If the file cannot be written.
+        TypeError: If a section is not JSON serializable.
+    """
+    offsets: Dict[str, List[int]] = {}
+    header = {"format": BUNDLE_FORMAT_NAME, "version": BUNDLE_FORMAT_VERSION, "sections": list(sections)}
+    with _atomic_open(file_path, "wb", buffering=1024 * 1024) as f:
+        f.write(dumps_json(header, indent=False) + b"\n")
+        for name, document in sections.items():
+            encoded = dumps_json(document, indent=False)
+            offsets[name] = [f.tell(), len(encoded)]
+            f.write(encoded + b"\n")
+    return offsets
+
+
+def read_bundle(file_path: Union[str, Path], offsets: Dict[str, List[int]],
+                names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """
+    Reads sections from a bundle written by write_bundle.
+
+    Only the requested sections are read and parsed (one open, one seek per section).
+
+    Args:
+        file_path: Path to the bundle file.
+        offsets: The offsets returned by write_bundle.
+        names: Sections to read (default: all sections in `offsets`).
+
+    Returns:
+        Section name -> parsed document, for the requested sections present in the bundle.
+
+    Raises:
+        OSError: If the file cannot be read.
+        ValueError: If a section cannot be parsed.
+    """
+    wanted = [name for name in (names if names is not None else offsets) if name in offsets]
+    result: Dict[str, Any] = {}
+    with open(file_path, "rb") as f:
+        for name in wanted:
+            offset, length = offsets[name]
+            f.seek(offset)
+            result[name] = loads_json(f.read(length))
+    return result
+
+
+@dataclass
+class SegmentsView:
+    """
+    Transcript segments together with their serialized payload.
+
+    Lets the same bytes serve every consumer that needs the serialized form
+    (intermediate file, transcription cache) while code that needs the data
+    uses the parsed list, so the segments are only encoded once.
+
+    For long JSON transcripts the payload is left as None and write_to()
+    streams the segments instead, so the encoded document is never held in
+    memory next to the parsed list.
+    """
+    payload: Optional[bytes]
+    segments: List[Dict[str, Any]]
+    format: str = DEFAULT_SEGMENT_FORMAT
+
+    @classmethod
+    def from_segments(cls, segments: List[Dict[str, Any]], fmt: str = DEFAULT_SEGMENT_FORMAT) -> "SegmentsView":
+        """Serializes segments once (or defers to streaming) and wraps both representations."""
+        if fmt == "json" and len(segments) > STREAM_SEGMENTS_THRESHOLD:
+            return cls(payload=None, segments=segments, format=fmt)
+        return cls(payload=encode_segments(segments, fmt), segments=segments, format=fmt)
+
+    def write_to(self, file_path: Path) -> int:
+        """
+        Writes the serialized segments to a file (atomically replaced).
+
+        Args:
+            file_path: Destination path (parent directory must exist).
+
+        Returns:
+            The number of bytes written.
+
+        Raises:
+            OSError: If the file cannot be written.
+        """
+        if self.payload is None:
+            return write_json_array(file_path, self.segments)
+        return atomic_write_bytes(file_path, self.payload)
+
+# --- End of src/utils/file_io.py ---
@@ -8,7 +8,7 @@ from datetime import datetime
 from typing import Dict, Any, Optional, List # Added List hint
 
 # Assuming log and schema loader are adapted for English
-from src.utils.log import log
+from src.utils.log import log, log_enabled
 from src.utils.config_schema import load_schema, DEFAULT_SCHEMA_PATH
 
 # Assuming PROJECT_ROOT is defined consistently
@@ -183,7 +183,7 @@ def generate_default_config(
         return False
     except Exception as e:
         log(f"Unexpected error writing configuration file '{output_path}': {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG") # Log traceback for unexpected errors
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG") # Log traceback for unexpected errors
         return False
 
 
@@ -0,0 +1,102 @@
+# src/utils/io_queue.py
+
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Any, Dict, Iterable
+
+# Import logging utility
+from src.utils.log import log
+from src.utils.file_io import SegmentsView, atomic_write_bytes, write_bundle
+from src.utils.results_index import unregister_result
+
+# --- Background Writer ---
+# A single worker keeps writes in submission order and avoids many
+# concurrent file operations competing for the same disk.
+_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="io-writer")
+
+
+def _write_bytes(file_path: Path, payload: bytes, drop_cache: bool) -> None:
+    """Writes a payload to disk atomically (runs on the background writer thread)."""
+    atomic_write_bytes(file_path, payload, drop_cache=drop_cache)
+    log(f"Background write complete: {Path(file_path).name} ({len(payload)} bytes)", "DEBUG")
+
+
+def submit_write(file_path: Path, payload: bytes, drop_cache: bool = False) -> Future:
+    """
+    Queues a file write on the background writer thread.
+
+    The caller keeps the returned Future and calls .result() before it relies
+    on the file being present; any I/O error is re-raised at that point.
+
+    Args:
+        file_path: Destination path (parent directory must exist).
+        payload: The bytes to write.
+        drop_cache: Evict the written pages from the page cache (see atomic_write_bytes).
+
+    Returns:
+        A Future that completes when the file has been written.
+    """
+    return _writer.submit(_write_bytes, file_path, payload, drop_cache)
+
+
+def _write_segments(file_path: Path, view: SegmentsView) -> None:
+    """Writes a SegmentsView to disk (runs on the background writer thread)."""
+    written = view.write_to(file_path)
+    log(f"Background write complete: {Path(file_path).name} ({written} bytes)", "DEBUG")
+
+
+def submit_segments_write(file_path: Path, view: SegmentsView) -> Future:
+    """
+    Queues writing transcript segments on the background writer thread.
+
+    Unlike submit_write, this also accepts views without a pre-encoded payload;
+    those are stream-encoded element by element on the writer thread, which
+    overlaps encoding with the caller's next step.
+
+    Args:
+        file_path: Destination path (parent directory must exist).
+        view: The segments to write.
+
+    Returns:
+        A Future that completes when the file has been written.
+    """
+    return _writer.submit(_write_segments, file_path, view)
+
+
+def submit_bundle_write(file_path: Path, sections: Dict[str, Any]) -> Future:
+    """
+    Queues writing an intermediate bundle (see file_io.write_bundle) on the background writer.
+
+    Returns:
+        A Future whose result is the section offsets returned by write_bundle.
+    """
+    return _writer.submit(write_bundle, file_path, sections)
+
+
+def _cleanup_paths(*file_paths: Path) -> None:
+    """Removes files if present (runs on the background writer thread)."""
+    for file_path in file_paths:
+        try:
+            Path(file_path).unlink(missing_ok=True)
+            unregister_result(file_path)
+            log(f"Removed file during cleanup: {Path(file_path).name}", "DEBUG")
+        except OSError as e:
+            log(f"Could not remove '{file_path}' during cleanup: {e}", "WARNING")
+
+
+def submit_cleanup(file_paths: Iterable[Path]) -> Future:
+    """
+    Queues removal of files on the background writer thread.
+
+    All paths are removed in one task. Because the writer runs tasks in order,
+    a cleanup submitted after a write always runs once that write has finished.
+
+    Args:
+        file_paths: The files to remove (missing files are ignored).
+
+    Returns:
+        A Future that completes when the cleanup has run.
+    """
+    return _writer.submit(_cleanup_paths, *file_paths)
+
+# --- End of src/utils/io_queue.py ---
@@ -1,11 +1,13 @@
 # src/utils/llm.py
 
+import time
+import threading
 import subprocess
 import yaml # Keep yaml for update_config_with_available_models
 import json
 from pathlib import Path
 # Ensure Union is imported from typing
-from typing import List, Dict, Optional, Union, Any # Added Any
+from typing import List, Dict, Optional, Tuple, Union, Any # Added Any
 
 # Assuming log utility is adapted for English messages
 from src.utils.log import log
@@ -20,6 +22,13 @@ except ImportError:
 # Define the default path for the main configuration file
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "config.yaml"
 
+# --- Local Model List Cache ---
+# 'ollama list' spawns a process; its result is reused for this many seconds so
+# UI polls and the concurrent LLM tasks of one job share a single call
+LOCAL_MODELS_TTL_SECONDS = 30.0
+_local_models_cache: Optional[Tuple[float, List[str]]] = None # (monotonic fetch time, models)
+_local_models_lock = threading.Lock()
+
 # --- Ollama Communication Helpers ---
 def _run_ollama_command(command: List[str], input_data: Optional[str] = None, timeout: Optional[int] = None) -> Optional[str]:
     """
@@ -65,13 +74,39 @@ def _run_ollama_command(command: List[str], input_data: Optional[str] = None, ti
         log(f"Unexpected error running Ollama command: {' '.join(command)}\nError: {e}", "ERROR")
         return None
 
-def get_local_models() -> List[str]:
-    """Retrieves a list of locally available Ollama models via 'ollama list'."""
+def get_local_models(refresh: bool = False) -> List[str]:
+    """
+    Retrieves a list of locally available Ollama models via 'ollama list'.
+
+    Results are cached for LOCAL_MODELS_TTL_SECONDS. Concurrent callers wait
+    for one in-flight fetch instead of each running the command. Failures are
+    not cached.
+
+    Args:
+        refresh: Bypass the cache and query Ollama now.
+
+    Returns:
+        The model names (e.g. 'llama3:8b'), or an empty list on failure.
+    """
+    global _local_models_cache
+    with _local_models_lock:
+        if not refresh and _local_models_cache is not None:
+            fetched_at, cached_models = _local_models_cache
+            if time.monotonic() - fetched_at < LOCAL_MODELS_TTL_SECONDS:
+                return list(cached_models)
+        models = _fetch_local_models()
+        if models is None:
+            return [] # Return empty list on failure
+        _local_models_cache = (time.monotonic(), models)
+        return list(models)
+
+def _fetch_local_models() -> Optional[List[str]]:
+    """Runs 'ollama list' and parses the model names; None if the command failed."""
     log("Fetching list of local Ollama models...", "INFO")
     output = _run_ollama_command(["ollama", "list"])
     if output is None:
         log("Failed to retrieve local models from Ollama.", "ERROR")
-        return [] # Return empty list on failure
+        return None
 
     models = []
     lines = output.strip().splitlines()
@@ -107,6 +142,54 @@ def is_model_available(model_name: str, local_models: Optional[List[str]] = None
     current_local_models = local_models if local_models is not None else get_local_models()
     return model_name in current_local_models
 
+def resolve_quantized_variant(model_name: str, quantization: Optional[str], local_models: List[str]) -> str:
+    """
+    Returns the locally available quantized variant of a model, if there is one.
+
+    Ollama publishes quantization levels as tag suffixes (e.g. 'llama3:8b' ->
+    'llama3:8b-instruct-q8_0'). A local model with the same name whose tag starts
+    with the configured tag and ends in '-<quantization>' is preferred. Base
+    completion variants ('-text-') are skipped unless the configured tag asks for
+    one, since the prompts are chat prompts; among the remaining matches tags
+    marked 'instruct'/'chat' win, then the shortest tag. Without a match the
+    configured model is used unchanged.
+
+    Example:
+        >>> resolve_quantized_variant('llama3:8b', 'q8_0',
+        ...     ['llama3:8b-text-q8_0', 'llama3:8b-instruct-q8_0'])
+        'llama3:8b-instruct-q8_0'
+
+    Args:
+        model_name: The configured model ('name' or 'name:tag').
+        quantization: The quantization suffix (e.g. 'q8_0', 'q4_K_M', 'fp16'), or None/'none'.
+        local_models: Locally available models (from get_local_models).
+
+    Returns:
+        The model name to run.
+    """
+    if not quantization or quantization == "none":
+        return model_name
+    suffix = f"-{quantization}"
+    if model_name.endswith(suffix):
+        return model_name # Already pinned to this quantization
+    name, _, tag = model_name.partition(":")
+    tag_prefix = "" if tag in ("", "latest") else tag
+    wants_text = "text" in tag_prefix.split("-")
+    candidates = [
+        m for m in local_models
+        if m.partition(":")[0] == name and m.endswith(suffix) and m.partition(":")[2].startswith(tag_prefix)
+        and (wants_text or "text" not in m.partition(":")[2].split("-"))
+    ]
+    if not candidates:
+        return model_name
+    def _rank(m: str) -> Tuple[bool, int]:
+        """Chat-tuned tags first (False sorts before True), then the shortest tag."""
+        tag_parts = m.partition(":")[2].split("-")
+        return (not ("instruct" in tag_parts or "chat" in tag_parts), len(m))
+    variant = min(candidates, key=_rank)
+    log(f"Using {quantization} variant '{variant}' for model '{model_name}'.", "DEBUG")
+    return variant
+
 # --- Configuration and Model Preference Logic ---
 # Added return type hint
 def _get_available_preferred_models(
@@ -168,7 +251,7 @@ def update_config_with_available_models(config_path: Path = DEFAULT_CONFIG_PATH)
         log(f"'llm_models' section in config is not a valid dictionary. Cannot update preferences.", "WARNING")
         return False
 
-    available_models = get_local_models()
+    available_models = get_local_models(refresh=True) # Rewrites the config, so query Ollama now
     if not available_models:
         log(f"No local models detected via 'ollama list'. Cannot reliably update model preferences. Aborting update.", "WARNING")
         return False # Avoid wiping preferences if ollama list fails
@@ -230,12 +313,16 @@ def run_with_fallback(task: str, prompt: str, config: dict, timeout: Optional[in
         log("No local Ollama models detected. Cannot run LLM task '{task}'. Ensure Ollama is running.", "ERROR")
         return None
 
+    # Preferred quantization level; swaps in e.g. a q8_0 tag of the same model when pulled
+    quantization = config.get("llm_quantization")
+
     # Try each model in the preferred list for the task
     for i, model_name in enumerate(fallback_models):
         # Basic validation of the model name itself
         if not model_name or not isinstance(model_name, str):
              log(f"Skipping invalid model name entry #{i+1} in list for task '{task}': '{model_name}'", "WARNING")
              continue
+        model_name = resolve_quantized_variant(model_name, quantization, local_models)
 
         # *** Check if this preferred model is actually available locally ***
         if not is_model_available(model_name, local_models):
@@ -245,6 +332,11 @@ def run_with_fallback(task: str, prompt: str, config: dict, timeout: Optional[in
         # --- Attempt to run the available model ---
         log(f"Attempting task '{task}' with locally available model: {model_name} (Preference {i+1}/{len(fallback_models)})", "INFO")
         command = ["ollama", "run", model_name]
+        # Keep the model loaded in the Ollama server between calls/jobs instead of
+        # reloading its weights for every prompt (e.g. "30m"; unset uses Ollama's default)
+        keep_alive = config.get("llm_keep_alive")
+        if keep_alive:
+            command += ["--keepalive", str(keep_alive)]
 
         # Determine effective timeout: argument > task-specific config > default config
         effective_timeout = timeout # Use direct argument first, if provided
@@ -1,13 +1,16 @@
 # src/utils/load_config.py
 
+import os
+import copy
 import yaml
+import threading
 import traceback # Keep for logging unexpected errors
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, FrozenSet, Tuple
 
 # Import logging utility first
 # Assuming basic console logging might be available even if config loading fails partially
-from src.utils.log import log, setup_logging # Import setup_logging for test block
+from src.utils.log import log, log_enabled, setup_logging # Import setup_logging for test block
 
 # Import other utilities
 from src.utils.generate_config_from_schema import generate_default_config
@@ -17,6 +20,20 @@ from src.utils.auto_update_config import auto_update_config
 # Define the default path for the main configuration file
 DEFAULT_CONFIG_PATH = PROJECT_ROOT / "config.yaml"
 
+# --- Loaded Config Cache ---
+# Maps config path -> (source fingerprint, loaded config). The fingerprint is the
+# set of (file, mtime_ns) pairs for the config and schema files, so editing
+# either file invalidates the entry on the next call.
+_CACHE: Dict[str, Tuple[FrozenSet[Tuple[str, int]], Dict[str, Any]]] = {}
+_cache_lock = threading.Lock()
+
+def _source_fingerprint(config_path: Path) -> Optional[FrozenSet[Tuple[str, int]]]:
+    """Returns the (path, mtime_ns) set of all config source files, or None if one is missing."""
+    try:
+        return frozenset((str(p), os.stat(p).st_mtime_ns) for p in (config_path, DEFAULT_SCHEMA_PATH))
+    except OSError:
+        return None
+
 def load_config(config_path: Path = DEFAULT_CONFIG_PATH) -> dict:
     """
     Loads the main configuration from the specified YAML file.
@@ -30,10 +47,21 @@ def load_config(config_path: Path = DEFAULT_CONFIG_PATH) -> dict:
         config_path: The path to the configuration YAML file.
                      Defaults to config.yaml in the project root.
 
+    Successful loads are cached per config path and reused until the config or
+    schema file's modification time changes; callers always receive a copy.
+
     Returns:
         A dictionary containing the configuration, potentially updated with
         defaults, or an empty dictionary if loading/generation fails.
     """
+    # Fast path: return a copy of the cached config if no source file changed
+    fingerprint = _source_fingerprint(config_path)
+    with _cache_lock:
+        cached = _CACHE.get(str(config_path))
+    if fingerprint is not None and cached and cached[0] == fingerprint:
+        log(f"Using cached configuration for: {config_path}", "DEBUG")
+        return copy.deepcopy(cached[1])
+
     log(f"Initiating configuration load from: {config_path}", "DEBUG")
     config_existed_initially = config_path.is_file()
 
@@ -84,6 +112,11 @@ def load_config(config_path: Path = DEFAULT_CONFIG_PATH) -> dict:
             log("Configuration reload successful after update.", "DEBUG")
 
         log(f"Configuration loading and preparation complete for '{config_path}'.", "SUCCESS")
+        # Fingerprint after loading, since auto_update_config may have rewritten the file
+        fingerprint = _source_fingerprint(config_path)
+        if fingerprint is not None:
+            with _cache_lock:
+                _CACHE[str(config_path)] = (fingerprint, copy.deepcopy(config))
         return config
 
     except yaml.YAMLError as e:
@@ -95,7 +128,7 @@ def load_config(config_path: Path = DEFAULT_CONFIG_PATH) -> dict:
     except Exception as e:
         # Catch-all for unexpected errors during load/update/reload
         log(f"Unexpected error during configuration processing for '{config_path}': {e}", "ERROR")
-        log(traceback.format_exc(), "DEBUG") # Log full traceback for detailed debugging
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG") # Log full traceback for detailed debugging
         return {}
 
 # Example usage block (no changes needed, but added logging setup)
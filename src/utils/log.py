@@ -3,9 +3,11 @@
 import logging
 import logging.handlers
 import sys
+import queue
+import atexit
 import yaml
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Optional
 import datetime # Import datetime directly as needed
 
 # --- Constants ---
@@ -66,14 +68,46 @@ class IconFormatter(logging.Formatter):
         message_part = record.getMessage()
 
 
+        # Append the traceback when the record carries exception info (log(..., exc_info=True)).
+        # It is formatted here, i.e. only for records that are actually emitted.
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            message_part = f"{message_part}\n{record.exc_text}"
+
         # Combine timestamp, icon, and the formatted message
         return f"{timestamp} {icon} {message_part}"
 
 
+# --- Queue Handler Without Eager Formatting ---
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that enqueues records unformatted.
+
+    The stock prepare() formats the message and traceback in the calling thread
+    (and then drops exc_info). Here the record is queued as-is, so the console
+    and file formatters, including IconFormatter's traceback handling, run on
+    the listener thread. Safe because log() passes fully built messages without
+    lazy %-args, and the queue never leaves the process.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Returns the record unchanged (formatting happens on the listener thread)."""
+        return record
+
+
 # --- Logger Setup ---
 # Get the specific logger instance for this application
 app_logger = logging.getLogger('RealEstateTranscriber')
 _handlers_configured = False # Flag to prevent adding handlers multiple times
+# Background thread writing queued records to the console/file handlers (see setup_logging)
+_queue_listener: Optional[logging.handlers.QueueListener] = None
+
+def _stop_queue_listener():
+    """Flushes queued log records and stops the listener thread (registered with atexit)."""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
 
 def setup_logging(config_path: Path = DEFAULT_CONFIG_PATH, level: int = logging.INFO):
     """
@@ -81,11 +115,16 @@ def setup_logging(config_path: Path = DEFAULT_CONFIG_PATH, level: int = logging.
     from the config file. Sets up console (stdout) and rotating file logging.
     Should be called once at application startup.
 
+    The logger itself only gets a queue handler: log() calls enqueue the
+    unformatted record and return, and a QueueListener thread formats it
+    (including any exc_info traceback) and does the console/file writes, so
+    request handlers and pipeline threads never wait on log I/O.
+
     Args:
         config_path: Path to the configuration YAML file.
         level: Default logging level if config file is not found or lacks setting.
     """
-    global _handlers_configured
+    global _handlers_configured, _queue_listener
     if _handlers_configured:
         # Avoid reconfiguring if already done
         return
@@ -163,16 +202,23 @@ def setup_logging(config_path: Path = DEFAULT_CONFIG_PATH, level: int = logging.
 
     # --- Add Handlers to the Logger ---
     if logging_enabled:
-        # Add console handler regardless of file handler success
-        app_logger.addHandler(console_handler)
+        # Console handler regardless of file handler success
+        output_handlers = [console_handler]
 
         log_target = "console"
         if file_handler:
-            app_logger.addHandler(file_handler)
+            output_handlers.append(file_handler)
             log_target += f" and file '{LOG_DIR_PATH / LOG_FILE_NAME}' (Backups: {backup_count})"
         else:
             log_target += " only (File handler setup failed)"
 
+        # Route records through a queue; the listener thread writes them to the real handlers
+        log_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+        app_logger.addHandler(_DeferredQueueHandler(log_queue))
+        _queue_listener = logging.handlers.QueueListener(log_queue, *output_handlers, respect_handler_level=True)
+        _queue_listener.start()
+        atexit.register(_stop_queue_listener) # Don't lose queued records on shutdown
+
         # Use print for the final setup message as well
         print(f"[Log Setup Info] Logging enabled. Level: {logging.getLevelName(app_logger.level)}. Output to {log_target}.")
         _handlers_configured = True
@@ -182,8 +228,34 @@ def setup_logging(config_path: Path = DEFAULT_CONFIG_PATH, level: int = logging.
         print("[Log Setup Info] Logging disabled via configuration.")
         _handlers_configured = True
 
+# Map of level names accepted by log() to logging level numbers
+_LEVEL_NUMBERS = {
+    "DEBUG": logging.DEBUG,
+    "INFO": logging.INFO,
+    "SUCCESS": SUCCESS_LEVEL_NUM,
+    "WARNING": logging.WARNING,
+    "ERROR": logging.ERROR,
+    "CRITICAL": logging.CRITICAL,
+}
+
+def log_enabled(level: str = "DEBUG") -> bool:
+    """
+    Checks whether a message at the given level would actually be emitted.
+
+    Use it to skip building expensive messages (e.g. traceback.format_exc())
+    that would be discarded anyway:
+        if log_enabled("DEBUG"): log(traceback.format_exc(), "DEBUG")
+
+    Args:
+        level: The level name as accepted by log(). Case-insensitive.
+
+    Returns:
+        True if the application logger is enabled for that level.
+    """
+    return app_logger.isEnabledFor(_LEVEL_NUMBERS.get(level.upper(), logging.INFO))
+
 # --- Public Logging Function ---
-def log(message: str, level: str = "INFO"):
+def log(message: str, level: str = "INFO", exc_info: bool = False):
     """
     Logs a message using the configured application logger ('RealEstateTranscriber').
 
@@ -191,6 +263,9 @@ def log(message: str, level: str = "INFO"):
         message: The message string to log.
         level: The logging level ('DEBUG', 'INFO', 'SUCCESS', 'WARNING', 'ERROR', 'CRITICAL').
                Case-insensitive. Defaults to 'INFO'.
+        exc_info: If True (inside an except block), the current exception's traceback
+                  is appended. It is only formatted if the message is actually emitted,
+                  unlike passing traceback.format_exc() as the message.
     """
     level_upper = level.upper()
     # Get the logger instance (same instance configured by setup_logging)
@@ -198,19 +273,34 @@ def log(message: str, level: str = "INFO"):
 
     # Call the appropriate logging method based on the level string
     if level_upper == "DEBUG":
-        logger_instance.debug(message)
+        logger_instance.debug(message, exc_info=exc_info)
     elif level_upper == "SUCCESS":
-        logger_instance.log(SUCCESS_LEVEL_NUM, message)
+        logger_instance.log(SUCCESS_LEVEL_NUM, message, exc_info=exc_info)
     elif level_upper == "WARNING":
-        logger_instance.warning(message)
+        logger_instance.warning(message, exc_info=exc_info)
     elif level_upper == "ERROR":
-        logger_instance.error(message)
+        logger_instance.error(message, exc_info=exc_info)
     elif level_upper == "CRITICAL":
-        logger_instance.critical(message)
+        logger_instance.critical(message, exc_info=exc_info)
     else: # Default to INFO for unknown levels or explicit 'INFO'
         # Optionally prepend the original level if it wasn't 'INFO'
         log_prefix = f"({level}) " if level_upper != "INFO" else ""
-        logger_instance.info(f"{log_prefix}{message}")
+        logger_instance.info(f"{log_prefix}{message}", exc_info=exc_info)
+
+
+def log_lazy(level: str, message_fn: Callable[[], str]):
+    """
+    Logs the message returned by `message_fn`, calling it only if `level` is enabled.
+
+    For messages that are expensive to build and usually filtered out, e.g.
+    log_lazy("DEBUG", traceback.format_exc) in except blocks.
+
+    Args:
+        level: The level name as accepted by log().
+        message_fn: Zero-argument callable returning the message.
+    """
+    if log_enabled(level):
+        log(message_fn(), level)
 
 
 # Example usage / test block (no changes needed)
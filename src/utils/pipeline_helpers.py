@@ -1,12 +1,38 @@
 # src/utils/pipeline_helpers.py
 
-from typing import Dict, Any
+import os
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Any, Optional, Tuple
 
 # --- Import dependencies directly ---
 # Removed fallback imports; rely on correct module structure.
 from src.job_manager import job_manager
 from src.utils.log import log
 
+# --- Pipeline Worker Pool ---
+# Web-started pipeline runs (Part 1 and Part 2) share this bounded pool, so a burst
+# of submissions queues up instead of all competing for GPU memory and Ollama
+DEFAULT_PIPELINE_MAX_WORKERS = 2
+try:
+    PIPELINE_MAX_WORKERS = max(1, int(os.environ.get("PIPELINE_MAX_WORKERS", DEFAULT_PIPELINE_MAX_WORKERS)))
+except ValueError:
+    log(f"Invalid PIPELINE_MAX_WORKERS value; using {DEFAULT_PIPELINE_MAX_WORKERS}.", "WARNING")
+    PIPELINE_MAX_WORKERS = DEFAULT_PIPELINE_MAX_WORKERS
+_pipeline_pool = ThreadPoolExecutor(max_workers=PIPELINE_MAX_WORKERS, thread_name_prefix="pipeline")
+
+# --- Progress Coalescing ---
+# Smallest progress change (percentage points) worth publishing on its own
+PROGRESS_MIN_DELTA = 5
+# Minimum time (seconds) between two published progress values of one job
+PROGRESS_MIN_INTERVAL = 0.5
+# Last published (progress, status, monotonic publish time) per job, as seen by maybe_update_progress
+_last_progress: Dict[str, Tuple[int, Optional[str], float]] = {}
+# Latest coalesced (unpublished) progress per job, published by flush_progress
+_pending_progress: Dict[str, int] = {}
+_last_progress_lock = threading.Lock()
+
 
 def check_stop(job_id: str, current_step: str = "process"):
     """
@@ -27,6 +53,104 @@ def check_stop(job_id: str, current_step: str = "process"):
         raise InterruptedError(f"Stop requested during {current_step} for job {job_id}.")
 
 
+def maybe_update_progress(job_id: str, progress: int, status: Optional[str] = None,
+                          min_delta: int = PROGRESS_MIN_DELTA,
+                          log_entry: Optional[Tuple[str, str]] = None,
+                          min_interval: float = PROGRESS_MIN_INTERVAL) -> bool:
+    """
+    Updates job progress only when the change is visible to the user.
+
+    Fine-grained progress calls (e.g. once per LLM task) are coalesced: the
+    update is skipped unless progress moved by at least `min_delta` and at
+    least `min_interval` seconds passed since the last published value, the
+    status changes, or the job reaches 100%. Skipped values are remembered;
+    call flush_progress to publish the latest one.
+
+    Args:
+        job_id: The ID of the job to update.
+        progress: The new progress percentage (0-100).
+        status: Optional new status, published together with the progress.
+        min_delta: Minimum progress change that triggers an update.
+        log_entry: Optional (message, level) job log entry. Always recorded; when
+                   the progress is published it goes in the same locked update.
+        min_interval: Minimum seconds between published updates.
+
+    Returns:
+        True if the update was passed on to the JobManager, False if it was coalesced.
+    """
+    progress = int(progress)
+    now = time.monotonic()
+    with _last_progress_lock:
+        last = _last_progress.get(job_id)
+        if last is not None:
+            last_value, last_status, last_time = last
+            status_changed = status is not None and status != last_status
+            too_small = abs(progress - last_value) < min_delta or now - last_time < min_interval
+            if not status_changed and progress < 100 and too_small:
+                _pending_progress[job_id] = progress
+                if log_entry: job_manager.add_log(job_id, *log_entry)
+                return False
+        _pending_progress.pop(job_id, None)
+        if progress >= 100:
+            _last_progress.pop(job_id, None) # Job finished; nothing left to coalesce
+        else:
+            _last_progress[job_id] = (progress, status if status is not None else (last[1] if last else None), now)
+    job_manager.transition(job_id, status=status, progress=progress, log_entry=log_entry)
+    return True
+
+
+def flush_progress(job_id: str) -> bool:
+    """
+    Publishes the latest progress value held back by maybe_update_progress, if any.
+
+    Returns:
+        True if a pending value was published, False if there was none.
+    """
+    with _last_progress_lock:
+        pending = _pending_progress.pop(job_id, None)
+        last = _last_progress.get(job_id)
+        if pending is None or (last is not None and last[0] == pending):
+            return False
+        _last_progress[job_id] = (pending, last[1] if last else None, time.monotonic())
+    job_manager.update_progress(job_id, pending)
+    return True
+
+
+def forget_progress(job_id: str):
+    """Drops the coalescing state of a job (call when its pipeline run ends)."""
+    with _last_progress_lock:
+        _last_progress.pop(job_id, None)
+        _pending_progress.pop(job_id, None)
+
+
+def submit_pipeline_job(target: Callable[..., Any], job_id: str, *args: Any) -> Future:
+    """
+    Runs a pipeline function (run_part1 / run_part2) for a job on the shared worker pool.
+
+    The job stays in its current (queued/review) state until a worker is free.
+    Pipeline functions handle their own errors; should one escape anyway, the
+    job is marked as failed instead of being left running forever.
+
+    Args:
+        target: The pipeline function, called as target(job_id, *args).
+        job_id: The job to run.
+        *args: Further arguments for the pipeline function.
+
+    Returns:
+        The Future of the pipeline run.
+    """
+    future = _pipeline_pool.submit(target, job_id, *args)
+
+    def _on_done(done: Future):
+        exc = done.exception()
+        if exc is not None:
+            log(f"Unhandled error in pipeline worker for job {job_id}: {exc}", "CRITICAL")
+            job_manager.set_error(job_id, f"Unexpected pipeline error: {exc}")
+
+    future.add_done_callback(_on_done)
+    return future
+
+
 def merge_configs(base: dict, overrides: dict) -> dict:
     """
     Recursively merges the 'overrides' dictionary into the 'base' dictionary.
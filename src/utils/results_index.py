@@ -0,0 +1,75 @@
+# src/utils/results_index.py
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional, Set, Union
+
+from src.utils.log import log
+from src.utils.config_schema import RESULTS_FOLDER
+
+# --- Constants ---
+# Absolute results directory, compared against the parent of every written file
+RESULTS_DIR_ABS = os.path.abspath(RESULTS_FOLDER)
+
+# --- In-memory Index of Result File Names ---
+# Lets the download route answer unknown names with a set lookup instead of a
+# stat(). Filled by one directory scan on first use, then kept current by the
+# writers (file_io registers every atomically written file, io_queue
+# unregisters cleaned-up ones). Files copied into results/ by hand while the
+# server runs are only picked up after a restart.
+_index: Optional[Set[str]] = None
+_index_lock = threading.Lock()
+
+
+def _load_index() -> Set[str]:
+    """Returns the index, scanning the results directory on first use (caller holds the lock)."""
+    global _index
+    if _index is None:
+        names: Set[str] = set()
+        try:
+            with os.scandir(RESULTS_DIR_ABS) as entries:
+                names = {entry.name for entry in entries if entry.is_file()}
+        except FileNotFoundError:
+            pass # No results yet
+        except OSError as e:
+            log(f"Could not scan results directory for the download index: {e}", "WARNING")
+        _index = names
+        log(f"Results index loaded ({len(names)} files).", "DEBUG")
+    return _index
+
+
+def _result_name(file_path: Union[str, Path]) -> Optional[str]:
+    """Returns the file name if `file_path` lies directly in the results directory, else None."""
+    abs_path = os.path.abspath(file_path)
+    if os.path.dirname(abs_path) != RESULTS_DIR_ABS:
+        return None
+    return os.path.basename(abs_path)
+
+
+def register_result(file_path: Union[str, Path]):
+    """Records a file written to the results directory (other paths are ignored)."""
+    name = _result_name(file_path)
+    if name is None:
+        return
+    with _index_lock:
+        if _index is not None: # Not loaded yet: the first scan will see the file
+            _index.add(name)
+
+
+def unregister_result(file_path: Union[str, Path]):
+    """Forgets a file removed from the results directory (other paths are ignored)."""
+    name = _result_name(file_path)
+    if name is None:
+        return
+    with _index_lock:
+        if _index is not None:
+            _index.discard(name)
+
+
+def is_known_result(name: str) -> bool:
+    """Checks whether a plain file name exists in the results directory, without touching the disk."""
+    with _index_lock:
+        return name in _load_index()
+
+# --- End of src/utils/results_index.py ---
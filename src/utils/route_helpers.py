@@ -1,6 +1,64 @@
 # src/utils/route_helpers.py
-from typing import Dict, Any
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+from flask import Response, request
 from src.utils.log import log
+from src.utils.file_io import dumps_json
+
+def json_response(payload: Any, status: int = 200) -> Response:
+    """
+    Builds a JSON response with the file_io serializer (orjson when installed).
+
+    Faster than jsonify for large payloads such as transcripts: the body is
+    encoded to bytes in one C call instead of through Flask's JSON provider.
+
+    Args:
+        payload: The JSON-serializable response body.
+        status: HTTP status code.
+
+    Returns:
+        A Flask Response with mimetype 'application/json'.
+    """
+    return Response(dumps_json(payload, indent=False), status=status, mimetype="application/json")
+
+def make_etag(*parts: Any) -> str:
+    """
+    Builds a short ETag from values that change whenever the response does
+    (file mtimes and sizes, model lists, ...), without encoding the response itself.
+    """
+    return hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).hexdigest()
+
+def not_modified_response(etag: str) -> Optional[Response]:
+    """
+    Returns an empty 304 response if the client's If-None-Match matches `etag`, else None.
+    """
+    if not request.if_none_match.contains(etag):
+        return None
+    response = Response(status=304)
+    response.set_etag(etag)
+    response.cache_control.no_cache = True
+    return response
+
+def cacheable_json_response(payload: Any, etag: str, last_modified: Optional[float] = None) -> Response:
+    """
+    Builds a JSON response (see json_response) carrying an ETag and optional Last-Modified.
+
+    Cache-Control 'no-cache' makes browsers revalidate on every request, so
+    repeat requests get a body-less 304 (see not_modified_response) while
+    changes are still picked up immediately.
+
+    Args:
+        payload: The JSON-serializable response body.
+        etag: Validator for the payload (see make_etag).
+        last_modified: Optional POSIX timestamp of the newest underlying file.
+    """
+    response = json_response(payload)
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = datetime.fromtimestamp(last_modified, tz=timezone.utc)
+    response.cache_control.no_cache = True
+    return response
 
 def parse_config_overrides_from_form(form_data, schema_info: Dict[str, Any]) -> Dict[str, Any]:
     """